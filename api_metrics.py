@@ -0,0 +1,270 @@
+"""
+Spotify API Metrics
+Per-endpoint call counts, latency histograms, response statuses, retries and
+bytes received for SpotifyClient. Exposed in Prometheus text format, as a
+file (SPOTIFY_METRICS_FILE) or a local /metrics endpoint (SPOTIFY_METRICS_PORT),
+and as a summary table the exporters print after each run.
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Write the metrics here after every export (e.g. for node_exporter's textfile collector)
+METRICS_FILE_ENV = 'SPOTIFY_METRICS_FILE'
+# Serve /metrics on this port from the live dashboard
+METRICS_PORT_ENV = 'SPOTIFY_METRICS_PORT'
+
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STATUSES = ('success', '429', 'error')
+
+_local = threading.local()
+
+
+def _status(code):
+    if code == 429:
+        return '429'
+    return 'success' if code < 400 else 'error'
+
+
+def retry_after(error):
+    """Seconds from a rate-limit error's Retry-After header, or None"""
+    headers = getattr(error, 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After') or headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+def _endpoint_from_url(url):
+    """Short endpoint name for requests made outside an instrumented method"""
+    parts = urlsplit(url).path.strip('/').split('/')
+    if parts and parts[0] == 'v1':
+        parts = parts[1:]
+    if len(parts) == 2 and parts[0] in ('artists', 'tracks', 'albums'):
+        parts[1] = '{id}'
+    return '/'.join(parts) or '/'
+
+
+class ApiMetrics:
+    """Thread-safe counters and histograms keyed by endpoint.
+
+    ``calls`` and the latency histogram count SpotifyClient method calls
+    (batches and retries included in the time). ``requests`` counts HTTP
+    responses by status, including the 429s that spotipy retried on its own,
+    which is what shows the code path that keeps hitting the rate limit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._runs = []
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = defaultdict(int)            # (endpoint, status) -> method calls
+            self.buckets = defaultdict(lambda: [0] * len(LATENCY_BUCKETS))
+            self.latency_sum = defaultdict(float)
+            self.latency_max = defaultdict(float)
+            self.requests = defaultdict(int)         # (endpoint, status) -> HTTP responses
+            self.retries = defaultdict(int)
+            self.bytes = defaultdict(int)
+
+    def begin_run(self):
+        """Also count into a fresh ApiMetrics until ``end_run``; returns it.
+
+        The totals keep growing for Prometheus, while a long-lived client
+        (the export daemon's) still reports each export on its own.
+        """
+        run = ApiMetrics()
+        with self._lock:
+            self._runs.append(run)
+        return run
+
+    def end_run(self, run):
+        with self._lock:
+            self._runs.remove(run)
+
+    def observe_call(self, endpoint, status, seconds):
+        for run in list(self._runs):
+            run.observe_call(endpoint, status, seconds)
+        with self._lock:
+            self.calls[(endpoint, status)] += 1
+            self.latency_sum[endpoint] += seconds
+            self.latency_max[endpoint] = max(self.latency_max[endpoint], seconds)
+            counts = self.buckets[endpoint]
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    counts[i] += 1
+                    break
+
+    def observe_response(self, endpoint, status_code, size, retried_statuses=()):
+        for run in list(self._runs):
+            run.observe_response(endpoint, status_code, size, retried_statuses)
+        with self._lock:
+            self.requests[(endpoint, _status(status_code))] += 1
+            self.bytes[endpoint] += size
+            self.retries[endpoint] += len(retried_statuses)
+            for code in retried_statuses:
+                self.requests[(endpoint, _status(code) if code else 'error')] += 1
+
+    @contextmanager
+    def track(self, endpoint):
+        """Time one client method call and attribute its HTTP requests to ``endpoint``"""
+        previous = getattr(_local, 'endpoint', None)
+        _local.endpoint = endpoint
+        status = 'success'
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            status = '429' if getattr(e, 'http_status', None) == 429 else 'error'
+            raise
+        finally:
+            _local.endpoint = previous
+            self.observe_call(endpoint, status, time.perf_counter() - start)
+
+    def response_hook(self, response, *args, **kwargs):
+        """requests response hook; install on spotipy's session"""
+        endpoint = getattr(_local, 'endpoint', None) or _endpoint_from_url(response.url)
+        retries = getattr(response.raw, 'retries', None)
+        history = getattr(retries, 'history', ()) or ()
+        self.observe_response(endpoint, response.status_code, len(response.content),
+                              [entry.status for entry in history])
+        return response
+
+    def summary(self):
+        """One row per endpoint: calls, responses by status, retries, KB and latency"""
+        with self._lock:
+            endpoints = sorted({e for e, _ in self.calls} | {e for e, _ in self.requests})
+            rows = []
+            for endpoint in endpoints:
+                calls = sum(self.calls.get((endpoint, s), 0) for s in STATUSES)
+                rows.append({
+                    'endpoint': endpoint,
+                    'calls': calls,
+                    'success': self.requests.get((endpoint, 'success'), 0),
+                    '429': self.requests.get((endpoint, '429'), 0),
+                    'error': self.requests.get((endpoint, 'error'), 0),
+                    'retries': self.retries.get(endpoint, 0),
+                    'kb': round(self.bytes.get(endpoint, 0) / 1024, 1),
+                    'avg_ms': round(self.latency_sum.get(endpoint, 0.0) / calls * 1000, 1) if calls else 0.0,
+                    'max_ms': round(self.latency_max.get(endpoint, 0.0) * 1000, 1),
+                })
+        return rows
+
+    def print_summary(self):
+        """Print the per-endpoint table"""
+        rows = self.summary()
+        print("\n" + "=" * 60)
+        print("📡 SPOTIFY API CALLS")
+        print("=" * 60)
+        if not rows:
+            print("   No API calls")
+            return
+        print(f"   {'endpoint':<18}{'calls':>6}{'ok':>6}{'429':>5}{'err':>5}{'retry':>6}"
+              f"{'KB':>8}{'avg ms':>8}{'max ms':>8}")
+        for row in rows:
+            print(f"   {row['endpoint']:<18}{row['calls']:>6}{row['success']:>6}{row['429']:>5}{row['error']:>5}"
+                  f"{row['retries']:>6}{row['kb']:>8}{row['avg_ms']:>8}{row['max_ms']:>8}")
+        limited = [row['endpoint'] for row in rows if row['429']]
+        if limited:
+            print(f"   ⚠️  Rate limited on: {', '.join(limited)}")
+
+    def to_prometheus(self):
+        """Metrics in the Prometheus text exposition format"""
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            family('spotify_api_calls_total', 'counter', "SpotifyClient method calls by endpoint and outcome")
+            for (endpoint, status), value in sorted(self.calls.items()):
+                lines.append(f'spotify_api_calls_total{{endpoint="{endpoint}",status="{status}"}} {value}')
+
+            family('spotify_api_call_duration_seconds', 'histogram', "SpotifyClient method call latency")
+            for endpoint, counts in sorted(self.buckets.items()):
+                total = 0
+                for bound, value in zip(LATENCY_BUCKETS, counts):
+                    total += value
+                    lines.append(f'spotify_api_call_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {total}')
+                calls = sum(self.calls.get((endpoint, s), 0) for s in STATUSES)
+                lines.append(f'spotify_api_call_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {calls}')
+                lines.append(f'spotify_api_call_duration_seconds_sum{{endpoint="{endpoint}"}} {self.latency_sum[endpoint]:.6f}')
+                lines.append(f'spotify_api_call_duration_seconds_count{{endpoint="{endpoint}"}} {calls}')
+
+            family('spotify_api_requests_total', 'counter', "HTTP responses by endpoint and status, retried ones included")
+            for (endpoint, status), value in sorted(self.requests.items()):
+                lines.append(f'spotify_api_requests_total{{endpoint="{endpoint}",status="{status}"}} {value}')
+
+            family('spotify_api_retries_total', 'counter', "Requests spotipy retried (429s and server errors)")
+            for endpoint, value in sorted(self.retries.items()):
+                lines.append(f'spotify_api_retries_total{{endpoint="{endpoint}"}} {value}')
+
+            family('spotify_api_response_bytes_total', 'counter', "Response body bytes received")
+            for endpoint, value in sorted(self.bytes.items()):
+                lines.append(f'spotify_api_response_bytes_total{{endpoint="{endpoint}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Write the metrics file atomically so a scraper never reads half of it"""
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+
+def instrumented(endpoint):
+    """Decorator for SpotifyClient methods: record the call under ``endpoint``"""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.track(endpoint):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if urlsplit(self.path).path != '/metrics':
+            self.send_error(404)
+            return
+        body = self.server.metrics.to_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve_metrics(metrics, port, host='127.0.0.1'):
+    """Serve ``metrics`` at http://host:port/metrics from a daemon thread"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    server.metrics = metrics
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    print(f"📡 Serving API metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def report_run(client, run_metrics=None):
+    """Print the API summary for an export run and write the metrics file if configured"""
+    metrics = getattr(client, 'metrics', None)
+    if metrics is None:
+        return
+    (run_metrics or metrics).print_summary()
+    path = os.getenv(METRICS_FILE_ENV)
+    if path:
+        metrics.write_prometheus(path)
+        print(f"📄 API metrics written to {path}")
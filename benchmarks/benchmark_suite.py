@@ -0,0 +1,366 @@
+"""
+Benchmark suite for the processor, charts, exporters and dashboard loads
+
+Times every DataProcessor method, every Visualizer chart, both exporters and
+the database dashboard load against MockSpotifyClient at several library
+sizes. Each benchmark reports pytest-benchmark style statistics, a
+tracemalloc peak and the number of API calls one run makes. Results are
+written as JSON in pytest-benchmark's layout so runs can be compared.
+
+The Spotify API caps what the processor and exporters fetch (50 items per
+call), so their cost barely moves with library size. The charts are fed the
+whole history and the dashboard load reads a recently_played table holding
+every play, which is where size shows.
+
+The startup group runs once, not per size: ``python -X importtime`` numbers
+for each entry point (cumulative import time of the module, and which heavy
+packages it pulled in) and the wall time of a few quick cli.py commands.
+
+Usage:
+    python benchmarks/benchmark_suite.py
+    python benchmarks/benchmark_suite.py --sizes 50,10000 --output benchmark_results.json
+    python benchmarks/benchmark_suite.py --filter visualizer --max-time 0.5
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+# Add project root to path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd
+
+import export_to_csv
+import export_to_database
+from chart_specs import emotional_averages, emotional_scatter_frame
+from data_processor import DataProcessor
+from db_data import load_data_from_db
+from db_pool import ReadConnectionPool
+from play_history import binge_listening, listening_heatmap
+from tests.mock_data import MockSpotifyClient
+from visualizer import Visualizer
+
+SIZES = [50, 10 ** 4, 10 ** 5, 10 ** 6]
+
+PROCESSOR_METHODS = [
+    'get_top_artists_data', 'get_listening_hours_data', 'get_genre_distribution',
+    'get_emotional_patterns', 'get_listening_heatmap_data', 'get_music_personality',
+    'get_hidden_gems', 'get_binge_listening', 'get_diversity_score',
+]
+
+# Entry points whose import cost is measured with -X importtime
+STARTUP_MODULES = ['cli', 'view_database', 'export_to_database', 'export_to_csv', 'export_all',
+                   'export_daemon', 'validate_data']
+
+# Quick commands timed end to end; 'python -c pass' is the interpreter's own floor
+STARTUP_COMMANDS = {
+    'python -c pass': ['-c', 'pass'],
+    'cli.py --help': ['cli.py', '--help'],
+    'cli.py view --help': ['cli.py', 'view', '--help'],
+}
+
+# Packages that should only load for the commands that need them
+HEAVY_PACKAGES = ('pandas', 'numpy', 'pyarrow', 'plotly', 'spotipy', 'streamlit')
+
+# Chart method -> inputs key in BenchmarkData.chart_inputs
+CHARTS = {
+    'create_top_artists_chart': 'top_artists',
+    'create_listening_hours_chart': 'listening_hours',
+    'create_genre_chart': 'genres',
+    'create_emotional_radar': 'emotional_averages',
+    'create_listening_heatmap': 'listening_heatmap',
+    'create_emotional_scatter': 'emotional_scatter',
+    'create_diversity_gauge': 'diversity',
+    'create_hidden_gems_chart': 'hidden_gems',
+    'create_binge_chart': 'binge',
+}
+
+
+class BenchmarkData:
+    """Mock client, chart inputs and a seeded database for one library size"""
+
+    def __init__(self, plays, workdir):
+        self.plays = plays
+        self.workdir = workdir
+        self.client = MockSpotifyClient(plays=plays)
+        self.processor = DataProcessor(self.client)
+        self.history = self.client.library.recently_played_frame()
+        self.chart_inputs = self._chart_inputs()
+        self.db_name = os.path.join(workdir, 'spotify_data.db')
+
+    def _chart_inputs(self):
+        """Processor output for API-sized charts, the whole history for the rest"""
+        lib = self.client.library
+        features = pd.DataFrame({name: values[lib.play_track] for name, values in lib.features.items()})
+        features['track_name'] = self.history['track_name'].values
+        features['artist'] = self.history['artist'].values
+        played = pd.to_datetime(self.history['played_at'])
+        hourly = played.dt.hour.value_counts().reindex(range(24), fill_value=0)
+        return {
+            'top_artists': self.processor.get_top_artists_data(),
+            'listening_hours': pd.DataFrame({'hour': range(24), 'plays': hourly.values}),
+            'genres': self.processor.get_genre_distribution(),
+            'emotional_averages': emotional_averages(features),
+            'listening_heatmap': listening_heatmap(pd.DataFrame({'played_at': played})),
+            'emotional_scatter': emotional_scatter_frame(features),
+            'diversity': self.processor.get_diversity_score(),
+            'hidden_gems': self.processor.get_hidden_gems(),
+            'binge': binge_listening(self.history),
+        }
+
+    def seed_database(self):
+        """Export once, then load the whole play history into recently_played"""
+        with working_directory(self.workdir):
+            run_quietly(export_to_database.main, client=self.client)
+        conn = sqlite3.connect(self.db_name)
+        self.history.to_sql('recently_played', conn, if_exists='append', index=False, chunksize=50000)
+        conn.commit()
+        conn.close()
+
+
+@contextlib.contextmanager
+def working_directory(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def run_quietly(func, **kwargs):
+    """Run an exporter main without its output; raise if it reported an error"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        func(**kwargs)
+    if "ERROR OCCURRED" in output.getvalue():
+        raise RuntimeError(output.getvalue()[-2000:])
+
+
+def get_scenarios(data):
+    """``(group, name, callable)`` for every benchmark at one size"""
+    scenarios = []
+    for method in PROCESSOR_METHODS:
+        scenarios.append(('processor', method, getattr(data.processor, method)))
+
+    viz = Visualizer(cache_size=0)  # time the build, not the figure cache
+    for method, key in CHARTS.items():
+        build = getattr(viz, method)
+        scenarios.append(('visualizer', method, lambda build=build, key=key: build(data.chart_inputs[key])))
+
+    def export_database():
+        with working_directory(data.workdir):
+            run_quietly(export_to_database.main, client=data.client)
+
+    def export_csv():
+        with working_directory(data.workdir):
+            run_quietly(export_to_csv.main, client=data.client)
+
+    def load_dashboard():
+        pool = ReadConnectionPool(data.db_name)
+        try:
+            return load_data_from_db(pool)
+        finally:
+            pool.close()
+
+    scenarios.append(('export', 'export_to_database.main', export_database))
+    scenarios.append(('export', 'export_to_csv.main', export_csv))
+    scenarios.append(('dashboard', 'load_data_from_db', load_dashboard))
+    return scenarios
+
+
+def measure(func, client, min_rounds=3, max_rounds=50, max_time=1.0):
+    """pytest-benchmark style stats for repeated calls, plus memory and API calls"""
+    func()  # warm up imports and caches
+
+    calls_before = sum(client.calls.values())
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    api_calls = sum(client.calls.values()) - calls_before
+
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < min_rounds or (len(timings) < max_rounds and time.perf_counter() - started < max_time):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timing_stats(timings), {'peak_memory_bytes': peak, 'api_calls': api_calls}
+
+
+def import_time(module):
+    """``(seconds, heavy packages)`` for importing ``module`` in a fresh interpreter.
+
+    Uses ``python -X importtime``; the time is the module's cumulative entry,
+    so interpreter startup and site are not included.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr[-2000:])
+    cumulative, heavy = None, set()
+    for line in result.stderr.splitlines():
+        fields = line.split('|')
+        if not line.startswith('import time:') or len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2].strip()
+        if name == module:
+            cumulative = int(fields[1]) / 1e6
+        if name.split('.')[0] in HEAVY_PACKAGES:
+            heavy.add(name.split('.')[0])
+    return cumulative, sorted(heavy)
+
+
+def measure_startup(run, rounds=5):
+    """Stats over ``rounds`` fresh-interpreter runs of ``run() -> (seconds, heavy)``"""
+    timings, heavy = [], []
+    for _ in range(rounds):
+        seconds, heavy = run()
+        timings.append(seconds)
+    return timing_stats(timings), {'peak_memory_bytes': 0, 'api_calls': 0, 'heavy_imports': heavy}
+
+
+def get_startup_scenarios():
+    """``(name, run)`` for every import-time and command startup benchmark"""
+    scenarios = [(f"import {module}", lambda module=module: import_time(module)) for module in STARTUP_MODULES]
+
+    def command(args):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, check=True)
+        return time.perf_counter() - start, []
+
+    for name, args in STARTUP_COMMANDS.items():
+        scenarios.append((name, lambda args=args: command(args)))
+    return scenarios
+
+
+def timing_stats(timings):
+    """pytest-benchmark style stats for a list of timings in seconds"""
+    quartiles = statistics.quantiles(timings, n=4) if len(timings) > 1 else [timings[0]] * 3
+    stats = {
+        'min': min(timings),
+        'max': max(timings),
+        'mean': statistics.mean(timings),
+        'stddev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        'median': statistics.median(timings),
+        'q1': quartiles[0],
+        'q3': quartiles[2],
+        'iqr': quartiles[2] - quartiles[0],
+        'rounds': len(timings),
+        'total': sum(timings),
+        'ops': len(timings) / sum(timings),
+        'data': timings,
+    }
+    return stats
+
+
+def commit_info():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+    except OSError:
+        commit, dirty = '', False
+    return {'id': commit, 'dirty': dirty}
+
+
+def run_suite(sizes=SIZES, name_filter=None, min_rounds=3, max_rounds=50, max_time=1.0, verbose=True):
+    """Run every scenario at every size; returns the results document"""
+    benchmarks = []
+    for name, run in get_startup_scenarios():
+        fullname = f"startup/{name}"
+        if name_filter and name_filter not in fullname:
+            continue
+        stats, extra = measure_startup(run, rounds=max(min_rounds, 5))
+        benchmarks.append({
+            'group': 'startup',
+            'name': name,
+            'fullname': fullname,
+            'params': {},
+            'stats': stats,
+            'extra_info': extra,
+        })
+        if verbose:
+            heavy = ', '.join(extra['heavy_imports']) or '-'
+            print(f"   {fullname:<48}{stats['median'] * 1000:>10.2f} ms   heavy: {heavy}")
+
+    for plays in sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            if verbose:
+                print(f"\n🎧 {plays:,} plays - building library and database...")
+            data = BenchmarkData(plays, workdir)
+            data.seed_database()
+            for group, name, func in get_scenarios(data):
+                fullname = f"{group}/{name}[{plays}]"
+                if name_filter and name_filter not in fullname:
+                    continue
+                stats, extra = measure(func, data.client, min_rounds, max_rounds, max_time)
+                benchmarks.append({
+                    'group': group,
+                    'name': name,
+                    'fullname': fullname,
+                    'params': {'plays': plays},
+                    'stats': stats,
+                    'extra_info': extra,
+                })
+                if verbose:
+                    print(f"   {group + '/' + name:<48}{stats['median'] * 1000:>10.2f} ms"
+                          f"{extra['peak_memory_bytes'] / 2 ** 20:>10.1f} MB{extra['api_calls']:>6} calls")
+    return {
+        'machine_info': {
+            'node': platform.node(),
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'python_version': platform.python_version(),
+            'python_implementation': platform.python_implementation(),
+            'cpu_count': os.cpu_count(),
+        },
+        'commit_info': commit_info(),
+        'datetime': datetime.now().isoformat(),
+        'version': 1,
+        'benchmarks': benchmarks,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the processor, charts, exporters and dashboard loads")
+    parser.add_argument('--sizes', default=','.join(str(s) for s in SIZES),
+                        help="Comma-separated library sizes in plays")
+    parser.add_argument('--filter', help="Only run benchmarks whose group/name[plays] contains this")
+    parser.add_argument('--min-rounds', type=int, default=3)
+    parser.add_argument('--max-rounds', type=int, default=50)
+    parser.add_argument('--max-time', type=float, default=1.0, help="Seconds to keep repeating each benchmark")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON results file")
+    args = parser.parse_args(argv)
+
+    sizes = [int(float(s)) for s in args.sizes.split(',') if s.strip()]
+    print("=" * 70)
+    print(f"📊 BENCHMARK SUITE: {', '.join(f'{s:,}' for s in sizes)} plays")
+    print("=" * 70)
+    print(f"   {'benchmark':<48}{'median':>13}{'peak':>13}{'api':>12}")
+    results = run_suite(sizes, args.filter, args.min_rounds, args.max_rounds, args.max_time)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print()
+    print("=" * 70)
+    print(f"✅ {len(results['benchmarks'])} benchmarks saved to {args.output}")
+    print("=" * 70)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
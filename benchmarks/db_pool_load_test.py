@@ -0,0 +1,173 @@
+"""
+Load test for the dashboard's read connection pool
+
+Simulates concurrent dashboard sessions, each loading every dashboard
+dataset repeatedly, and reports per-load latency percentiles for the pool
+against a single lock-guarded shared connection (the old setup).
+
+Usage:
+    python benchmarks/db_pool_load_test.py
+    python benchmarks/db_pool_load_test.py --sessions 20 --loads 10 --plays 50000 --max-p95-ms 250
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from db_data import load_data_from_db
+from db_pool import ReadConnectionPool
+from export_to_database import create_database, create_tables
+
+
+def build_database(db_name, plays):
+    """Create a database with every dashboard table filled with synthetic rows"""
+    rng = random.Random(42)
+    days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    conn = create_database(db_name)
+    create_tables(conn)
+
+    artists = pd.DataFrame([{
+        'rank': i + 1, 'name': f"Artist {i}", 'genres': 'pop, rock', 'popularity': rng.randint(0, 100),
+        'followers': rng.randint(0, 10 ** 7), 'time_range': 'medium_term'} for i in range(50)])
+    artists.to_sql('top_artists', conn, if_exists='append', index=False)
+    pd.DataFrame([{
+        'rank': i + 1, 'name': f"Track {i}", 'artist': f"Artist {i % 50}", 'album': f"Album {i}",
+        'popularity': rng.randint(0, 100), 'duration_ms': 200000, 'duration_min': 3.33,
+        'release_date': '2020-01-01', 'spotify_url': '', 'time_range': 'medium_term'} for i in range(50)]
+    ).to_sql('top_tracks', conn, if_exists='append', index=False)
+    pd.DataFrame([{'genre': f"genre {i}", 'count': 15 - i, 'time_range': 'medium_term'} for i in range(15)]
+                 ).to_sql('genres', conn, if_exists='append', index=False)
+    pd.DataFrame([{
+        'played_at': f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:00:00",
+        'track_name': f"Track {rng.randint(0, 500)}", 'artist': f"Artist {rng.randint(0, 50)}",
+        'album': 'Album', 'duration_min': 3.3, 'day_of_week': rng.choice(days),
+        'hour': rng.randint(0, 23), 'spotify_url': ''} for _ in range(plays)]
+    ).to_sql('recently_played', conn, if_exists='append', index=False)
+    pd.DataFrame([{
+        'track_name': f"Track {i}", 'artist': f"Artist {i}", 'popularity': 50, 'danceability': rng.random(),
+        'energy': rng.random(), 'key': 1, 'loudness': -5.0, 'mode': 1, 'speechiness': 0.1,
+        'acousticness': rng.random(), 'instrumentalness': 0.0, 'liveness': 0.1, 'valence': rng.random(),
+        'tempo': 120.0, 'duration_min': 3.3, 'time_signature': 4, 'time_range': 'medium_term'} for i in range(50)]
+    ).to_sql('audio_features', conn, if_exists='append', index=False)
+    pd.DataFrame([{'hour': h, 'plays': rng.randint(0, 10)} for h in range(24)]
+                 ).to_sql('listening_patterns', conn, if_exists='append', index=False)
+    pd.DataFrame([{'day_num': d, 'day': days[d], 'hour': h, 'plays': rng.randint(1, 5)}
+                  for d in range(7) for h in range(24)]
+                 ).to_sql('listening_heatmap', conn, if_exists='append', index=False)
+    pd.DataFrame([{'personality': 'X', 'description': 'Y', 'energy': 0.5, 'valence': 0.5,
+                   'danceability': 0.5, 'acousticness': 0.5, 'tempo': 120.0}]
+                 ).to_sql('music_personality', conn, if_exists='append', index=False)
+    pd.DataFrame([{'score': 50, 'level': 'X', 'message': 'Y', 'unique_genres': 10, 'unique_artists': 50,
+                   'genre_score': 20, 'artist_score': 30, 'variance_score': 0}]
+                 ).to_sql('diversity_score', conn, if_exists='append', index=False)
+    pd.DataFrame([{'name': f"Gem {i}", 'artist': 'A', 'popularity': 20, 'album': 'B', 'image': None}
+                  for i in range(10)]).to_sql('hidden_gems', conn, if_exists='append', index=False)
+    pd.DataFrame([{'name': f"Binge {i}", 'artist': 'A', 'plays': 5 - i % 4, 'album': 'B'} for i in range(10)]
+                 ).to_sql('binge_listening', conn, if_exists='append', index=False)
+    conn.commit()
+    conn.close()
+
+
+class SharedConnection:
+    """One connection behind a lock - what a single cached connection amounts to"""
+
+    def __init__(self, db_name):
+        self.conn = sqlite3.connect(db_name, check_same_thread=False)
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        with self.lock:
+            yield self.conn
+
+    def read_sql(self, sql, params=None):
+        with self.connection() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+
+def run_sessions(source, sessions, loads):
+    """Run ``sessions`` threads that each load the dashboard ``loads`` times"""
+    latencies = []
+    lock = threading.Lock()
+    start_gate = threading.Barrier(sessions)
+
+    def session():
+        start_gate.wait()
+        for _ in range(loads):
+            start = time.perf_counter()
+            load_data_from_db(source)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    return sorted(latencies), wall
+
+
+def percentile(values, q):
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def report(label, latencies, wall):
+    print(f"   {label:<20}{percentile(latencies, 0.50) * 1000:>10.1f}"
+          f"{percentile(latencies, 0.95) * 1000:>10.1f}{latencies[-1] * 1000:>10.1f}"
+          f"{len(latencies) / wall:>12.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the dashboard read connection pool")
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--loads', type=int, default=10, help="Dashboard loads per session")
+    parser.add_argument('--plays', type=int, default=2000, help="Rows in recently_played")
+    parser.add_argument('--pool-size', type=int, default=4)
+    parser.add_argument('--max-p95-ms', type=float, help="Fail if the pool's p95 exceeds this")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, 'load_test.db')
+        build_database(db_name, args.plays)
+
+        pool = ReadConnectionPool(db_name, max_connections=args.pool_size)
+        load_data_from_db(pool)  # warm up imports and the page cache
+        pool_latencies, pool_wall = run_sessions(pool, args.sessions, args.loads)
+        shared = SharedConnection(db_name)
+        shared_latencies, shared_wall = run_sessions(shared, args.sessions, args.loads)
+        shared.conn.close()
+
+        print()
+        print("=" * 70)
+        print(f"📊 DASHBOARD LOAD TEST: {args.sessions} sessions x {args.loads} loads, {args.plays} plays")
+        print("=" * 70)
+        print(f"   {'':<20}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'loads/s':>12}")
+        report(f"pool ({args.pool_size} conns)", pool_latencies, pool_wall)
+        report("shared connection", shared_latencies, shared_wall)
+        print()
+        print("Pool metrics:", pool.metrics())
+        print("=" * 70)
+        pool.close()
+
+    p95_ms = percentile(pool_latencies, 0.95) * 1000
+    if args.max_p95_ms is not None and p95_ms > args.max_p95_ms:
+        print(f"❌ Pool p95 {p95_ms:.1f}ms exceeds {args.max_p95_ms}ms")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Dashboard Cards
+Builds the list cards shown by both dashboards as one HTML block per list,
+formatting whole columns at once instead of rendering row by row
+"""
+
+import html
+
+import streamlit as st
+
+# Longer lists are shown as a scrollable table, which only draws visible rows
+MAX_HTML_CARDS = 50
+
+CARD = "padding: 15px; border-radius: 10px; margin-bottom: 10px;"
+TITLE = "<p style='color: white; font-size: 1.1em; margin: 0;'><b>"
+
+
+def _text(series):
+    return series.astype(str).map(html.escape)
+
+
+def _percent(series):
+    return series.map('{:.0%}'.format)
+
+
+def _block(cards):
+    return '\n'.join(cards)
+
+
+def hidden_gem_cards(df):
+    """Cards for hidden gems: name, artist and popularity"""
+    return _block(
+        f"<div style='background: rgba(29, 185, 84, 0.2); {CARD}'>" + TITLE + _text(df['name']) + "</b></p>"
+        + "<p style='color: #1ed760; margin: 5px 0;'>by " + _text(df['artist']) + "</p>"
+        + "<p style='color: #ff6b6b; margin: 0;'>Popularity: " + df['popularity'].astype(str) + "/100</p></div>"
+    )
+
+
+def binge_cards(df):
+    """Cards for binged songs: name, artist and play count"""
+    return _block(
+        f"<div style='background: rgba(255, 107, 107, 0.2); {CARD}'>" + TITLE + _text(df['name']) + "</b></p>"
+        + "<p style='color: #1ed760; margin: 5px 0;'>by " + _text(df['artist']) + "</p>"
+        + "<p style='color: #feca57; margin: 0;'>🔁 Played " + df['plays'].astype(str) + " times</p></div>"
+    )
+
+
+def artist_cards(df):
+    """Cards for top artists: rank, name, popularity and genres"""
+    return _block(
+        f"<div style='background: rgba(29, 185, 84, 0.2); {CARD}'>" + TITLE + "#" + df['rank'].astype(str)
+        + " " + _text(df['name']) + "</b></p>"
+        + "<p style='color: #1ed760; margin: 5px 0;'>Popularity: " + df['popularity'].astype(str) + "/100</p>"
+        + "<p style='color: #48dbfb; margin: 0;'>Genres: " + _text(df['genres']) + "</p></div>"
+    )
+
+
+def emotion_cards(df, name_column='name'):
+    """Track cards with their happiness and energy, two columns per row"""
+    rows = (
+        "<div style='display: grid; grid-template-columns: 2fr 1fr; gap: 1rem;'>"
+        + f"<div style='background: rgba(29, 185, 84, 0.2); {CARD}'>" + TITLE + _text(df[name_column]) + "</b></p>"
+        + "<p style='color: #1ed760; margin: 5px 0;'>by " + _text(df['artist']) + "</p></div>"
+        + f"<div style='background: rgba(0,0,0,0.3); {CARD}'>"
+        + "<p style='color: #ff6b6b; margin: 0;'>😊 " + _percent(df['valence']) + "</p>"
+        + "<p style='color: #48dbfb; margin: 0;'>⚡ " + _percent(df['energy']) + "</p></div></div>"
+    )
+    return _block(rows)
+
+
+def render_cards(df, build, table_columns):
+    """Show ``df`` as one block of cards, or as a table when the list is long"""
+    if len(df) > MAX_HTML_CARDS:
+        st.dataframe(df[table_columns], hide_index=True, use_container_width=True)
+    else:
+        st.markdown(build(df), unsafe_allow_html=True)
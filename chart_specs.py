@@ -0,0 +1,105 @@
+"""
+Pre-rendered Chart Specs
+Renders every database dashboard chart once per export and stores the
+Plotly JSON in the chart_specs table, so viewers load ready-made figures
+instead of rebuilding them on each rerun
+"""
+
+import pandas as pd
+
+from timing import record
+
+
+def emotional_averages(audio_features):
+    """One-row frame of average mood features, the emotional radar input"""
+    return pd.DataFrame([{
+        'valence': audio_features['valence'].mean(),
+        'energy': audio_features['energy'].mean(),
+        'danceability': audio_features['danceability'].mean(),
+        'acousticness': audio_features['acousticness'].mean(),
+    }])
+
+
+def emotional_scatter_frame(audio_features):
+    """Audio features shaped for the emotional scatter"""
+    scatter_df = audio_features[['valence', 'energy', 'danceability', 'track_name', 'artist']].copy()
+    scatter_df.columns = ['valence', 'energy', 'danceability', 'name', 'artist']
+    return scatter_df
+
+
+def _has_audio_features(data):
+    return len(data['audio_features']) > 0
+
+
+# Chart name -> (datasets it needs, builder, condition). Dataset keys are the
+# dashboard keys used by the snapshot and main_from_db.py.
+DASHBOARD_CHARTS = {
+    'diversity_gauge': (['diversity'], lambda viz, d: viz.create_diversity_gauge(d['diversity']), None),
+    'top_artists': (['top_artists'], lambda viz, d: viz.create_top_artists_chart(d['top_artists']), None),
+    'genres': (['genres'], lambda viz, d: viz.create_genre_chart(d['genres']), None),
+    'emotional_radar': (['audio_features'],
+                        lambda viz, d: viz.create_emotional_radar(emotional_averages(d['audio_features'])),
+                        _has_audio_features),
+    'emotional_scatter': (['audio_features'],
+                          lambda viz, d: viz.create_emotional_scatter(emotional_scatter_frame(d['audio_features'])),
+                          _has_audio_features),
+    'hidden_gems': (['hidden_gems'], lambda viz, d: viz.create_hidden_gems_chart(d['hidden_gems']), None),
+    'binge': (['binge_listening'], lambda viz, d: viz.create_binge_chart(d['binge_listening']), None),
+    'listening_heatmap': (['listening_heatmap'], lambda viz, d: viz.create_listening_heatmap(d['listening_heatmap']), None),
+    'listening_hours': (['listening_hours'], lambda viz, d: viz.create_listening_hours_chart(d['listening_hours']), None),
+}
+
+
+def render_chart_specs(datasets, viz=None):
+    """Render every chart whose datasets are present; returns ``{chart: json}``"""
+    if viz is None:
+        from visualizer import Visualizer
+        viz = Visualizer(cache_size=0)
+    specs = {}
+    for chart, (needs, build, condition) in DASHBOARD_CHARTS.items():
+        if any(key not in datasets for key in needs):
+            continue
+        if condition is not None and not condition(datasets):
+            continue
+        try:
+            specs[chart] = build(viz, datasets).to_json()
+        except Exception as e:
+            print(f"⚠️  Could not render {chart}: {e}")
+    return specs
+
+
+def write_chart_specs(conn, run_id, specs):
+    """Replace the stored specs with this run's in one transaction"""
+    with conn:
+        conn.execute("DELETE FROM chart_specs")
+        conn.executemany(
+            "INSERT INTO chart_specs (run_id, chart, spec) VALUES (?, ?, ?)",
+            [(run_id, chart, spec) for chart, spec in specs.items()],
+        )
+
+
+def latest_chart_run(pool):
+    """Run id of the stored specs, or None"""
+    df = pool.read_sql("SELECT run_id FROM chart_specs LIMIT 1")
+    return df['run_id'][0] if len(df) else None
+
+
+def load_chart_specs(pool, run_id):
+    """Return ``{chart: json}`` for one export run"""
+    df = pool.read_sql("SELECT chart, spec FROM chart_specs WHERE run_id = ?", (run_id,))
+    return dict(zip(df['chart'], df['spec']))
+
+
+def spec_figure(viz, run_id, chart, spec):
+    """Figure for a stored spec, parsed once per run through the figure cache"""
+    key = ('chart_spec', run_id, chart)
+    with record('chart', f"{chart} (pre-rendered)"):
+        figure = viz.figure_cache.get(key)
+        if figure is None:
+            viz.figure_cache.put(key, spec)
+            figure = viz.figure_cache.get(key)
+        if figure is None:
+            # Figure cache disabled
+            import plotly.io as pio
+            figure = pio.from_json(spec, skip_invalid=True)
+    return figure
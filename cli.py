@@ -0,0 +1,95 @@
+"""
+Spotify Insights Command Line
+One entry point for every script. A subcommand only imports its own module
+when it runs, so pandas, plotly, spotipy and streamlit load only for the
+commands that need them and quick ones like ``view`` start in tens of
+milliseconds.
+
+Usage:
+    python cli.py                                    # list commands
+    python cli.py export --formats csv,sqlite        # any script's own options
+    python cli.py export-db --daemon --plays-every 10
+    python cli.py view top_artists --limit 5
+    python cli.py dashboard --db                     # database dashboard
+"""
+
+import argparse
+import os
+import runpy
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Command -> (module run as __main__, description)
+COMMANDS = {
+    'export': ('export_all', "Export to several formats in one API pass (--formats, --fresh)"),
+    'export-db': ('export_to_database', "Export to SQLite (--daemon keeps it synced)"),
+    'export-csv': ('export_to_csv', "Export to CSV files"),
+    'export-parquet': ('export_to_parquet', "Export to partitioned Parquet"),
+    'daemon': ('export_daemon', "Sync new plays every 20 min and run a daily full export"),
+    'view': ('view_database', "Show the database tables"),
+    'validate': ('validate_data', "Validate the data processor against mock data"),
+    'test': ('run_tests', "Run the tests (--perf for the performance gate)"),
+    'bench': ('benchmarks.benchmark_suite', "Run the benchmark suite"),
+    'api-server': ('tests.spotify_api_server', "Start the local Spotify API stand-in"),
+}
+
+# dashboard flag -> Streamlit script
+DASHBOARDS = {
+    'live': 'main.py',
+    'db': 'main_from_db.py',
+    'dev': 'dev_mode.py',
+}
+
+
+def run_script(module, args):
+    """Run ``module`` as if started with ``python <module>.py <args>``"""
+    sys.argv = [module, *args]
+    runpy.run_module(module, run_name='__main__', alter_sys=True)
+    return 0
+
+
+def run_dashboard(args):
+    """Start a Streamlit dashboard; unknown options go to ``streamlit run``"""
+    import subprocess
+
+    parser = argparse.ArgumentParser(prog='cli.py dashboard', description="Start a dashboard")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--db', dest='dashboard', action='store_const', const='db',
+                       help="Dashboard over the exported database")
+    group.add_argument('--dev', dest='dashboard', action='store_const', const='dev',
+                       help="Dashboard on mock data, no Spotify account needed")
+    options, streamlit_args = parser.parse_known_args(args)
+    script = os.path.join(ROOT, DASHBOARDS[options.dashboard or 'live'])
+    return subprocess.call([sys.executable, '-m', 'streamlit', 'run', script, *streamlit_args])
+
+
+def build_parser():
+    width = max(len(name) for name in COMMANDS)
+    lines = [f"  {name:<{width}}  {description}" for name, (_, description) in COMMANDS.items()]
+    lines.append(f"  {'dashboard':<{width}}  Start the dashboard (--db for the database one, --dev for mock data)")
+    parser = argparse.ArgumentParser(
+        prog='cli.py',
+        description="Spotify Insights: export, view and explore your Spotify data",
+        epilog="commands:\n" + "\n".join(lines) + "\n\nRun 'python cli.py <command> --help' for its options.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('command', choices=[*COMMANDS, 'dashboard'], metavar='command')
+    parser.add_argument('args', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = build_parser()
+    if not argv:
+        parser.print_help()
+        return 0
+    args = parser.parse_args(argv)
+    if args.command == 'dashboard':
+        return run_dashboard(args.args)
+    return run_script(COMMANDS[args.command][0], args.args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
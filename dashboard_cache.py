@@ -0,0 +1,256 @@
+"""
+Dashboard Cache
+Streamlit caching layer for the live dashboard: clients are cached as
+resources, datasets as data keyed by user and time range with a TTL, and
+a background worker refreshes them while the last export is shown
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+
+import streamlit as st
+
+from api_metrics import METRICS_PORT_ENV, retry_after, serve_metrics
+from spotify_client import SpotifyClient, CachingSpotifyClient
+from data_processor import DataProcessor
+from visualizer import Visualizer
+from db_data import load_data_from_db
+from db_pool import ReadConnectionPool
+from snapshot import SNAPSHOT_PATH, Snapshot, snapshot_version
+from play_history import WINDOW_DATASETS, load_plays
+from timing import StageTimer, record
+
+# Top items change slowly; play history changes every few minutes
+DATA_TTL_SECONDS = 30 * 60
+RECENT_TTL_SECONDS = 5 * 60
+# Wait after a failed refresh, doubled per failure in a row (or Retry-After if longer)
+REFRESH_BACKOFF_SECONDS = 30
+MAX_REFRESH_BACKOFF_SECONDS = 30 * 60
+
+# Time range choices shown in the sidebar
+TIME_RANGES = {
+    "Last 4 Weeks": "short_term",
+    "Last 6 Months": "medium_term",
+    "All Time": "long_term",
+}
+
+# Dataset name -> processor call. Ranged datasets depend on the time range.
+RANGED_DATASETS = {
+    'top_artists': lambda p, tr: p.get_top_artists_data(time_range=tr),
+    'genres': lambda p, tr: p.get_genre_distribution(time_range=tr),
+    'emotional': lambda p, tr: p.get_emotional_patterns(time_range=tr),
+    'personality': lambda p, tr: p.get_music_personality(time_range=tr),
+    'diversity': lambda p, tr: p.get_diversity_score(time_range=tr),
+    'hidden_gems': lambda p, tr: p.get_hidden_gems(time_range=tr),
+}
+RECENT_DATASETS = {
+    'listening_hours': lambda p: p.get_listening_hours_data(),
+    'listening_heatmap': lambda p: p.get_listening_heatmap_data(),
+    'binge': lambda p: p.get_binge_listening(),
+}
+
+
+@st.cache_resource
+def get_resources():
+    """Create the Spotify client, processor and visualizer once per server"""
+    # API responses share the dataset TTL so an expired dataset refetches
+    client = SpotifyClient()
+    port = os.getenv(METRICS_PORT_ENV)
+    if port:
+        serve_metrics(client.metrics, int(port))
+    spotify = CachingSpotifyClient(client, ttl=RECENT_TTL_SECONDS)
+    return spotify, DataProcessor(spotify), Visualizer()
+
+
+@st.cache_resource
+def get_user_id(_spotify):
+    """Spotify user id, used to key cached datasets"""
+    return _spotify.sp.current_user()['id']
+
+
+@st.cache_data(ttl=DATA_TTL_SECONDS, show_spinner=False)
+def _load_ranged(name, user_id, time_range, _processor):
+    return RANGED_DATASETS[name](_processor, time_range)
+
+
+@st.cache_data(ttl=RECENT_TTL_SECONDS, show_spinner=False)
+def _load_recent(name, user_id, _processor):
+    return RECENT_DATASETS[name](_processor)
+
+
+def load_dataset(name, user_id, time_range, processor):
+    """Return one dataset from the cache, computing it on a miss"""
+    if name in RECENT_DATASETS:
+        return _load_recent(name, user_id, processor)
+    return _load_ranged(name, user_id, time_range, processor)
+
+
+def refresh(spotify):
+    """Drop every cached dataset and API response"""
+    _load_ranged.clear()
+    _load_recent.clear()
+    spotify.clear()
+
+
+class LiveData:
+    """Latest API datasets for one user and time range.
+
+    Refreshes run on a background thread and swap in a complete set of
+    datasets at once, so readers never see a half-updated mix. After a
+    failed refresh no new one starts until the backoff has passed, so reruns
+    do not pile requests onto an API that is rate limiting or down.
+    """
+
+    def __init__(self, user_id, time_range):
+        self.user_id = user_id
+        self.time_range = time_range
+        self.data = {}
+        self.as_of = None
+        self.version = 0
+        self.error = None
+        self.failures = 0
+        self.retry_at = None  # time.monotonic() before which no refresh starts
+        self.last_timer = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def refreshing(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def is_fresh(self):
+        return self.as_of is not None and (datetime.now() - self.as_of).total_seconds() < RECENT_TTL_SECONDS
+
+    def retry_in(self):
+        """Seconds until a failed refresh may be retried, 0 if it may run now"""
+        if self.retry_at is None:
+            return 0.0
+        return max(0.0, self.retry_at - time.monotonic())
+
+    def invalidate(self):
+        """Mark the data stale; it is still served until the refresh lands"""
+        self.as_of = None
+
+    def refresh_in_background(self, processor):
+        """Start a refresh unless one is already running"""
+        with self._lock:
+            if self.refreshing or self.retry_in() > 0:
+                return
+            self._thread = threading.Thread(target=self._refresh, args=(processor,),
+                                            name=f"live-refresh-{self.time_range}", daemon=True)
+            self._thread.start()
+
+    def _refresh(self, processor):
+        timer = StageTimer()
+        try:
+            with timer.activate():
+                data = {name: load_dataset(name, self.user_id, self.time_range, processor)
+                        for name in list(RANGED_DATASETS) + list(RECENT_DATASETS)}
+        except Exception as e:
+            self.error = e
+            self.failures += 1
+            delay = min(MAX_REFRESH_BACKOFF_SECONDS, REFRESH_BACKOFF_SECONDS * 2 ** (self.failures - 1))
+            self.retry_at = time.monotonic() + max(delay, retry_after(e) or 0)
+            return
+        finally:
+            timer.stop()
+            self.last_timer = timer
+        self.data = data
+        self.as_of = datetime.now()
+        self.error = None
+        self.failures = 0
+        self.retry_at = None
+        self.version += 1
+
+    def wait(self, timeout=None):
+        """Block until the running refresh finishes"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+
+@st.cache_resource
+def get_live_data(user_id, time_range):
+    """One LiveData per user and time range, shared by every session"""
+    return LiveData(user_id, time_range)
+
+
+def prefetch_time_ranges(user_id, processor):
+    """Refresh every time range concurrently so switching ranges is instant"""
+    for time_range in TIME_RANGES.values():
+        live = get_live_data(user_id, time_range)
+        if not live.is_fresh():
+            live.refresh_in_background(processor)
+
+
+# Live dataset name -> name in the export snapshot / database
+PERSISTED_NAMES = {'binge': 'binge_listening', 'emotional': 'audio_features'}
+EMOTIONAL_COLUMNS = ['name', 'artist', 'valence', 'energy', 'danceability', 'acousticness', 'tempo']
+
+
+@st.cache_resource(max_entries=1)
+def _open_snapshot(path, mtime_ns, run_id):
+    return Snapshot(path)
+
+
+@st.cache_resource
+def _get_pool(db_name):
+    return ReadConnectionPool(db_name)
+
+
+def _emotional_from_audio_features(df):
+    """Shape exported audio features like DataProcessor.get_emotional_patterns"""
+    if len(df) == 0 or 'valence' not in df.columns:
+        return df
+    return df.rename(columns={'track_name': 'name'})[EMOTIONAL_COLUMNS].head(20)
+
+
+def load_persisted(names, time_range='medium_term', db_name="spotify_data.db", snapshot_path=SNAPSHOT_PATH):
+    """Read datasets from the last export; returns ``(data, as_of)`` or None.
+
+    Returns None when the export was made for a different time range.
+    """
+    try:
+        version = snapshot_version(snapshot_path)
+        if version is not None:
+            snapshot = _open_snapshot(snapshot_path, *version)
+            get = snapshot.get
+            as_of = snapshot.metadata.get('created_at', '').replace('T', ' ')
+        elif os.path.exists(db_name):
+            pool = _get_pool(db_name)
+            get = lambda name: load_data_from_db(pool, [name])[name]
+            as_of = pool.read_sql("SELECT MAX(export_date) AS as_of FROM top_artists")['as_of'][0]
+        else:
+            return None
+
+        exported = get('top_artists')
+        if 'time_range' in exported.columns and len(exported) and exported['time_range'].iloc[-1] != time_range:
+            return None
+
+        data = {}
+        for name in names:
+            df = get(PERSISTED_NAMES.get(name, name))
+            if name == 'emotional':
+                with record('normalize', 'emotional from audio features'):
+                    df = _emotional_from_audio_features(df)
+            data[name] = df
+        return data, as_of
+    except Exception as e:
+        print(f"Could not read the last export: {e}")
+        return None
+
+
+@st.cache_data(ttl=RECENT_TTL_SECONDS, show_spinner=False)
+def load_window(names, start, end, db_name="spotify_data.db"):
+    """Play-history datasets for a date window, from the exported database.
+
+    Returns ``(data, play_count)`` or None when there is no local history.
+    """
+    if not os.path.exists(db_name):
+        return None
+    plays = load_plays(_get_pool(db_name), start, end)
+    with record('normalize', 'date window'):
+        data = {name: WINDOW_DATASETS[name](plays) for name in names}
+    return data, len(plays)
@@ -2,10 +2,13 @@ import pandas as pd
 from datetime import datetime
 from collections import Counter
 
+from timing import timed
+
 class DataProcessor:
     def __init__(self, spotify_client):
         self.client = spotify_client
     
+    @timed('processor')
     def get_top_artists_data(self, time_range='medium_term'):
         """Process top artists data"""
         artists = self.client.get_top_artists(time_range=time_range)
@@ -20,6 +23,7 @@ class DataProcessor:
             })
         return pd.DataFrame(data)
     
+    @timed('processor')
     def get_listening_hours_data(self):
         """Get listening patterns by hour"""
         recent = self.client.get_recently_played(limit=50)
@@ -34,6 +38,7 @@ class DataProcessor:
             for h in range(24)
         ])
     
+    @timed('processor')
     def get_genre_distribution(self, time_range='medium_term'):
         """Get genre distribution from top artists"""
         artists = self.client.get_top_artists(time_range=time_range)
@@ -47,6 +52,7 @@ class DataProcessor:
             for genre, count in genre_counts.most_common(15)
         ])
     
+    @timed('processor')
     def get_emotional_patterns(self, time_range='medium_term'):
         """Analyze emotional patterns from audio features"""
         try:
@@ -92,6 +98,7 @@ class DataProcessor:
                 'tempo': 120
             }])
     
+    @timed('processor')
     def get_listening_heatmap_data(self):
         """Get data for day/hour heatmap"""
         recent = self.client.get_recently_played(limit=50)
@@ -111,6 +118,7 @@ class DataProcessor:
         heatmap_data = df.groupby(['day_num', 'day', 'hour']).size().reset_index(name='plays')
         return heatmap_data
 
+    @timed('processor')
     def get_music_personality(self, time_range='medium_term'):
         """Determine music personality type based on audio features"""
         try:
@@ -169,6 +177,7 @@ class DataProcessor:
                 'tempo': 120
             }
     
+    @timed('processor')
     def get_hidden_gems(self, time_range='medium_term'):
         """Find hidden gems - songs you love but aren't popular"""
         try:
@@ -192,6 +201,7 @@ class DataProcessor:
             print(f"Error finding hidden gems: {e}")
             return pd.DataFrame()
     
+    @timed('processor')
     def get_binge_listening(self):
         """Detect songs played on repeat"""
         try:
@@ -226,6 +236,7 @@ class DataProcessor:
             print(f"Error detecting binge listening: {e}")
             return pd.DataFrame()
     
+    @timed('processor')
     def get_diversity_score(self, time_range='medium_term'):
         """Calculate music diversity score (0-100)"""
         try:
@@ -0,0 +1,38 @@
+"""
+Dashboard Data from SQLite
+Queries the database dashboard runs, shared with the load tests
+"""
+
+import pandas as pd
+
+# Fixed SQL text so pooled connections reuse their prepared statements
+DASHBOARD_QUERIES = {
+    'top_artists': "SELECT * FROM top_artists ORDER BY rank",
+    'top_tracks': "SELECT * FROM top_tracks ORDER BY rank",
+    'genres': "SELECT * FROM genres ORDER BY count DESC",
+    'recently_played': "SELECT * FROM recently_played ORDER BY played_at DESC",
+    'listening_hours': "SELECT * FROM listening_patterns ORDER BY hour",
+    'listening_heatmap': "SELECT * FROM listening_heatmap",
+    'personality': "SELECT * FROM music_personality ORDER BY id DESC LIMIT 1",
+    'diversity': "SELECT * FROM diversity_score ORDER BY id DESC LIMIT 1",
+    'hidden_gems': "SELECT * FROM hidden_gems",
+    'binge_listening': "SELECT * FROM binge_listening ORDER BY plays DESC",
+    'audio_features': "SELECT * FROM audio_features",
+}
+
+# Datasets the dashboards use as a single record rather than a table
+RECORD_DATASETS = {'personality', 'diversity'}
+
+
+def load_data_from_db(pool, names=None):
+    """Load dashboard datasets through a ReadConnectionPool (all by default)"""
+    data = {}
+    for name in names or DASHBOARD_QUERIES:
+        df = pool.read_sql(DASHBOARD_QUERIES[name])
+        data[name] = df.to_dict('records')[0] if name in RECORD_DATASETS else df
+
+    # Check if audio_features has data
+    if 'audio_features' in data and len(data['audio_features']) == 0:
+        data['audio_features'] = pd.DataFrame()
+
+    return data
@@ -0,0 +1,147 @@
+"""
+Read Connection Pool
+Thread-safe pool of read-only SQLite connections for the database dashboard
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from timing import count, record
+
+
+class ReadConnectionPool:
+    """Hand out read-only SQLite connections, one thread at a time.
+
+    Connections are opened lazily up to ``max_connections`` with
+    ``mode=ro``, so the dashboard can never write to the database. A
+    checked-out connection belongs to one thread until it is returned, and
+    callers wait in arrival order when every connection is busy. Each
+    connection keeps a compiled statement cache, so queries that reuse the
+    same SQL text skip re-preparing. Readers do not block the exporter as
+    long as the database is in WAL mode, which
+    ``export_to_database.create_database`` enables.
+    """
+
+    def __init__(self, db_name="spotify_data.db", max_connections=4, timeout=30.0,
+                 cached_statements=128, latency_window=1000):
+        self.db_name = db_name
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self._idle = []
+        self._waiters = deque()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._latencies = deque(maxlen=latency_window)
+        self._stats = {'checkouts': 0, 'waits': 0, 'wait_seconds': 0.0, 'queries': 0, 'errors': 0}
+
+    def _open(self):
+        # mode=ro would only say "unable to open database file"
+        if not os.path.exists(self.db_name):
+            raise FileNotFoundError(f"Database file not found: {self.db_name}")
+        conn = sqlite3.connect(
+            f"file:{self.db_name}?mode=ro",
+            uri=True,
+            check_same_thread=False,  # connections move between threads, never shared at once
+            cached_statements=self.cached_statements,
+        )
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+        return conn
+
+    def _checkout(self):
+        with self._lock:
+            self._stats['checkouts'] += 1
+            # Never jump ahead of threads that are already waiting
+            if not self._waiters:
+                if self._idle:
+                    return self._idle.pop()
+                if self._opened < self.max_connections:
+                    self._opened += 1
+                    can_open = True
+                else:
+                    can_open = False
+            else:
+                can_open = False
+            if not can_open:
+                waiter = {'event': threading.Event(), 'conn': None}
+                self._waiters.append(waiter)
+
+        if can_open:
+            try:
+                return self._open()
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+
+        start = time.perf_counter()
+        waiter['event'].wait(self.timeout)
+        with self._lock:
+            self._stats['waits'] += 1
+            self._stats['wait_seconds'] += time.perf_counter() - start
+            if waiter['conn'] is None:
+                self._waiters.remove(waiter)
+                raise TimeoutError(f"No database connection free after {self.timeout}s")
+        return waiter['conn']
+
+    def _checkin(self, conn):
+        with self._lock:
+            if self._waiters:
+                # Hand the connection straight to the longest waiting thread
+                waiter = self._waiters.popleft()
+                waiter['conn'] = conn
+                waiter['event'].set()
+            else:
+                self._idle.append(conn)
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of the ``with`` block"""
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            self._checkin(conn)
+
+    def read_sql(self, sql, params=None):
+        """Run a query on a pooled connection and return a DataFrame"""
+        import pandas as pd
+        count('db_queries')
+        with record('db', ' '.join(sql.split())[:60]), self.connection() as conn:
+            start = time.perf_counter()
+            try:
+                return pd.read_sql_query(sql, conn, params=params)
+            except Exception:
+                with self._lock:
+                    self._stats['errors'] += 1
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self._stats['queries'] += 1
+                    self._latencies.append(elapsed)
+
+    def metrics(self):
+        """Return pool counters and recent query latency percentiles (ms)"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['connections_open'] = self._opened
+            stats['connections_idle'] = len(self._idle)
+            stats['waiting'] = len(self._waiters)
+            latencies = sorted(self._latencies)
+        for name, q in (('p50_ms', 0.50), ('p95_ms', 0.95), ('max_ms', 1.0)):
+            stats[name] = round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 2) if latencies else 0.0
+        return stats
+
+    def close(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+        for conn in idle:
+            conn.close()
@@ -0,0 +1,126 @@
+"""
+Export Spotify Data to Every Format
+Fetches and computes each dataset once, then writes it to all selected sinks
+(CSV, SQLite, JSON, Parquet and the dashboard snapshot) in parallel
+
+A failed export leaves a checkpoint and the next run resumes from it (see
+export_checkpoint.py).
+
+Usage:
+    python export_all.py                      # all formats
+    python export_all.py --formats csv,sqlite
+    python export_all.py --fresh              # ignore any checkpoint
+"""
+
+import argparse
+
+from export_sinks import SINKS, CsvSink
+
+
+def make_sinks(formats, time_range='medium_term'):
+    """Instantiate the sinks for a list of format names"""
+    sinks = []
+    for fmt in formats:
+        if fmt not in SINKS:
+            raise ValueError(f"Unknown export format '{fmt}'. Choose from: {', '.join(SINKS)}")
+        if SINKS[fmt] is CsvSink:
+            sinks.append(CsvSink(time_range=time_range))
+        else:
+            sinks.append(SINKS[fmt]())
+    return sinks
+
+
+def run_export(sinks, client=None, time_range='medium_term', resume=True):
+    """Run one API pass and fan the datasets out to ``sinks``; returns the pipeline.
+
+    With ``resume``, responses saved by a failed run are reused so only its
+    unfinished stages call the API.
+    """
+    # pandas and spotipy load here, not when the module is imported
+    from api_metrics import report_run
+    from spotify_client import SpotifyClient, CachingSpotifyClient
+    from data_processor import DataProcessor
+    from export_checkpoint import ExportCheckpoint
+    from export_datasets import get_export_stages
+    from export_pipeline import ExportPipeline
+    from run_log import log_export_run
+
+    print("🔐 Connecting to Spotify...")
+    client = client or SpotifyClient()
+    # The daemon reuses its client, so count this run's API calls separately
+    metrics = getattr(client, 'metrics', None)
+    run_metrics = metrics.begin_run() if metrics is not None else None
+    spotify = CachingSpotifyClient(client)
+    processor = DataProcessor(spotify)
+    print("✅ Connected successfully!")
+    print()
+
+    checkpoint = ExportCheckpoint(spotify, time_range)
+    if resume:
+        finished = checkpoint.resume()
+        if finished:
+            print(f"♻️  Resuming from {checkpoint.path}: {len(finished)} stages already fetched "
+                  f"({', '.join(finished)})")
+            print()
+    stages = get_export_stages(spotify, processor, time_range)
+    pipeline = ExportPipeline(checkpoint.wrap(stages), sinks)
+    error = None
+    try:
+        pipeline.run()
+        checkpoint.clear()
+        pipeline.print_timings()
+    except Exception as e:
+        error = e
+        print(f"💾 {len(checkpoint.stages)}/{len(stages)} stages saved to {checkpoint.path}; "
+              "run the export again to resume")
+        raise
+    finally:
+        # Also on failure - a rate-limited run is when the breakdown matters
+        if run_metrics is not None:
+            metrics.end_run(run_metrics)
+        report_run(client, run_metrics)
+        log_export_run(pipeline, run_metrics, error)
+    return pipeline
+
+
+def main(formats=None, time_range='medium_term', client=None, resume=True):
+    """Export all datasets to the requested formats"""
+    formats = formats or list(SINKS)
+    print("=" * 60)
+    print(f"🎵 SPOTIFY DATA EXPORT ({', '.join(formats).upper()})")
+    print("=" * 60)
+    print()
+
+    try:
+        run_export(make_sinks(formats, time_range), client=client, time_range=time_range, resume=resume)
+
+        print()
+        print("=" * 60)
+        print("✅ EXPORT COMPLETED SUCCESSFULLY!")
+        print("=" * 60)
+
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print("❌ ERROR OCCURRED")
+        print("=" * 60)
+        print(f"Error: {str(e)}")
+        import traceback
+        print("\nTechnical details:")
+        print(traceback.format_exc())
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Export Spotify data to several formats in one API pass")
+    parser.add_argument('--formats', default=','.join(SINKS),
+                        help=f"Comma-separated list of formats ({', '.join(SINKS)})")
+    parser.add_argument('--time-range', default='medium_term',
+                        choices=['short_term', 'medium_term', 'long_term'])
+    parser.add_argument('--fresh', action='store_true', help="Ignore the checkpoint of a failed export")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(formats=[f.strip() for f in args.formats.split(',') if f.strip()], time_range=args.time_range,
+         resume=not args.fresh)
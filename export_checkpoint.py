@@ -0,0 +1,125 @@
+"""
+Export Checkpoints
+Lets a failed export (say, rate limited while fetching audio features) resume
+instead of starting over. As each stage finishes, it is recorded in
+export_checkpoint.jsonl together with the API responses fetched since the
+previous stage (recently played cursors included). The next run replays
+those responses, so only the stages that had not finished call the API
+again, and the sinks then write the whole export in one go.
+
+The file is append-only, so a stage costs one small write and a crash can
+at worst truncate its last line, which is skipped on load. It is removed once
+an export succeeds, and ignored when older than CHECKPOINT_MAX_AGE or made
+for another time range.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+CHECKPOINT_PATH = "export_checkpoint.jsonl"
+CHECKPOINT_MAX_AGE = 6 * 60 * 60  # seconds; older responses are refetched
+
+
+class ExportCheckpoint:
+    """Stage progress and cached API responses for one export"""
+
+    def __init__(self, client, time_range='medium_term', path=CHECKPOINT_PATH):
+        self.client = client  # CachingSpotifyClient whose responses are saved
+        self.time_range = time_range
+        self.path = path
+        self.created_at = datetime.now()
+        self.stages = {}
+        self._saved_responses = set()
+        self._saved_features = set()
+        self._started = False
+        self._lock = threading.Lock()
+
+    def _read(self):
+        """``(header, created_at, entries)`` from the checkpoint file, or None"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                lines = f.read().splitlines()
+            header = json.loads(lines[0])
+            created_at = datetime.fromisoformat(header['created_at'])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, IndexError) as e:
+            print(f"⚠️  Ignoring unreadable checkpoint {self.path}: {e}")
+            return None
+        entries = []
+        for line in lines[1:]:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                break  # cut off mid-write
+        return header, created_at, entries
+
+    def resume(self):
+        """Load a usable checkpoint into the client; returns the finished stage names"""
+        checkpoint = self._read()
+        if checkpoint is None:
+            return []
+        header, created_at, entries = checkpoint
+        if header.get('time_range') != self.time_range:
+            print(f"ℹ️  Ignoring checkpoint for time range {header.get('time_range')}")
+            return []
+        if (datetime.now() - created_at).total_seconds() > CHECKPOINT_MAX_AGE:
+            print(f"ℹ️  Ignoring checkpoint from {created_at:%Y-%m-%d %H:%M} (too old)")
+            return []
+
+        responses, features = [], {}
+        for entry in entries:
+            if 'response' in entry:
+                responses.append(entry['response'])
+            features.update(entry.get('audio_features', {}))
+            if 'stage' in entry:
+                self.stages[entry['stage']] = {'rows': entry['rows'], 'finished_at': entry['finished_at']}
+        self.client.restore({'responses': responses, 'audio_features': features})
+        self._saved_responses = {tuple(key) for key, _ in responses}
+        self._saved_features = set(features)
+        self.created_at = created_at
+        self._started = True  # keep appending to this file
+        return list(self.stages)
+
+    def stage_done(self, name, df):
+        """Record a finished stage and the responses fetched since the last one"""
+        finished_at = datetime.now().isoformat(timespec='seconds')
+        with self._lock:
+            cached = self.client.cached_responses()
+            responses = [[key, result] for key, result in cached['responses']
+                         if tuple(key) not in self._saved_responses]
+            features = {tid: feature for tid, feature in cached['audio_features'].items()
+                        if tid not in self._saved_features}
+            with open(self.path, 'a' if self._started else 'w', encoding='utf-8') as f:
+                if not self._started:
+                    f.write(json.dumps({'created_at': self.created_at.isoformat(timespec='seconds'),
+                                        'time_range': self.time_range}) + '\n')
+                # One line per response keeps each serialized string small
+                for response in responses:
+                    f.write(json.dumps({'response': response}, ensure_ascii=False) + '\n')
+                # The stage line goes last: a stage only counts once its responses are saved
+                f.write(json.dumps({'stage': name, 'rows': len(df), 'finished_at': finished_at,
+                                    'audio_features': features}, ensure_ascii=False) + '\n')
+            self._started = True
+
+            self.stages[name] = {'rows': len(df), 'finished_at': finished_at}
+            self._saved_responses.update(tuple(key) for key, _ in responses)
+            self._saved_features.update(features)
+
+    def wrap(self, stages):
+        """Export stages that checkpoint themselves when they finish"""
+        def checkpointed(name, fetch):
+            def run():
+                df = fetch()
+                self.stage_done(name, df)
+                return df
+            return run
+        return [(name, checkpointed(name, fetch)) for name, fetch in stages]
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,296 @@
+"""
+Export Daemon
+Keeps the SQLite database current without re-exporting everything. The
+Spotify API only remembers the last 50 plays, so new plays are synced every
+20 minutes; top items, audio features and the other datasets change slowly
+and get a full export once a day.
+
+Each job runs on its own jittered schedule and backs off exponentially when
+it fails (honouring Retry-After on rate limits). A pidfile keeps a second
+daemon from starting, and SIGINT/SIGTERM stop it after the running job.
+
+Usage:
+    python export_to_database.py --daemon
+    python export_to_database.py --daemon --plays-every 10 --top-every 12
+"""
+
+import argparse
+import os
+import random
+import signal
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+from api_metrics import retry_after
+from export_to_database import create_database, create_tables, insert_new_plays, latest_play_cursor
+
+DEFAULT_PIDFILE = "export_daemon.pid"
+PLAYS_INTERVAL = 20 * 60      # seconds between recently played syncs
+TOP_INTERVAL = 24 * 60 * 60   # seconds between full exports
+JITTER = 0.1                  # +/- share of each delay
+BACKOFF_BASE = 60             # first retry delay after a failure
+MAX_BACKOFF = 60 * 60
+SNAPSHOT_PLAYS = 50           # plays kept in the dashboard snapshot, as a full export writes
+
+
+class AlreadyRunning(RuntimeError):
+    pass
+
+
+def _pid_alive(pid):
+    if os.name == 'nt':
+        # os.kill(pid, 0) sends CTRL_C_EVENT on Windows; assume the daemon is alive
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class PidLock:
+    """Single-instance lock: a pidfile created with O_EXCL.
+
+    A pidfile left behind by a daemon that died is detected by its pid and
+    replaced.
+    """
+
+    def __init__(self, path=DEFAULT_PIDFILE):
+        self.path = path
+        self.acquired = False
+
+    def _read_pid(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def acquire(self):
+        for _ in range(2):
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                pid = self._read_pid()
+                if pid and _pid_alive(pid):
+                    raise AlreadyRunning(f"Export daemon already running (pid {pid}, {self.path})")
+                print(f"🧹 Removing stale pidfile {self.path}")
+                try:
+                    os.remove(self.path)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(f"{os.getpid()}\n")
+            self.acquired = True
+            return self
+        raise AlreadyRunning(f"Could not create {self.path}")
+
+    def release(self):
+        if self.acquired and self._read_pid() == os.getpid():
+            os.remove(self.path)
+        self.acquired = False
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class Job:
+    """A task run every ``interval`` seconds, retried with backoff when it fails"""
+
+    def __init__(self, name, interval, run, jitter=JITTER, max_backoff=MAX_BACKOFF, first_run=0.0, rng=None):
+        self.name = name
+        self.interval = interval
+        self.run = run
+        self.jitter = jitter
+        # Never back off for longer than the job would wait anyway
+        self.max_backoff = min(max_backoff, interval)
+        self.rng = rng or random.Random()
+        self.next_run = time.monotonic() + first_run
+        self.failures = 0
+
+    def _jittered(self, seconds):
+        return seconds * self.rng.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def succeeded(self):
+        self.failures = 0
+        self.next_run = time.monotonic() + self._jittered(self.interval)
+
+    def failed(self, error):
+        """Schedule the retry and return its delay in seconds"""
+        self.failures += 1
+        delay = self._jittered(min(self.max_backoff, BACKOFF_BASE * 2 ** (self.failures - 1)))
+        delay = max(delay, retry_after(error) or 0)
+        self.next_run = time.monotonic() + delay
+        return delay
+
+
+class ExportDaemon:
+    """Runs jobs in a loop until stopped by a signal or ``stop()``"""
+
+    def __init__(self, jobs):
+        self.jobs = jobs
+        self.stopping = threading.Event()
+
+    def stop(self, *args):
+        if not self.stopping.is_set():
+            print("\n🛑 Stopping after the current job (signal again to force)...")
+        self.stopping.set()
+        # A second signal gets the default behaviour
+        for signum, handler in getattr(self, '_previous_handlers', {}).items():
+            signal.signal(signum, handler)
+
+    def _install_signal_handlers(self):
+        self._previous_handlers = {}
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            self._previous_handlers[signum] = signal.signal(signum, self.stop)
+
+    def _restore_signal_handlers(self):
+        for signum, handler in self._previous_handlers.items():
+            signal.signal(signum, handler)
+        self._previous_handlers = {}
+
+    def run_job(self, job):
+        started = time.perf_counter()
+        stamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"\n⏰ [{stamp}] {job.name}")
+        try:
+            job.run()
+        except Exception as e:
+            delay = job.failed(e)
+            print(f"❌ {job.name} failed ({job.failures}x): {e}")
+            print(f"   Retrying in {delay / 60:.1f} min")
+            return False
+        job.succeeded()
+        print(f"✅ {job.name} done in {time.perf_counter() - started:.1f}s, "
+              f"next in {(job.next_run - time.monotonic()) / 60:.1f} min")
+        return True
+
+    def run(self):
+        self._install_signal_handlers()
+        try:
+            while not self.stopping.is_set():
+                job = min(self.jobs, key=lambda j: j.next_run)
+                if self.stopping.wait(max(0.0, job.next_run - time.monotonic())):
+                    break
+                self.run_job(job)
+        finally:
+            self._restore_signal_handlers()
+        print("👋 Export daemon stopped")
+
+
+def fetch_new_plays(client, after, limit=50, max_pages=20):
+    """Recently played items after the ``after`` cursor (all 50 latest if None)"""
+    items = []
+    for _ in range(max_pages):
+        page = client.get_recently_played(limit=limit, after=after)
+        items.extend(page['items'])
+        cursors = page.get('cursors') or {}
+        if after is None or len(page['items']) < limit or not cursors.get('after'):
+            break
+        after = int(cursors['after'])
+    return items
+
+
+def sync_recent_plays(client, db_name="spotify_data.db", snapshot_path=None):
+    """Store plays newer than the newest stored one and refresh the snapshot's plays"""
+    import pandas as pd
+    from export_datasets import plays_frame
+    from snapshot import SNAPSHOT_PATH, update_snapshot
+
+    conn = sqlite3.connect(db_name, timeout=30)
+    try:
+        after = latest_play_cursor(conn)
+        items = fetch_new_plays(client, after)
+        if after is None and len(items) >= 50:
+            print("⚠️  No stored plays yet; only the last 50 are available")
+        with conn:
+            inserted = insert_new_plays(conn, plays_frame(items))
+        print(f"🎧 {inserted} new plays stored")
+        if inserted:
+            latest = pd.read_sql_query(
+                "SELECT played_at, track_name, artist, album, duration_min, day_of_week, hour, spotify_url "
+                "FROM recently_played ORDER BY played_at DESC LIMIT ?", conn, params=(SNAPSHOT_PLAYS,))
+            if update_snapshot({'recently_played': latest}, snapshot_path or SNAPSHOT_PATH):
+                print(f"⚡ Dashboard snapshot updated with the latest {len(latest)} plays")
+    finally:
+        conn.close()
+    return inserted
+
+
+def full_export(client, db_name="spotify_data.db"):
+    """A full database export (top items, features, patterns, snapshot and charts)"""
+    from export_all import run_export
+    from export_to_database import database_sinks
+    run_export(database_sinks(db_name), client=client)
+
+
+def last_full_export_age(db_name="spotify_data.db"):
+    """Seconds since the last successful full export in export_runs, or None"""
+    conn = sqlite3.connect(db_name, timeout=30)
+    try:
+        finished = conn.execute(
+            "SELECT MAX(finished_at) FROM export_runs WHERE status = 'success'").fetchone()[0]
+    finally:
+        conn.close()
+    if not finished:
+        return None
+    return (datetime.now() - datetime.fromisoformat(finished)).total_seconds()
+
+
+def make_jobs(client, db_name="spotify_data.db", plays_interval=PLAYS_INTERVAL, top_interval=TOP_INTERVAL):
+    """The recently played and full export jobs; the export waits if one ran recently"""
+    age = last_full_export_age(db_name)
+    first_export = 0.0 if age is None else max(0.0, top_interval - age)
+    return [
+        Job("Recently played sync", plays_interval, lambda: sync_recent_plays(client, db_name)),
+        Job("Full export", top_interval, lambda: full_export(client, db_name), first_run=first_export),
+    ]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Keep the Spotify database current with scheduled incremental syncs")
+    parser.add_argument('--plays-every', type=float, default=PLAYS_INTERVAL / 60,
+                        help="Minutes between recently played syncs (default 20)")
+    parser.add_argument('--top-every', type=float, default=TOP_INTERVAL / 3600,
+                        help="Hours between full exports of top items and the other datasets (default 24)")
+    parser.add_argument('--db', default="spotify_data.db", help="SQLite database file")
+    parser.add_argument('--pidfile', default=DEFAULT_PIDFILE, help="Single-instance lock file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None, client=None):
+    args = parse_args(argv)
+    print("=" * 60)
+    print("🔁 SPOTIFY EXPORT DAEMON")
+    print("=" * 60)
+    print(f"   Recently played every {args.plays_every:g} min, full export every {args.top_every:g} h")
+    try:
+        with PidLock(args.pidfile):
+            print(f"🔒 Lock: {args.pidfile} (pid {os.getpid()})")
+            conn = create_database(args.db)
+            create_tables(conn)
+            conn.close()
+            if client is None:
+                from spotify_client import SpotifyClient
+                client = SpotifyClient()
+            jobs = make_jobs(client, args.db, args.plays_every * 60, args.top_every * 3600)
+            ExportDaemon(jobs).run()
+    except AlreadyRunning as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
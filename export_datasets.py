@@ -0,0 +1,136 @@
+"""
+Export Datasets
+Single definition of every dataset the exporters write, shared by all sinks
+"""
+
+import pandas as pd
+from datetime import datetime
+
+# Datasets whose rows describe one Spotify time range
+TIME_RANGE_DATASETS = {'top_artists', 'top_tracks', 'genres', 'audio_features'}
+
+# Datasets that may legitimately come back empty
+OPTIONAL_DATASETS = {'hidden_gems', 'binge_listening'}
+
+
+def build_top_tracks(client, time_range='medium_term'):
+    """Build top tracks data"""
+    tracks = client.get_top_tracks(time_range=time_range)
+
+    data = []
+    for idx, track in enumerate(tracks['items']):
+        data.append({
+            'rank': idx + 1,
+            'name': track['name'],
+            'artist': track['artists'][0]['name'],
+            'album': track['album']['name'],
+            'popularity': track['popularity'],
+            'duration_ms': track['duration_ms'],
+            'duration_min': round(track['duration_ms'] / 60000, 2),
+            'release_date': track['album']['release_date'],
+            'spotify_url': track['external_urls']['spotify']
+        })
+
+    return pd.DataFrame(data)
+
+
+def build_recently_played(client):
+    """Build recently played tracks"""
+    recent = client.get_recently_played(limit=50)
+    return plays_frame(recent['items'])
+
+
+def plays_frame(items):
+    """One row per recently played item"""
+    data = []
+    for item in items:
+        played_at = datetime.fromisoformat(item['played_at'].replace('Z', '+00:00'))
+        data.append({
+            'played_at': played_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'track_name': item['track']['name'],
+            'artist': item['track']['artists'][0]['name'],
+            'album': item['track']['album']['name'],
+            'duration_min': round(item['track']['duration_ms'] / 60000, 2),
+            'day_of_week': played_at.strftime('%A'),
+            'hour': played_at.hour,
+            'spotify_url': item['track']['external_urls']['spotify']
+        })
+
+    return pd.DataFrame(data)
+
+
+def build_audio_features(client, time_range='medium_term'):
+    """Build audio features of top tracks"""
+    tracks = client.get_top_tracks(time_range=time_range)
+    track_ids = [track['id'] for track in tracks['items'][:50]]
+    features = client.get_audio_features(track_ids)
+
+    data = []
+    for track, feature in zip(tracks['items'][:50], features):
+        if feature:
+            data.append({
+                'track_name': track['name'],
+                'artist': track['artists'][0]['name'],
+                'popularity': track['popularity'],
+                'danceability': feature['danceability'],
+                'energy': feature['energy'],
+                'key': feature['key'],
+                'loudness': feature['loudness'],
+                'mode': feature['mode'],
+                'speechiness': feature['speechiness'],
+                'acousticness': feature['acousticness'],
+                'instrumentalness': feature['instrumentalness'],
+                'liveness': feature['liveness'],
+                'valence': feature['valence'],
+                'tempo': feature['tempo'],
+                'duration_min': round(feature['duration_ms'] / 60000, 2),
+                'time_signature': feature['time_signature']
+            })
+
+    return pd.DataFrame(data)
+
+
+def _with_audio_features(client, time_range, build):
+    """Fetch the top tracks' audio features before ``build()`` runs.
+
+    The processor falls back to a placeholder row when the API fails, so a
+    rate limit would otherwise be exported as a result; here it fails the
+    stage, which a resumed export retries. The processor then reads the
+    features from the client's cache.
+    """
+    def fetch():
+        tracks = client.get_top_tracks(time_range=time_range)
+        client.get_audio_features([track['id'] for track in tracks['items'][:50]])
+        return build()
+    return fetch
+
+
+def _with_time_range(build, time_range):
+    def fetch():
+        df = build()
+        df['time_range'] = time_range
+        return df
+    return fetch
+
+
+def get_export_stages(client, processor, time_range='medium_term'):
+    """Return (dataset, fetch) pairs for every exported dataset.
+
+    Pass a CachingSpotifyClient (and a DataProcessor built on it) so that
+    datasets sharing an endpoint reuse a single API response.
+    """
+    return [
+        ('top_artists', _with_time_range(lambda: processor.get_top_artists_data(time_range=time_range), time_range)),
+        ('top_tracks', _with_time_range(lambda: build_top_tracks(client, time_range), time_range)),
+        ('genres', _with_time_range(lambda: processor.get_genre_distribution(time_range=time_range), time_range)),
+        ('recently_played', lambda: build_recently_played(client)),
+        ('audio_features', _with_time_range(lambda: build_audio_features(client, time_range), time_range)),
+        ('listening_patterns', processor.get_listening_hours_data),
+        ('listening_heatmap', processor.get_listening_heatmap_data),
+        ('music_personality', _with_audio_features(
+            client, time_range, lambda: pd.DataFrame([processor.get_music_personality(time_range=time_range)]))),
+        ('diversity_score', _with_audio_features(
+            client, time_range, lambda: pd.DataFrame([processor.get_diversity_score(time_range=time_range)]))),
+        ('hidden_gems', lambda: processor.get_hidden_gems(time_range=time_range)),
+        ('binge_listening', processor.get_binge_listening),
+    ]
@@ -0,0 +1,196 @@
+"""
+Staged Export Pipeline
+Runs fetch stages concurrently on a thread pool and streams their results
+through bounded queues to one writer thread per sink
+"""
+
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from timing import StageTimer
+
+_DONE = object()
+
+
+class ExportPipeline:
+    """Overlap Spotify API waits with disk writes.
+
+    ``stages`` is a list of ``(name, fetch)`` pairs where ``fetch()`` returns a
+    DataFrame. Every fetched DataFrame is fanned out to all ``sinks``. A sink
+    must provide ``name``, ``open(run_id)``, ``write(name, df)`` and ``close()``;
+    all three are called from that sink's writer thread only, so a sink may
+    own thread-bound resources such as a SQLite connection. Sinks must not
+    modify the DataFrames they receive since they are shared. A sink may also
+    provide ``output_path()`` (file or folder) for the run log's disk usage,
+    ``prepare()`` for slow work after its last write, and ``abort()``, which
+    is called instead of ``close()`` so the sink can discard what it was given.
+
+    Sinks only close once every writer has finished, one at a time in list
+    order. If any stage, write, ``prepare()`` or earlier ``close()`` failed,
+    every remaining sink is aborted instead, so the outputs of one run are
+    either all kept or all discarded (a close that already succeeded stays).
+    """
+
+    def __init__(self, stages, sinks, max_workers=4, queue_size=4):
+        self.stages = stages
+        self.sinks = sinks
+        self.max_workers = max_workers
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in sinks]
+        self.timings = {name: {'fetch': 0.0, 'wait': 0.0, 'write': 0.0, 'rows': 0,
+                               'started': None, 'finished': None, 'api_calls': 0,
+                               'cache_hits': 0, 'written': {}, 'error': None}
+                        for name, _ in stages}
+        self.sink_timings = {sink.name: 0.0 for sink in sinks}
+        self.run_id = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.errors = []
+        self._lock = threading.Lock()
+        self._written = threading.Barrier(len(sinks) or 1)
+        self._closed = [threading.Event() for _ in sinks]
+
+    def _record(self, name, key, value):
+        with self._lock:
+            self.timings[name][key] += value
+
+    def _run_stage(self, name, fetch):
+        timer = StageTimer()
+        self.timings[name]['started'] = datetime.now()
+        start = time.perf_counter()
+        try:
+            # Counts the API calls this stage makes through CachingSpotifyClient
+            with timer.activate():
+                df = fetch()
+        except Exception as e:
+            self._record(name, 'fetch', time.perf_counter() - start)
+            with self._lock:
+                self.errors.append((name, e))
+                self.timings[name]['error'] = e
+            return
+        finally:
+            self.timings[name]['finished'] = datetime.now()
+            self._record(name, 'api_calls', timer.counters['api_calls'])
+            self._record(name, 'cache_hits', timer.counters['client_cache_hits'])
+        fetched = time.perf_counter()
+        self._record(name, 'fetch', fetched - start)
+        self._record(name, 'rows', len(df))
+
+        # Blocks while a writer is behind - this is the backpressure
+        for q in self.queues:
+            q.put((name, df))
+        self._record(name, 'wait', time.perf_counter() - fetched)
+
+    def _write_loop(self, index, sink, q):
+        try:
+            sink.open(self.run_id)
+        except Exception as e:
+            with self._lock:
+                self.errors.append((sink.name, e))
+            self._drain(q)
+            self._finish(index, sink, opened=False)
+            return
+
+        failed = False
+        while True:
+            item = q.get()
+            if item is _DONE:
+                break
+            if failed:
+                continue
+            name, df = item
+            start = time.perf_counter()
+            try:
+                sink.write(name, df)
+            except Exception as e:
+                with self._lock:
+                    self.errors.append((f"{sink.name}:{name}", e))
+                # Keep consuming so fetch workers never block on a full queue
+                failed = True
+            elapsed = time.perf_counter() - start
+            self._record(name, 'write', elapsed)
+            with self._lock:
+                self.sink_timings[sink.name] += elapsed
+                if not failed:
+                    self.timings[name]['written'][sink.name] = len(df)
+                self.timings[name]['finished'] = datetime.now()
+
+        if not failed and hasattr(sink, 'prepare'):
+            try:
+                sink.prepare()
+            except Exception as e:
+                with self._lock:
+                    self.errors.append((sink.name, e))
+        self._finish(index, sink)
+
+    def _finish(self, index, sink, opened=True):
+        """Close or abort ``sink`` once every writer is done and the sinks before it are closed"""
+        self._written.wait()
+        if index > 0:
+            self._closed[index - 1].wait()
+        with self._lock:
+            failed = bool(self.errors)
+        try:
+            if not opened:
+                pass
+            elif failed and hasattr(sink, 'abort'):
+                sink.abort()
+            else:
+                sink.close()
+        except Exception as e:
+            with self._lock:
+                self.errors.append((sink.name, e))
+        finally:
+            self._closed[index].set()
+
+    def _drain(self, q):
+        while q.get() is not _DONE:
+            pass
+
+    def run(self):
+        """Run all stages and return the per-stage timings.
+
+        Raises the first stage or sink error after every writer has shut down.
+        """
+        self.started_at = datetime.now()
+        started = time.perf_counter()
+        writer_threads = [
+            threading.Thread(target=self._write_loop, args=(index, sink, q),
+                             name=f'export-writer-{sink.name}', daemon=True)
+            for index, (sink, q) in enumerate(zip(self.sinks, self.queues))
+        ]
+        for thread in writer_threads:
+            thread.start()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='export-fetch') as pool:
+            futures = [pool.submit(self._run_stage, name, fetch) for name, fetch in self.stages]
+            for future in futures:
+                future.result()
+
+        for q in self.queues:
+            q.put(_DONE)
+        for thread in writer_threads:
+            thread.join()
+        self.elapsed = time.perf_counter() - started
+        self.finished_at = datetime.now()
+
+        if self.errors:
+            name, error = self.errors[0]
+            print(f"❌ Stage '{name}' failed: {error}")
+            raise error
+        return self.timings
+
+    def print_timings(self):
+        """Print a per-stage timing table"""
+        print("\n" + "=" * 60)
+        print("⏱️  STAGE TIMINGS (seconds)")
+        print("=" * 60)
+        print(f"   {'stage':<22}{'fetch':>8}{'wait':>8}{'write':>8}{'rows':>8}")
+        for name, t in self.timings.items():
+            print(f"   {name:<22}{t['fetch']:>8.2f}{t['wait']:>8.2f}{t['write']:>8.2f}{t['rows']:>8}")
+        for sink_name, seconds in self.sink_timings.items():
+            print(f"   {sink_name} sink: {seconds:.2f}s writing")
+        serial = sum(t['fetch'] + t['write'] for t in self.timings.values())
+        print(f"\n   Wall time: {self.elapsed:.2f}s (serial would be ~{serial:.2f}s)")
+        print("=" * 60)
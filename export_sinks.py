@@ -0,0 +1,406 @@
+"""
+Export Sinks
+Pluggable writers for the export pipeline. Each sink runs on its own writer
+thread, so every resource it opens stays on that thread.
+"""
+
+import os
+import shutil
+import threading
+from datetime import datetime
+
+_print_lock = threading.Lock()
+
+
+def log(message=''):
+    """Print a progress line from a writer thread in one piece"""
+    # print() writes the text and the newline separately, so lines from
+    # concurrent sinks could run together
+    with _print_lock:
+        print(f"{message}\n", end='')
+
+
+def _staging_folder(folder, run_id):
+    """Create the folder a run writes into before ``_publish`` moves its files"""
+    staging = os.path.join(folder, f".run-{run_id}")
+    os.makedirs(staging, exist_ok=True)
+    return staging
+
+
+def _publish(staging, folder):
+    """Move a finished run's files into ``folder``, replacing the previous ones"""
+    for filename in os.listdir(staging):
+        os.replace(os.path.join(staging, filename), os.path.join(folder, filename))
+    os.rmdir(staging)
+
+
+class CsvSink:
+    """Write each dataset to a CSV file plus a summary report.
+
+    Like ``JsonSink``, files go to a folder for this run and ``close()``
+    moves them into place, so a failed export keeps the previous set.
+    """
+
+    name = 'csv'
+
+    def __init__(self, time_range='medium_term'):
+        self.time_range = time_range
+        self.filenames = {
+            'top_artists': f"top_artists_{time_range}.csv",
+            'top_tracks': f"top_tracks_{time_range}.csv",
+            'genres': f"genre_distribution_{time_range}.csv",
+            'recently_played': "recently_played.csv",
+            'audio_features': f"audio_features_{time_range}.csv",
+            'listening_patterns': "listening_by_hour.csv",
+            'listening_heatmap': "listening_heatmap.csv",
+            'music_personality': "music_personality.csv",
+            'diversity_score': "diversity_score.csv",
+            'hidden_gems': "hidden_gems.csv",
+            'binge_listening': "binge_listening.csv",
+        }
+        self.all_data = {}
+        self.folder = None
+        self.staging = None
+
+    def open(self, run_id):
+        from export_to_csv import create_export_folder
+        self.folder = create_export_folder()
+        self.staging = _staging_folder(self.folder, run_id)
+        log(f"📁 Export folder: {self.folder}/")
+
+    def write(self, name, df):
+        from export_datasets import OPTIONAL_DATASETS
+        self.all_data[name] = df
+        if len(df) == 0 and name in OPTIONAL_DATASETS:
+            log(f"ℹ️  No {name.replace('_', ' ')} found")
+            return
+        # The time range is already part of the file name
+        df = df.drop(columns=['time_range'], errors='ignore')
+        df.to_csv(os.path.join(self.staging, self.filenames[name]), index=False)
+        log(f"✅ Saved: {self.folder}/{self.filenames[name]}")
+
+    def output_path(self):
+        return self.folder
+
+    def close(self):
+        from export_to_csv import build_summary
+        build_summary(self.all_data).to_csv(os.path.join(self.staging, "summary_report.csv"), index=False)
+        _publish(self.staging, self.folder)
+        log(f"✅ Saved: {self.folder}/summary_report.csv")
+
+    def abort(self):
+        shutil.rmtree(self.staging, ignore_errors=True)
+        log(f"↩️  Export failed - CSV files in {self.folder}/ left unchanged")
+
+
+class SqliteSink:
+    """Append each dataset to its table in the SQLite database.
+
+    Everything is written in one transaction, committed by ``close()`` and
+    rolled back by ``abort()``, so a failed export leaves no partial rows.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, db_name="spotify_data.db"):
+        self.db_name = db_name
+        self.conn = None
+
+    def open(self, run_id):
+        from export_to_database import create_database, create_tables
+        # Both print; keep their lines apart from the other sinks' output
+        with _print_lock:
+            self.conn = create_database(self.db_name)
+            create_tables(self.conn)
+
+    def write(self, table, df):
+        if len(df) == 0:
+            log(f"ℹ️  No {table} to insert")
+            return
+        from export_to_database import insert_new_plays, insert_rows
+        if table == 'recently_played':
+            log(f"✅ Inserted {insert_new_plays(self.conn, df)} new plays into {table}")
+            return
+        insert_rows(self.conn, table, df)
+        log(f"✅ Inserted {len(df)} rows into {table}")
+
+    def output_path(self):
+        return self.db_name
+
+    def close(self):
+        from export_to_database import print_database_summary
+        self.conn.commit()
+        print_database_summary(self.conn)
+        self.conn.close()
+
+    def abort(self):
+        self.conn.rollback()
+        self.conn.close()
+        log(f"↩️  Export failed - nothing written to {self.db_name}")
+
+
+class JsonSink:
+    """Write each dataset as a JSON array of records.
+
+    Files are written to a folder for this run and only moved into place by
+    ``close()``, so a failed export leaves the previous files untouched.
+    """
+
+    name = 'json'
+
+    def __init__(self, folder="spotify_exports/json"):
+        self.folder = folder
+        self.staging = None
+
+    def open(self, run_id):
+        self.staging = _staging_folder(self.folder, run_id)
+        log(f"📁 JSON folder: {self.folder}/")
+
+    def write(self, name, df):
+        df.to_json(os.path.join(self.staging, f"{name}.json"), orient='records', indent=2, force_ascii=False)
+        log(f"✅ Saved: {self.folder}/{name}.json")
+
+    def output_path(self):
+        return self.folder
+
+    def close(self):
+        _publish(self.staging, self.folder)
+
+    def abort(self):
+        shutil.rmtree(self.staging, ignore_errors=True)
+        log(f"↩️  Export failed - {self.folder}/ left unchanged")
+
+
+# Explicit Parquet column types. Low-cardinality text is dictionary encoded.
+PARQUET_COLUMN_TYPES = {
+    'rank': 'int16',
+    'name': 'string',
+    'track_name': 'string',
+    'genres': 'string',
+    'genre': 'dictionary',
+    'artist': 'dictionary',
+    'album': 'dictionary',
+    'popularity': 'int8',
+    'followers': 'int64',
+    'duration_ms': 'int32',
+    'duration_min': 'float64',
+    'release_date': 'string',
+    'spotify_url': 'string',
+    'image': 'string',
+    'count': 'int32',
+    'played_at': 'timestamp',
+    'day_of_week': 'dictionary',
+    'day': 'dictionary',
+    'day_num': 'int8',
+    'hour': 'int8',
+    'plays': 'int32',
+    'key': 'int8',
+    'mode': 'int8',
+    'time_signature': 'int8',
+    'personality': 'dictionary',
+    'description': 'dictionary',
+    'level': 'dictionary',
+    'message': 'dictionary',
+    'score': 'int16',
+    'unique_genres': 'int32',
+    'unique_artists': 'int32',
+    'genre_score': 'int16',
+    'artist_score': 'int16',
+    'variance_score': 'int16',
+}
+
+
+class ParquetSink:
+    """Write each dataset as typed, compressed, Hive-partitioned Parquet.
+
+    Layout under ``folder``::
+
+        <dataset>/time_range=<range>/export_date=<YYYY-MM-DD>/part-<run_id>.parquet
+        <dataset>/export_date=<YYYY-MM-DD>/part-<run_id>.parquet
+        recently_played/month=<YYYY-MM>/part-<run_id>.parquet
+
+    Every run adds new part files, so earlier exports are never rewritten,
+    and ``abort()`` removes the files of a failed run. Play history is
+    partitioned by the month it was played in, and plays that are already
+    stored are skipped, so history accumulates without duplicates.
+    ``pyarrow.parquet.read_table(folder + '/<dataset>')`` reads a dataset back
+    with its partition columns.
+    """
+
+    name = 'parquet'
+
+    def __init__(self, folder="spotify_exports/parquet", compression='zstd'):
+        self.folder = folder
+        self.compression = compression
+        self.pa = None
+        self.pq = None
+        self.written = []
+
+    def open(self, run_id):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export requires pyarrow: pip install pyarrow")
+        self.pa, self.pq = pa, pq
+        self.export_date = datetime.now().strftime('%Y-%m-%d')
+        self.part_name = f"part-{run_id}.parquet"
+        os.makedirs(self.folder, exist_ok=True)
+        log(f"📁 Parquet folder: {self.folder}/")
+
+    def _arrow_type(self, column):
+        kind = PARQUET_COLUMN_TYPES.get(column)
+        if kind is None:
+            return None
+        if kind == 'dictionary':
+            return self.pa.dictionary(self.pa.int32(), self.pa.string())
+        if kind == 'timestamp':
+            return self.pa.timestamp('s')
+        return getattr(self.pa, kind)()
+
+    def _to_table(self, df):
+        fields = []
+        for column in df.columns:
+            arrow_type = self._arrow_type(column)
+            if arrow_type is None:
+                arrow_type = self.pa.Array.from_pandas(df[column]).type
+            fields.append(self.pa.field(column, arrow_type))
+        return self.pa.Table.from_pandas(df, schema=self.pa.schema(fields), preserve_index=False)
+
+    def _write_part(self, directory, df):
+        os.makedirs(directory, exist_ok=True)
+        filename = os.path.join(directory, self.part_name)
+        self.written.append(filename)
+        self.pq.write_table(self._to_table(df), filename, compression=self.compression)
+        return filename
+
+    def _write_play_history(self, df):
+        import pandas as pd
+        df = df.assign(played_at=pd.to_datetime(df['played_at']))
+        months = df['played_at'].dt.strftime('%Y-%m')
+        written = 0
+        for month, rows in df.groupby(months):
+            directory = os.path.join(self.folder, 'recently_played', f"month={month}")
+            if os.path.isdir(directory) and os.listdir(directory):
+                stored = self.pq.read_table(directory, columns=['played_at']).column('played_at').to_pandas()
+                rows = rows[~rows['played_at'].isin(stored)]
+            if len(rows) > 0:
+                self._write_part(directory, rows)
+                written += len(rows)
+        log(f"✅ Appended {written} new plays to {self.folder}/recently_played/")
+
+    def write(self, name, df):
+        if len(df) == 0:
+            log(f"ℹ️  No {name.replace('_', ' ')} to write")
+            return
+        if name == 'recently_played':
+            self._write_play_history(df)
+            return
+
+        directory = os.path.join(self.folder, name)
+        if 'time_range' in df.columns:
+            # Partition values live in the path, not in the file
+            directory = os.path.join(directory, f"time_range={df['time_range'].iloc[0]}")
+            df = df.drop(columns=['time_range'])
+        directory = os.path.join(directory, f"export_date={self.export_date}")
+        log(f"✅ Saved: {self._write_part(directory, df)}")
+
+    def output_path(self):
+        return self.folder
+
+    def close(self):
+        pass
+
+    def abort(self):
+        for filename in self.written:
+            try:
+                os.remove(filename)
+                os.rmdir(os.path.dirname(filename))  # only if the run created it
+            except OSError:
+                pass
+        log(f"↩️  Export failed - removed {len(self.written)} part files from {self.folder}/")
+
+
+class SnapshotSink:
+    """Collect the run's datasets and write the dashboard Arrow snapshot"""
+
+    name = 'snapshot'
+
+    def __init__(self, path=None):
+        self.path = path
+        self.datasets = {}
+
+    def open(self, run_id):
+        self.run_id = run_id
+
+    def write(self, name, df):
+        from snapshot import SNAPSHOT_DATASETS
+        if name in SNAPSHOT_DATASETS:
+            self.datasets[SNAPSHOT_DATASETS[name]] = df
+
+    def output_path(self):
+        from snapshot import SNAPSHOT_PATH
+        return self.path or SNAPSHOT_PATH
+
+    def close(self):
+        from snapshot import SNAPSHOT_PATH, write_snapshot
+        path = self.path or SNAPSHOT_PATH
+        write_snapshot(self.datasets, path, run_id=self.run_id)
+        log(f"✅ Saved dashboard snapshot: {path} (run {self.run_id})")
+
+    def abort(self):
+        # Keep the previous snapshot, which matches the database
+        pass
+
+
+class ChartSpecSink:
+    """Render the database dashboard's charts and store their Plotly JSON"""
+
+    name = 'charts'
+
+    def __init__(self, db_name="spotify_data.db"):
+        self.db_name = db_name
+        self.datasets = {}
+        self.specs = None
+
+    def open(self, run_id):
+        self.run_id = run_id
+
+    def write(self, name, df):
+        from db_data import RECORD_DATASETS
+        from snapshot import SNAPSHOT_DATASETS
+        if name in SNAPSHOT_DATASETS:
+            key = SNAPSHOT_DATASETS[name]
+            self.datasets[key] = df.to_dict('records')[0] if key in RECORD_DATASETS else df
+
+    def prepare(self):
+        # Rendered alongside the other sinks' writes; stored only if they all succeed
+        from chart_specs import render_chart_specs
+        self.specs = render_chart_specs(self.datasets)
+
+    def close(self):
+        import sqlite3
+        from chart_specs import write_chart_specs
+        from export_to_database import create_tables
+        # The SQLite sink has committed by now; the daemon's play sync may hold the lock briefly
+        conn = sqlite3.connect(self.db_name, timeout=30)
+        try:
+            create_tables(conn)
+            write_chart_specs(conn, self.run_id, self.specs)
+        finally:
+            conn.close()
+        log(f"✅ Stored {len(self.specs)} pre-rendered charts in {self.db_name} (run {self.run_id})")
+
+    def abort(self):
+        # Keep the previous run's charts, which match the snapshot
+        pass
+
+
+SINKS = {
+    'csv': CsvSink,
+    'sqlite': SqliteSink,
+    'json': JsonSink,
+    'parquet': ParquetSink,
+    'snapshot': SnapshotSink,
+    'charts': ChartSpecSink,
+}
@@ -4,15 +4,17 @@ This script fetches your Spotify data and stores it in a SQLite database
 """
 
 import sqlite3
-import pandas as pd
-from datetime import datetime
-from spotify_client import SpotifyClient
-from data_processor import DataProcessor
 import os
+import sys
+from datetime import datetime, timezone
+
+from profiling import profile_main
 
 def create_database(db_name="spotify_data.db"):
     """Create SQLite database and return connection"""
     conn = sqlite3.connect(db_name)
+    # WAL lets the dashboard keep reading while an export is writing
+    conn.execute("PRAGMA journal_mode=WAL")
     print(f"📊 Database created: {db_name}")
     return conn
 
@@ -78,6 +80,8 @@ def create_tables(conn):
         export_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )
     """)
+    # Date-window lookups on play history
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_recently_played_played_at ON recently_played (played_at)")
     
     # Audio Features Table
     cursor.execute("""
@@ -182,155 +186,79 @@ def create_tables(conn):
     )
     """)
     
-    conn.commit()
-    print("✅ All tables created successfully!")
-
-def insert_top_artists(conn, processor, time_range='medium_term'):
-    """Insert top artists data"""
-    print("📊 Inserting top artists...")
-    df = processor.get_top_artists_data(time_range=time_range)
-    df['time_range'] = time_range
-    df.to_sql('top_artists', conn, if_exists='append', index=False)
-    print(f"✅ Inserted {len(df)} artists")
-
-def insert_top_tracks(conn, client, time_range='medium_term'):
-    """Insert top tracks data"""
-    print("📊 Inserting top tracks...")
-    tracks = client.get_top_tracks(time_range=time_range)
-    
-    data = []
-    for idx, track in enumerate(tracks['items']):
-        data.append({
-            'rank': idx + 1,
-            'name': track['name'],
-            'artist': track['artists'][0]['name'],
-            'album': track['album']['name'],
-            'popularity': track['popularity'],
-            'duration_ms': track['duration_ms'],
-            'duration_min': round(track['duration_ms'] / 60000, 2),
-            'release_date': track['album']['release_date'],
-            'spotify_url': track['external_urls']['spotify'],
-            'time_range': time_range
-        })
-    
-    df = pd.DataFrame(data)
-    df.to_sql('top_tracks', conn, if_exists='append', index=False)
-    print(f"✅ Inserted {len(df)} tracks")
-
-def insert_genres(conn, processor, time_range='medium_term'):
-    """Insert genre distribution"""
-    print("📊 Inserting genres...")
-    df = processor.get_genre_distribution(time_range=time_range)
-    df['time_range'] = time_range
-    df.to_sql('genres', conn, if_exists='append', index=False)
-    print(f"✅ Inserted {len(df)} genres")
-
-def insert_recently_played(conn, client):
-    """Insert recently played tracks"""
-    print("📊 Inserting recently played...")
-    recent = client.get_recently_played(limit=50)
+    # Pre-rendered dashboard charts (Plotly JSON) from the latest export
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS chart_specs (
+        run_id TEXT,
+        chart TEXT,
+        spec TEXT,
+        export_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (run_id, chart)
+    )
+    """)
     
-    data = []
-    for item in recent['items']:
-        played_at = datetime.fromisoformat(item['played_at'].replace('Z', '+00:00'))
-        data.append({
-            'played_at': played_at.strftime('%Y-%m-%d %H:%M:%S'),
-            'track_name': item['track']['name'],
-            'artist': item['track']['artists'][0]['name'],
-            'album': item['track']['album']['name'],
-            'duration_min': round(item['track']['duration_ms'] / 60000, 2),
-            'day_of_week': played_at.strftime('%A'),
-            'hour': played_at.hour,
-            'spotify_url': item['track']['external_urls']['spotify']
-        })
+    # One row per export run; the full JSON run record is in record
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS export_runs (
+        run_id TEXT PRIMARY KEY,
+        started_at TEXT,
+        finished_at TEXT,
+        duration_s REAL,
+        status TEXT,
+        formats TEXT,
+        api_calls INTEGER,
+        rows_fetched INTEGER,
+        rows_written INTEGER,
+        bytes_on_disk INTEGER,
+        errors TEXT,
+        record TEXT,
+        export_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
     
-    df = pd.DataFrame(data)
-    df.to_sql('recently_played', conn, if_exists='append', index=False)
-    print(f"✅ Inserted {len(df)} recent plays")
+    conn.commit()
+    print("✅ All tables created successfully!")
 
-def insert_audio_features(conn, client, time_range='medium_term'):
-    """Insert audio features"""
-    print("📊 Inserting audio features...")
-    tracks = client.get_top_tracks(time_range=time_range)
-    track_ids = [track['id'] for track in tracks['items'][:50]]
-    features = client.get_audio_features(track_ids)
-    
-    data = []
-    for track, feature in zip(tracks['items'][:50], features):
-        if feature:
-            data.append({
-                'track_name': track['name'],
-                'artist': track['artists'][0]['name'],
-                'popularity': track['popularity'],
-                'danceability': feature['danceability'],
-                'energy': feature['energy'],
-                'key': feature['key'],
-                'loudness': feature['loudness'],
-                'mode': feature['mode'],
-                'speechiness': feature['speechiness'],
-                'acousticness': feature['acousticness'],
-                'instrumentalness': feature['instrumentalness'],
-                'liveness': feature['liveness'],
-                'valence': feature['valence'],
-                'tempo': feature['tempo'],
-                'duration_min': round(feature['duration_ms'] / 60000, 2),
-                'time_signature': feature['time_signature'],
-                'time_range': time_range
-            })
-    
-    df = pd.DataFrame(data)
-    df.to_sql('audio_features', conn, if_exists='append', index=False)
-    print(f"✅ Inserted {len(df)} audio features")
+def insert_rows(conn, table, df):
+    """Insert the rows of ``df`` into ``table`` without committing.
 
-def insert_listening_patterns(conn, processor):
-    """Insert listening patterns"""
-    print("📊 Inserting listening patterns...")
-    
-    # Hourly patterns
-    hours_df = processor.get_listening_hours_data()
-    hours_df.to_sql('listening_patterns', conn, if_exists='append', index=False)
-    print(f"✅ Inserted hourly patterns")
-    
-    # Heatmap data
-    heatmap_df = processor.get_listening_heatmap_data()
-    heatmap_df.to_sql('listening_heatmap', conn, if_exists='append', index=False)
-    print(f"✅ Inserted heatmap data")
+    Unlike ``DataFrame.to_sql`` this leaves the transaction open, so an export
+    writes every table in one transaction and a failed run leaves no rows.
+    """
+    columns = ', '.join(f'"{column}"' for column in df.columns)
+    placeholders = ', '.join('?' * len(df.columns))
+    rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+    conn.executemany(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", rows)
 
-def insert_music_personality(conn, processor):
-    """Insert music personality"""
-    print("📊 Inserting music personality...")
-    personality = processor.get_music_personality()
-    df = pd.DataFrame([personality])
-    df.to_sql('music_personality', conn, if_exists='append', index=False)
-    print("✅ Inserted music personality")
+def insert_new_plays(conn, df):
+    """Append the plays in ``df`` not already stored; returns how many were new.
 
-def insert_diversity_score(conn, processor):
-    """Insert diversity score"""
-    print("📊 Inserting diversity score...")
-    diversity = processor.get_diversity_score()
-    df = pd.DataFrame([diversity])
-    df.to_sql('diversity_score', conn, if_exists='append', index=False)
-    print("✅ Inserted diversity score")
+    Exports and daemon syncs fetch overlapping windows of the last 50 plays,
+    so history only grows by plays whose ``played_at`` is not in the table yet.
+    """
+    if len(df) == 0:
+        return 0
+    stored = {row[0] for row in conn.execute(
+        "SELECT played_at FROM recently_played WHERE played_at >= ?", (df['played_at'].min(),))}
+    new = df[~df['played_at'].isin(stored)].drop_duplicates('played_at')
+    if len(new) > 0:
+        insert_rows(conn, 'recently_played', new)
+    return len(new)
 
-def insert_hidden_gems(conn, processor):
-    """Insert hidden gems"""
-    print("📊 Inserting hidden gems...")
-    df = processor.get_hidden_gems()
-    if len(df) > 0:
-        df.to_sql('hidden_gems', conn, if_exists='append', index=False)
-        print(f"✅ Inserted {len(df)} hidden gems")
-    else:
-        print("ℹ️  No hidden gems to insert")
+def latest_play_cursor(conn):
+    """Unix ms of the newest stored play (the API's ``after`` cursor), or None"""
+    latest = conn.execute("SELECT MAX(played_at) FROM recently_played").fetchone()[0]
+    if latest is None:
+        return None
+    # played_at is stored as UTC without a zone, to the second; the play in
+    # that second comes back again and is skipped by insert_new_plays
+    played = datetime.strptime(latest, '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+    return int(played.timestamp() * 1000)
 
-def insert_binge_listening(conn, processor):
-    """Insert binge listening"""
-    print("📊 Inserting binge listening...")
-    df = processor.get_binge_listening()
-    if len(df) > 0:
-        df.to_sql('binge_listening', conn, if_exists='append', index=False)
-        print(f"✅ Inserted {len(df)} binge tracks")
-    else:
-        print("ℹ️  No binge listening to insert")
+def database_sinks(db_name="spotify_data.db"):
+    """Sinks for a full database export: tables, dashboard snapshot and charts"""
+    from export_sinks import SqliteSink, SnapshotSink, ChartSpecSink
+    return [SqliteSink(db_name), SnapshotSink(), ChartSpecSink(db_name)]
 
 def print_database_summary(conn):
     """Print summary of database contents"""
@@ -353,7 +281,8 @@ def print_database_summary(conn):
     
     print("=" * 60)
 
-def main():
+@profile_main('export_to_database')
+def main(client=None):
     """Main function to export all data to database"""
     print("=" * 60)
     print("🎵 SPOTIFY DATA EXPORT TO SQLITE DATABASE")
@@ -361,45 +290,17 @@ def main():
     print()
     
     try:
-        # Initialize clients
-        print("🔐 Connecting to Spotify...")
-        spotify = SpotifyClient()
-        processor = DataProcessor(spotify)
-        print("✅ Connected successfully!")
-        print()
-        
-        # Create database
+        # One API pass, written by the SQLite sink
+        from export_all import run_export
         db_name = "spotify_data.db"
-        conn = create_database(db_name)
-        print()
-        
-        # Create tables
-        create_tables(conn)
-        print()
-        
-        # Insert all data
-        insert_top_artists(conn, processor)
-        insert_top_tracks(conn, spotify)
-        insert_genres(conn, processor)
-        insert_recently_played(conn, spotify)
-        insert_audio_features(conn, spotify)
-        insert_listening_patterns(conn, processor)
-        insert_music_personality(conn, processor)
-        insert_diversity_score(conn, processor)
-        insert_hidden_gems(conn, processor)
-        insert_binge_listening(conn, processor)
-        
-        # Print summary
-        print_database_summary(conn)
-        
-        # Close connection
-        conn.close()
+        run_export(database_sinks(db_name), client=client)
         
         print()
         print("=" * 60)
         print("✅ DATABASE EXPORT COMPLETED SUCCESSFULLY!")
         print("=" * 60)
         print(f"\n📂 Database file: {db_name}")
+        print("⚡ Dashboard snapshot: spotify_snapshot.arrow")
         print("\n💡 You can now:")
         print("   1. Open the database with any SQLite viewer")
         print("   2. Query the data using SQL")
@@ -424,4 +325,8 @@ def main():
         print(traceback.format_exc())
 
 if __name__ == "__main__":
+    if '--daemon' in sys.argv[1:]:
+        # Long-running incremental sync; see export_daemon.py for its options
+        from export_daemon import main as run_daemon
+        sys.exit(run_daemon([arg for arg in sys.argv[1:] if arg != '--daemon']))
     main()
@@ -0,0 +1,58 @@
+"""
+Export Spotify Data to Parquet Files
+This script fetches your Spotify data and exports it to typed, compressed,
+partitioned Parquet files for analysis
+
+Usage:
+    python export_to_parquet.py                        # zstd compression
+    python export_to_parquet.py --compression snappy
+"""
+
+import argparse
+
+
+def main(compression='zstd', folder="spotify_exports/parquet"):
+    """Main function to export all Spotify data to Parquet"""
+    print("=" * 60)
+    print("🎵 SPOTIFY DATA EXPORT TO PARQUET")
+    print("=" * 60)
+    print()
+
+    try:
+        # One API pass, written by the Parquet sink
+        from export_all import run_export
+        from export_sinks import ParquetSink
+        run_export([ParquetSink(folder=folder, compression=compression)])
+
+        print()
+        print("=" * 60)
+        print("✅ EXPORT COMPLETED SUCCESSFULLY!")
+        print("=" * 60)
+        print(f"\n📂 All files saved in: {folder}/")
+        print("\n📊 Layout:")
+        print("   • <dataset>/time_range=<range>/export_date=<date>/part-*.parquet")
+        print("   • <dataset>/export_date=<date>/part-*.parquet")
+        print("   • recently_played/month=<YYYY-MM>/part-*.parquet (appended, de-duplicated)")
+        print("\n💡 Load a dataset with:")
+        print(f"   pd.read_parquet('{folder}/top_artists')")
+
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print("❌ ERROR OCCURRED")
+        print("=" * 60)
+        print(f"Error: {str(e)}")
+        print("\nPlease make sure:")
+        print("1. Your .env file is configured correctly")
+        print("2. You've authorized the Spotify app")
+        print("3. pyarrow is installed (pip install pyarrow)")
+        import traceback
+        print("\nTechnical details:")
+        print(traceback.format_exc())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export Spotify data to Parquet")
+    parser.add_argument('--compression', default='zstd', choices=['zstd', 'snappy', 'gzip', 'none'])
+    args = parser.parse_args()
+    main(compression=args.compression)
@@ -1,7 +1,11 @@
 import streamlit as st
-from spotify_client import SpotifyClient
-from data_processor import DataProcessor
-from visualizer import Visualizer
+import profiling
+import timing
+from datetime import date, datetime, timedelta
+from dashboard_cache import (TIME_RANGES, get_resources, get_user_id, get_live_data, load_dataset,
+                             load_persisted, load_window, prefetch_time_ranges, refresh)
+from play_history import WINDOW_DATASETS
+from cards import render_cards, hidden_gem_cards, binge_cards, artist_cards, emotion_cards
 
 # Page configuration
 st.set_page_config(
@@ -37,55 +41,122 @@ st.markdown("""
 st.sidebar.title("📊 Navigation")
 st.sidebar.markdown("---")
 
+# Datasets each page needs - only these are fetched when the page is shown
+PAGE_DATASETS = {
+    "📊 Overview": ['personality', 'diversity', 'top_artists', 'genres'],
+    "🎯 Music Personality": ['personality', 'diversity', 'emotional'],
+    "💎 Hidden Gems & Binge": ['hidden_gems', 'binge'],
+    "🎤 Top Artists & Genres": ['top_artists', 'genres'],
+    "⏰ Listening Patterns": ['listening_heatmap', 'listening_hours'],
+    "📈 Emotional Analysis": ['emotional'],
+}
+
 page = st.sidebar.radio(
     "Choose a view:",
-    [
-        "📊 Overview",
-        "🎯 Music Personality",
-        "💎 Hidden Gems & Binge",
-        "🎤 Top Artists & Genres",
-        "⏰ Listening Patterns",
-        "📈 Emotional Analysis"
-    ]
+    list(PAGE_DATASETS)
 )
 
 st.sidebar.markdown("---")
+time_range_display = st.sidebar.selectbox(
+    "Time Range",
+    list(TIME_RANGES.keys()),
+    index=1
+)
+TIME_RANGE = TIME_RANGES[time_range_display]
+
+# Play-history pages can look at any date window of the exported history
+window = None
+if st.sidebar.checkbox("📅 Filter plays by date", help="Uses the history saved by export_to_database.py"):
+    window = st.sidebar.date_input(
+        "Date window",
+        value=(date.today() - timedelta(days=30), date.today())
+    )
+    if len(window) != 2:
+        window = None  # still picking the end date
+
+refresh_clicked = st.sidebar.button("🔄 Refresh data", help="Fetch fresh data from Spotify")
 st.sidebar.info("ℹ️ **Tip:** Navigate between different views to explore your music insights!")
+show_timings = st.sidebar.checkbox("⏱️ Show timings", value=timing.timings_enabled_by_default(),
+                                   help="Time each API call, processing step, chart and query behind this page")
+timer = timing.begin(show_timings)
+# SPOTIFY_PROFILE=full|sample (or `streamlit run main.py -- --profile`) profiles each rerun
+profile = profiling.begin('dashboard')
 
 # Title and subtitle
 st.title("📊 Spotify Listening Insights")
 st.markdown('<p class="subtitle">Discover your music personality through data analytics</p>', unsafe_allow_html=True)
 
-# Initialize session state for caching
-if 'data_loaded' not in st.session_state:
-    st.session_state.data_loaded = False
-
+live = None
 try:
     with st.spinner('🎵 Loading your Spotify data...'):
-        # Initialize clients
-        spotify = SpotifyClient()
-        processor = DataProcessor(spotify)
-        viz = Visualizer()
+        # Clients are cached per server, datasets per user and time range,
+        # so reruns such as switching pages make no API calls
+        spotify, processor, viz = get_resources()
+        user_id = get_user_id(spotify)
+        live = get_live_data(user_id, TIME_RANGE)
+        if refresh_clicked:
+            refresh(spotify)
+            for time_range in TIME_RANGES.values():
+                get_live_data(user_id, time_range).invalidate()
         
-        # Get all data
-        top_artists_df = processor.get_top_artists_data()
-        genre_df = processor.get_genre_distribution()
-        listening_hours_df = processor.get_listening_hours_data()
-        heatmap_df = processor.get_listening_heatmap_data()
-        emotional_df = processor.get_emotional_patterns()
+        # Only the datasets the selected page shows
+        names = PAGE_DATASETS[page]
+        persisted = None if live.data else load_persisted(names, TIME_RANGE)
+        if persisted is not None:
+            data, as_of = persisted
+            source = "last export"
+        elif live.data:
+            data = {name: live.data[name] for name in names}
+            as_of = live.as_of.strftime('%Y-%m-%d %H:%M:%S')
+            source = "Spotify"
+        else:
+            # Nothing exported yet - fetch this page's datasets now and leave
+            # the rest to the background refresh, which reuses these
+            if live.error is not None and live.retry_in() > 0:
+                raise live.error
+            data = {name: load_dataset(name, user_id, TIME_RANGE, processor) for name in names}
+            as_of = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            source = "Spotify"
+        rendered_version = live.version
         
-        # Get new smart features
-        personality = processor.get_music_personality()
-        diversity = processor.get_diversity_score()
-        hidden_gems_df = processor.get_hidden_gems()
-        binge_df = processor.get_binge_listening()
+        # Stale-while-revalidate: show what we have and refresh every time
+        # range in the background, so switching ranges never waits
+        prefetch_time_ranges(user_id, processor)
         
-        st.session_state.data_loaded = True
+        # Date windows come from local history, not the API
+        window_names = tuple(name for name in names if name in WINDOW_DATASETS)
+        if window is not None and window_names:
+            windowed = load_window(window_names, window[0], window[1])
+            if windowed is None:
+                st.sidebar.warning("⚠️ No local history yet - run export_to_database.py to save your plays")
+            else:
+                window_data, play_count = windowed
+                data.update(window_data)
+                st.sidebar.caption(f"📅 {play_count} plays from {window[0]} to {window[1]} (local history)")
+    
+    st.sidebar.caption(f"🕒 Data as of {as_of} (from {source})")
+    if live.error is not None and live.retry_in() > 0:
+        st.sidebar.caption(f"⚠️ Refresh from Spotify failed, retrying in {live.retry_in():.0f}s")
+    
+    @st.fragment(run_every=2)
+    def watch_refresh():
+        """Rerun the page once the background refresh swaps in new data"""
+        if live.refreshing:
+            st.caption("⏳ Refreshing from Spotify...")
+        elif live.version != rendered_version:
+            st.rerun()
+    
+    if live.refreshing or live.version != rendered_version:
+        with st.sidebar:
+            watch_refresh()
     
     # === PAGE ROUTING ===
     if page == "📊 Overview":
         st.markdown("## �  Quick Overview")
         
+        personality = data['personality']
+        diversity = data['diversity']
+        
         # Personality and Diversity in one row
         col1, col2 = st.columns(2)
         with col1:
@@ -105,13 +176,16 @@ try:
         # Quick stats
         col3, col4 = st.columns(2)
         with col3:
-            st.plotly_chart(viz.create_top_artists_chart(top_artists_df), use_container_width=True)
+            st.plotly_chart(viz.create_top_artists_chart(data['top_artists']), use_container_width=True)
         with col4:
-            st.plotly_chart(viz.create_genre_chart(genre_df), use_container_width=True)
+            st.plotly_chart(viz.create_genre_chart(data['genres']), use_container_width=True)
     
     elif page == "🎯 Music Personality":
         st.markdown("## 🎯 Your Music Personality")
         
+        personality = data['personality']
+        diversity = data['diversity']
+        
         col1, col2 = st.columns([1, 1])
         with col1:
             st.markdown(f"""
@@ -141,81 +215,60 @@ try:
             </div>
             """, unsafe_allow_html=True)
         
-        if len(emotional_df) > 0 and 'valence' in emotional_df.columns:
+        if len(data['emotional']) > 0 and 'valence' in data['emotional'].columns:
             st.markdown("---")
             col3, col4 = st.columns(2)
             with col3:
-                st.plotly_chart(viz.create_emotional_radar(emotional_df), use_container_width=True)
+                st.plotly_chart(viz.create_emotional_radar(data['emotional']), use_container_width=True)
             with col4:
-                st.plotly_chart(viz.create_emotional_scatter(emotional_df), use_container_width=True)
+                st.plotly_chart(viz.create_emotional_scatter(data['emotional']), use_container_width=True)
     
     elif page == "💎 Hidden Gems & Binge":
         st.markdown("## 💎 Hidden Gems & Binge Listening")
         
         col1, col2 = st.columns(2)
         with col1:
-            st.plotly_chart(viz.create_hidden_gems_chart(hidden_gems_df), use_container_width=True)
-            if len(hidden_gems_df) > 0:
+            st.plotly_chart(viz.create_hidden_gems_chart(data['hidden_gems']), use_container_width=True)
+            if len(data['hidden_gems']) > 0:
                 st.markdown("### 📋 All Your Hidden Gems")
-                for idx, gem in hidden_gems_df.iterrows():
-                    st.markdown(f"""
-                    <div style='background: rgba(29, 185, 84, 0.2); padding: 15px; border-radius: 10px; margin-bottom: 10px;'>
-                        <p style='color: white; font-size: 1.1em; margin: 0;'><b>{gem['name']}</b></p>
-                        <p style='color: #1ed760; margin: 5px 0;'>by {gem['artist']}</p>
-                        <p style='color: #ff6b6b; margin: 0;'>Popularity: {gem['popularity']}/100</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+                render_cards(data['hidden_gems'], hidden_gem_cards, ['name', 'artist', 'popularity'])
         
         with col2:
-            st.plotly_chart(viz.create_binge_chart(binge_df), use_container_width=True)
-            if len(binge_df) > 0:
+            st.plotly_chart(viz.create_binge_chart(data['binge']), use_container_width=True)
+            if len(data['binge']) > 0:
                 st.markdown("### 📋 Your Most Binged Songs")
-                for idx, song in binge_df.iterrows():
-                    st.markdown(f"""
-                    <div style='background: rgba(255, 107, 107, 0.2); padding: 15px; border-radius: 10px; margin-bottom: 10px;'>
-                        <p style='color: white; font-size: 1.1em; margin: 0;'><b>{song['name']}</b></p>
-                        <p style='color: #1ed760; margin: 5px 0;'>by {song['artist']}</p>
-                        <p style='color: #feca57; margin: 0;'>🔁 Played {song['plays']} times</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+                render_cards(data['binge'], binge_cards, ['name', 'artist', 'plays'])
     
     elif page == "🎤 Top Artists & Genres":
         st.markdown("## 🎤 Your Top Artists & Genres")
         
-        st.plotly_chart(viz.create_top_artists_chart(top_artists_df), use_container_width=True)
+        st.plotly_chart(viz.create_top_artists_chart(data['top_artists']), use_container_width=True)
         
         st.markdown("---")
         
         col1, col2 = st.columns([1, 1])
         with col1:
-            st.plotly_chart(viz.create_genre_chart(genre_df), use_container_width=True)
+            st.plotly_chart(viz.create_genre_chart(data['genres']), use_container_width=True)
         
         with col2:
             st.markdown("### 🎸 Top Artists Details")
-            for idx, artist in top_artists_df.head(10).iterrows():
-                st.markdown(f"""
-                <div style='background: rgba(29, 185, 84, 0.2); padding: 15px; border-radius: 10px; margin-bottom: 10px;'>
-                    <p style='color: white; font-size: 1.1em; margin: 0;'><b>#{artist['rank']} {artist['name']}</b></p>
-                    <p style='color: #1ed760; margin: 5px 0;'>Popularity: {artist['popularity']}/100</p>
-                    <p style='color: #48dbfb; margin: 0;'>Genres: {artist['genres']}</p>
-                </div>
-                """, unsafe_allow_html=True)
+            st.markdown(artist_cards(data['top_artists'].head(10)), unsafe_allow_html=True)
     
     elif page == "⏰ Listening Patterns":
         st.markdown("## ⏰ Your Listening Patterns")
         
-        st.plotly_chart(viz.create_listening_heatmap(heatmap_df), use_container_width=True)
+        st.plotly_chart(viz.create_listening_heatmap(data['listening_heatmap']), use_container_width=True)
         
         st.markdown("---")
         
         col1, col2 = st.columns([2, 1])
         with col1:
-            st.plotly_chart(viz.create_listening_hours_chart(listening_hours_df), use_container_width=True)
+            st.plotly_chart(viz.create_listening_hours_chart(data['listening_hours']), use_container_width=True)
         
         with col2:
             # Calculate peak listening time
-            peak_hour = listening_hours_df.loc[listening_hours_df['plays'].idxmax(), 'hour']
-            total_plays = listening_hours_df['plays'].sum()
+            peak_hour = data['listening_hours'].loc[data['listening_hours']['plays'].idxmax(), 'hour']
+            total_plays = data['listening_hours']['plays'].sum()
             
             st.markdown(f"""
             <div style='background: rgba(29, 185, 84, 0.3); padding: 30px; border-radius: 15px; 
@@ -233,32 +286,17 @@ try:
     elif page == "📈 Emotional Analysis":
         st.markdown("## 📈 Emotional Music Analysis")
         
-        if len(emotional_df) > 0 and 'valence' in emotional_df.columns:
+        if len(data['emotional']) > 0 and 'valence' in data['emotional'].columns:
             col1, col2 = st.columns(2)
             with col1:
-                st.plotly_chart(viz.create_emotional_radar(emotional_df), use_container_width=True)
+                st.plotly_chart(viz.create_emotional_radar(data['emotional']), use_container_width=True)
             with col2:
-                st.plotly_chart(viz.create_emotional_scatter(emotional_df), use_container_width=True)
+                st.plotly_chart(viz.create_emotional_scatter(data['emotional']), use_container_width=True)
             
             st.markdown("---")
             st.markdown("### 🎵 Your Top Tracks Emotional Breakdown")
             
-            for idx, track in emotional_df.head(10).iterrows():
-                col_a, col_b = st.columns([2, 1])
-                with col_a:
-                    st.markdown(f"""
-                    <div style='background: rgba(29, 185, 84, 0.2); padding: 15px; border-radius: 10px; margin-bottom: 10px;'>
-                        <p style='color: white; font-size: 1.1em; margin: 0;'><b>{track['name']}</b></p>
-                        <p style='color: #1ed760; margin: 5px 0;'>by {track['artist']}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                with col_b:
-                    st.markdown(f"""
-                    <div style='background: rgba(0,0,0,0.3); padding: 15px; border-radius: 10px; margin-bottom: 10px;'>
-                        <p style='color: #ff6b6b; margin: 0;'>😊 {track['valence']:.0%}</p>
-                        <p style='color: #48dbfb; margin: 0;'>⚡ {track['energy']:.0%}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+            st.markdown(emotion_cards(data['emotional'].head(10)), unsafe_allow_html=True)
         else:
             st.warning("⚠️ Emotional data not available for your tracks")
 
@@ -276,3 +314,12 @@ except Exception as e:
     with st.expander("Show technical details"):
         import traceback
         st.code(traceback.format_exc())
+
+# Opt-in timing panel for this rerun
+if timer is not None:
+    timer.stop()
+    timing.show_timing_panel({
+        "This rerun": timer,
+        "Last background refresh": live.last_timer if live is not None else None,
+    })
+profiling.finish(profile)
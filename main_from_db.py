@@ -1,7 +1,13 @@
 import streamlit as st
-import sqlite3
-import pandas as pd
+import profiling
+import timing
 from visualizer import Visualizer
+from db_pool import ReadConnectionPool
+from db_data import load_data_from_db as query_dashboard_data
+from snapshot import SNAPSHOT_PATH, snapshot_version, Snapshot
+from cards import render_cards, hidden_gem_cards, binge_cards, artist_cards, emotion_cards
+from chart_specs import (emotional_averages, emotional_scatter_frame, latest_chart_run,
+                         load_chart_specs, spec_figure)
 
 # Page configuration
 st.set_page_config(
@@ -37,58 +43,91 @@ st.markdown("""
 st.sidebar.title("📊 Navigation")
 st.sidebar.markdown("---")
 
+# Datasets each page needs - only these are queried when the page is shown
+PAGE_DATASETS = {
+    "📊 Overview": ['personality', 'diversity', 'top_artists', 'genres'],
+    "🎯 Music Personality": ['personality', 'diversity', 'audio_features'],
+    "💎 Hidden Gems & Binge": ['hidden_gems', 'binge_listening'],
+    "🎤 Top Artists & Genres": ['top_artists', 'genres'],
+    "⏰ Listening Patterns": ['listening_heatmap', 'listening_hours'],
+    "📈 Emotional Analysis": ['audio_features'],
+}
+
 page = st.sidebar.radio(
     "Choose a view:",
-    [
-        "📊 Overview",
-        "🎯 Music Personality",
-        "💎 Hidden Gems & Binge",
-        "🎤 Top Artists & Genres",
-        "⏰ Listening Patterns",
-        "📈 Emotional Analysis"
-    ]
+    list(PAGE_DATASETS)
 )
 
 st.sidebar.markdown("---")
 st.sidebar.info("ℹ️ **Tip:** Navigate between different views to explore your music insights!")
+show_timings = st.sidebar.checkbox("⏱️ Show timings", value=timing.timings_enabled_by_default(),
+                                   help="Time each API call, processing step, chart and query behind this page")
+timer = timing.begin(show_timings)
+# SPOTIFY_PROFILE=full|sample (or `streamlit run main_from_db.py -- --profile`) profiles each rerun
+profile = profiling.begin('dashboard_db')
 
 # Title and subtitle
 st.title("📊 Spotify Listening Insights")
 st.markdown('<p class="subtitle">Discover your music personality through data analytics</p>', unsafe_allow_html=True)
 
-# Database connection
+# Database connection pool, shared by every session
 @st.cache_resource
-def get_database_connection():
-    """Create database connection"""
-    return sqlite3.connect('spotify_data.db', check_same_thread=False)
+def get_connection_pool():
+    """Create the read-only connection pool"""
+    return ReadConnectionPool('spotify_data.db')
 
-def load_data_from_db():
-    """Load all data from database"""
-    conn = get_database_connection()
-    
-    data = {}
-    data['top_artists'] = pd.read_sql_query("SELECT * FROM top_artists ORDER BY rank", conn)
-    data['top_tracks'] = pd.read_sql_query("SELECT * FROM top_tracks ORDER BY rank", conn)
-    data['genres'] = pd.read_sql_query("SELECT * FROM genres ORDER BY count DESC", conn)
-    data['recently_played'] = pd.read_sql_query("SELECT * FROM recently_played ORDER BY played_at DESC", conn)
-    data['listening_hours'] = pd.read_sql_query("SELECT * FROM listening_patterns ORDER BY hour", conn)
-    data['listening_heatmap'] = pd.read_sql_query("SELECT * FROM listening_heatmap", conn)
-    data['personality'] = pd.read_sql_query("SELECT * FROM music_personality ORDER BY id DESC LIMIT 1", conn).to_dict('records')[0]
-    data['diversity'] = pd.read_sql_query("SELECT * FROM diversity_score ORDER BY id DESC LIMIT 1", conn).to_dict('records')[0]
-    data['hidden_gems'] = pd.read_sql_query("SELECT * FROM hidden_gems", conn)
-    data['binge_listening'] = pd.read_sql_query("SELECT * FROM binge_listening ORDER BY plays DESC", conn)
-    
-    # Check if audio_features has data
-    audio_features = pd.read_sql_query("SELECT * FROM audio_features", conn)
-    data['audio_features'] = audio_features if len(audio_features) > 0 else pd.DataFrame()
-    
-    return data
+def load_data_from_db(names=None):
+    """Load data from database (every dataset unless names are given)"""
+    return query_dashboard_data(get_connection_pool(), names)
+
+# Visualizer with its figure cache, shared by every session
+@st.cache_resource
+def get_visualizer():
+    """Create the visualizer once per server"""
+    return Visualizer()
+
+@st.cache_resource(max_entries=1)
+def load_snapshot(path, mtime_ns, run_id):
+    """Memory-map the export snapshot; only re-read when its mtime or run id changes"""
+    return Snapshot(path)
+
+def load_data(names):
+    """Load datasets from the export snapshot, falling back to SQLite queries"""
+    version = snapshot_version(SNAPSHOT_PATH)
+    if version is not None:
+        snapshot = load_snapshot(SNAPSHOT_PATH, *version)
+        return {name: snapshot.get(name) for name in names}
+    return load_data_from_db(names)
+
+@st.cache_resource(max_entries=1)
+def get_chart_specs(run_id):
+    """Pre-rendered figures for one export run"""
+    return load_chart_specs(get_connection_pool(), run_id)
+
+def current_chart_specs():
+    """Return ``(run_id, specs)`` when the stored charts match the data shown"""
+    try:
+        run_id = latest_chart_run(get_connection_pool())
+    except Exception:
+        # No database, or one exported before charts were pre-rendered
+        return None, {}
+    version = snapshot_version(SNAPSHOT_PATH)
+    if run_id is None or (version is not None and version[1] != run_id):
+        return None, {}
+    return run_id, get_chart_specs(run_id)
+
+def chart(name, build):
+    """Pre-rendered figure from the last export, else build it from the data"""
+    if name in chart_specs:
+        return spec_figure(viz, chart_run_id, name, chart_specs[name])
+    return build()
 
 try:
     with st.spinner('📊 Loading data from database...'):
         # Load data
-        data = load_data_from_db()
-        viz = Visualizer()
+        data = load_data(PAGE_DATASETS[page])
+        viz = get_visualizer()
+        chart_run_id, chart_specs = current_chart_specs()
     
     # === PAGE ROUTING ===
     if page == "📊 Overview":
@@ -107,16 +146,16 @@ try:
             """, unsafe_allow_html=True)
         
         with col2:
-            st.plotly_chart(viz.create_diversity_gauge(data['diversity']), use_container_width=True)
+            st.plotly_chart(chart('diversity_gauge', lambda: viz.create_diversity_gauge(data['diversity'])), use_container_width=True)
         
         st.markdown("---")
         
         # Quick stats
         col3, col4 = st.columns(2)
         with col3:
-            st.plotly_chart(viz.create_top_artists_chart(data['top_artists']), use_container_width=True)
+            st.plotly_chart(chart('top_artists', lambda: viz.create_top_artists_chart(data['top_artists'])), use_container_width=True)
         with col4:
-            st.plotly_chart(viz.create_genre_chart(data['genres']), use_container_width=True)
+            st.plotly_chart(chart('genres', lambda: viz.create_genre_chart(data['genres'])), use_container_width=True)
     
     elif page == "🎯 Music Personality":
         st.markdown("## 🎯 Your Music Personality")
@@ -142,7 +181,7 @@ try:
             """, unsafe_allow_html=True)
         
         with col2:
-            st.plotly_chart(viz.create_diversity_gauge(diversity), use_container_width=True)
+            st.plotly_chart(chart('diversity_gauge', lambda: viz.create_diversity_gauge(diversity)), use_container_width=True)
             st.markdown(f"""
             <div style='text-align: center; color: white; margin-top: 20px; padding: 20px; 
                         background: rgba(0,0,0,0.3); border-radius: 10px;'>
@@ -158,89 +197,59 @@ try:
             st.markdown("---")
             st.markdown("### 🎵 Audio Features Analysis")
             
-            # Create emotional radar from audio features
-            avg_features = {
-                'Happiness': data['audio_features']['valence'].mean(),
-                'Energy': data['audio_features']['energy'].mean(),
-                'Danceability': data['audio_features']['danceability'].mean(),
-                'Acousticness': data['audio_features']['acousticness'].mean()
-            }
-            
+            audio_features = data['audio_features']
             col3, col4 = st.columns(2)
             with col3:
-                # Create a simple dataframe for radar chart
-                emotional_df = pd.DataFrame([avg_features])
-                emotional_df.columns = ['valence', 'energy', 'danceability', 'acousticness']
-                st.plotly_chart(viz.create_emotional_radar(emotional_df), use_container_width=True)
+                # Emotional radar from average audio features
+                st.plotly_chart(chart('emotional_radar', lambda: viz.create_emotional_radar(
+                    emotional_averages(audio_features))), use_container_width=True)
             
             with col4:
                 # Scatter plot
-                scatter_df = data['audio_features'][['valence', 'energy', 'danceability', 'track_name', 'artist']].copy()
-                scatter_df.columns = ['valence', 'energy', 'danceability', 'name', 'artist']
-                st.plotly_chart(viz.create_emotional_scatter(scatter_df), use_container_width=True)
+                st.plotly_chart(chart('emotional_scatter', lambda: viz.create_emotional_scatter(
+                    emotional_scatter_frame(audio_features))), use_container_width=True)
     
     elif page == "💎 Hidden Gems & Binge":
         st.markdown("## 💎 Hidden Gems & Binge Listening")
         
         col1, col2 = st.columns(2)
         with col1:
-            st.plotly_chart(viz.create_hidden_gems_chart(data['hidden_gems']), use_container_width=True)
+            st.plotly_chart(chart('hidden_gems', lambda: viz.create_hidden_gems_chart(data['hidden_gems'])), use_container_width=True)
             if len(data['hidden_gems']) > 0:
                 st.markdown("### 📋 All Your Hidden Gems")
-                for idx, gem in data['hidden_gems'].iterrows():
-                    st.markdown(f"""
-                    <div style='background: rgba(29, 185, 84, 0.2); padding: 15px; border-radius: 10px; margin-bottom: 10px;'>
-                        <p style='color: white; font-size: 1.1em; margin: 0;'><b>{gem['name']}</b></p>
-                        <p style='color: #1ed760; margin: 5px 0;'>by {gem['artist']}</p>
-                        <p style='color: #ff6b6b; margin: 0;'>Popularity: {gem['popularity']}/100</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+                render_cards(data['hidden_gems'], hidden_gem_cards, ['name', 'artist', 'popularity'])
         
         with col2:
-            st.plotly_chart(viz.create_binge_chart(data['binge_listening']), use_container_width=True)
+            st.plotly_chart(chart('binge', lambda: viz.create_binge_chart(data['binge_listening'])), use_container_width=True)
             if len(data['binge_listening']) > 0:
                 st.markdown("### 📋 Your Most Binged Songs")
-                for idx, song in data['binge_listening'].iterrows():
-                    st.markdown(f"""
-                    <div style='background: rgba(255, 107, 107, 0.2); padding: 15px; border-radius: 10px; margin-bottom: 10px;'>
-                        <p style='color: white; font-size: 1.1em; margin: 0;'><b>{song['name']}</b></p>
-                        <p style='color: #1ed760; margin: 5px 0;'>by {song['artist']}</p>
-                        <p style='color: #feca57; margin: 0;'>🔁 Played {song['plays']} times</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+                render_cards(data['binge_listening'], binge_cards, ['name', 'artist', 'plays'])
     
     elif page == "🎤 Top Artists & Genres":
         st.markdown("## 🎤 Your Top Artists & Genres")
         
-        st.plotly_chart(viz.create_top_artists_chart(data['top_artists']), use_container_width=True)
+        st.plotly_chart(chart('top_artists', lambda: viz.create_top_artists_chart(data['top_artists'])), use_container_width=True)
         
         st.markdown("---")
         
         col1, col2 = st.columns([1, 1])
         with col1:
-            st.plotly_chart(viz.create_genre_chart(data['genres']), use_container_width=True)
+            st.plotly_chart(chart('genres', lambda: viz.create_genre_chart(data['genres'])), use_container_width=True)
         
         with col2:
             st.markdown("### 🎸 Top Artists Details")
-            for idx, artist in data['top_artists'].head(10).iterrows():
-                st.markdown(f"""
-                <div style='background: rgba(29, 185, 84, 0.2); padding: 15px; border-radius: 10px; margin-bottom: 10px;'>
-                    <p style='color: white; font-size: 1.1em; margin: 0;'><b>#{artist['rank']} {artist['name']}</b></p>
-                    <p style='color: #1ed760; margin: 5px 0;'>Popularity: {artist['popularity']}/100</p>
-                    <p style='color: #48dbfb; margin: 0;'>Genres: {artist['genres']}</p>
-                </div>
-                """, unsafe_allow_html=True)
+            st.markdown(artist_cards(data['top_artists'].head(10)), unsafe_allow_html=True)
     
     elif page == "⏰ Listening Patterns":
         st.markdown("## ⏰ Your Listening Patterns")
         
-        st.plotly_chart(viz.create_listening_heatmap(data['listening_heatmap']), use_container_width=True)
+        st.plotly_chart(chart('listening_heatmap', lambda: viz.create_listening_heatmap(data['listening_heatmap'])), use_container_width=True)
         
         st.markdown("---")
         
         col1, col2 = st.columns([2, 1])
         with col1:
-            st.plotly_chart(viz.create_listening_hours_chart(data['listening_hours']), use_container_width=True)
+            st.plotly_chart(chart('listening_hours', lambda: viz.create_listening_hours_chart(data['listening_hours'])), use_container_width=True)
         
         with col2:
             # Calculate peak listening time
@@ -266,42 +275,20 @@ try:
         if len(data['audio_features']) > 0:
             col1, col2 = st.columns(2)
             
-            # Prepare data for visualizations
-            avg_features = {
-                'valence': data['audio_features']['valence'].mean(),
-                'energy': data['audio_features']['energy'].mean(),
-                'danceability': data['audio_features']['danceability'].mean(),
-                'acousticness': data['audio_features']['acousticness'].mean()
-            }
-            emotional_df = pd.DataFrame([avg_features])
+            audio_features = data['audio_features']
             
             with col1:
-                st.plotly_chart(viz.create_emotional_radar(emotional_df), use_container_width=True)
+                st.plotly_chart(chart('emotional_radar', lambda: viz.create_emotional_radar(
+                    emotional_averages(audio_features))), use_container_width=True)
             
             with col2:
-                scatter_df = data['audio_features'][['valence', 'energy', 'danceability', 'track_name', 'artist']].copy()
-                scatter_df.columns = ['valence', 'energy', 'danceability', 'name', 'artist']
-                st.plotly_chart(viz.create_emotional_scatter(scatter_df), use_container_width=True)
+                st.plotly_chart(chart('emotional_scatter', lambda: viz.create_emotional_scatter(
+                    emotional_scatter_frame(audio_features))), use_container_width=True)
             
             st.markdown("---")
             st.markdown("### 🎵 Your Top Tracks Emotional Breakdown")
             
-            for idx, track in data['audio_features'].head(10).iterrows():
-                col_a, col_b = st.columns([2, 1])
-                with col_a:
-                    st.markdown(f"""
-                    <div style='background: rgba(29, 185, 84, 0.2); padding: 15px; border-radius: 10px; margin-bottom: 10px;'>
-                        <p style='color: white; font-size: 1.1em; margin: 0;'><b>{track['track_name']}</b></p>
-                        <p style='color: #1ed760; margin: 5px 0;'>by {track['artist']}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                with col_b:
-                    st.markdown(f"""
-                    <div style='background: rgba(0,0,0,0.3); padding: 15px; border-radius: 10px; margin-bottom: 10px;'>
-                        <p style='color: #ff6b6b; margin: 0;'>😊 {track['valence']:.0%}</p>
-                        <p style='color: #48dbfb; margin: 0;'>⚡ {track['energy']:.0%}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+            st.markdown(emotion_cards(data['audio_features'].head(10), name_column='track_name'), unsafe_allow_html=True)
         else:
             st.warning("⚠️ Audio features data not available in database")
             st.info("💡 Audio features require additional API permissions. The dashboard shows all other available data.")
@@ -332,3 +319,9 @@ except Exception as e:
     with st.expander("Show technical details"):
         import traceback
         st.code(traceback.format_exc())
+
+# Opt-in timing panel for this rerun
+if timer is not None:
+    timer.stop()
+    timing.show_timing_panel({"This rerun": timer})
+profiling.finish(profile)
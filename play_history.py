@@ -0,0 +1,62 @@
+"""
+Play History Windows
+Answers date-window questions from the exported recently_played table
+(indexed on played_at) instead of the API, which only returns the last 50 plays
+"""
+
+from collections import Counter
+from datetime import timedelta
+
+import pandas as pd
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Every export appends its plays, so the same play can be stored more than once
+WINDOW_QUERY = """
+SELECT DISTINCT played_at, track_name, artist, album
+FROM recently_played
+WHERE played_at >= ? AND played_at < ?
+ORDER BY played_at
+"""
+
+
+def load_plays(pool, start, end):
+    """Plays from ``start`` to ``end`` (dates, inclusive) as a DataFrame"""
+    params = (start.strftime('%Y-%m-%d 00:00:00'), (end + timedelta(days=1)).strftime('%Y-%m-%d 00:00:00'))
+    plays = pool.read_sql(WINDOW_QUERY, params)
+    plays['played_at'] = pd.to_datetime(plays['played_at'])
+    return plays
+
+
+def listening_hours(plays):
+    """Plays per hour of day, shaped like DataProcessor.get_listening_hours_data"""
+    hour_counts = plays['played_at'].dt.hour.value_counts()
+    return pd.DataFrame({'hour': range(24), 'plays': [int(hour_counts.get(h, 0)) for h in range(24)]})
+
+
+def listening_heatmap(plays):
+    """Plays per weekday and hour, shaped like DataProcessor.get_listening_heatmap_data"""
+    df = pd.DataFrame({
+        'day_num': plays['played_at'].dt.weekday,
+        'hour': plays['played_at'].dt.hour,
+    })
+    df['day'] = df['day_num'].map(dict(enumerate(DAYS)))
+    return df.groupby(['day_num', 'day', 'hour']).size().reset_index(name='plays')
+
+
+def binge_listening(plays):
+    """Songs played more than once, shaped like DataProcessor.get_binge_listening"""
+    track_counts = Counter(zip(plays['track_name'], plays['artist']))
+    albums = dict(zip(zip(plays['track_name'], plays['artist']), plays['album']))
+    return pd.DataFrame([
+        {'name': name, 'artist': artist, 'plays': count, 'album': albums[(name, artist)]}
+        for (name, artist), count in track_counts.most_common(10) if count > 1
+    ])
+
+
+# Live dashboard dataset name -> builder from a window of plays
+WINDOW_DATASETS = {
+    'listening_hours': listening_hours,
+    'listening_heatmap': listening_heatmap,
+    'binge': binge_listening,
+}
@@ -0,0 +1,224 @@
+"""
+Opt-in Profiling
+Profiles an export or a dashboard rerun when SPOTIFY_PROFILE is set or the
+script gets ``--profile``. Output goes to SPOTIFY_PROFILE_DIR (``profiles/``).
+
+    full    cProfile (every thread, merged into one .pstats file), tracemalloc
+            top allocation sites and sampled stacks in collapsed format
+    sample  sampled stacks only; a background thread reads the stacks every
+            SPOTIFY_PROFILE_INTERVAL seconds (0.01), cheap enough to leave on.
+            Samples are appended to one file per day.
+
+Collapsed stacks (``thread;outer;...;inner count``) load straight into
+flamegraph.pl, speedscope or inferno.
+
+tracemalloc and the thread profile hook are process-wide, so only one full
+session runs at a time; a session started meanwhile (another dashboard
+session's rerun, say) is sampled instead.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from functools import wraps
+
+PROFILE_ENV = 'SPOTIFY_PROFILE'
+PROFILE_DIR_ENV = 'SPOTIFY_PROFILE_DIR'
+PROFILE_INTERVAL_ENV = 'SPOTIFY_PROFILE_INTERVAL'
+MODES = ('full', 'sample')
+TOP_ALLOCATIONS = 25
+
+_local = threading.local()
+# Held by the full-mode session that owns tracemalloc and the profile hooks
+_full_mode = threading.Lock()
+
+
+def profile_mode(argv=None):
+    """'full', 'sample' or None, from ``--profile[=sample]`` or SPOTIFY_PROFILE"""
+    for arg in sys.argv[1:] if argv is None else argv:
+        if arg == '--profile':
+            return 'full'
+        if arg.startswith('--profile='):
+            mode = arg.split('=', 1)[1]
+            return mode if mode in MODES else 'full'
+    mode = os.getenv(PROFILE_ENV, '').lower()
+    if mode in MODES:
+        return mode
+    return 'full' if mode in ('1', 'true', 'yes') else None
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Collects collapsed stacks of the given threads (all but itself by default)"""
+
+    def __init__(self, interval=0.01, thread_ids=None):
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (self.thread_ids is not None and ident not in self.thread_ids):
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                labels.append(names.get(ident, str(ident)))
+                self.stacks[';'.join(reversed(labels))] += 1
+
+    def collapsed(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileSession:
+    """One profiled run; ``stop()`` writes the output files and returns their paths"""
+
+    def __init__(self, name, mode, directory=None, all_threads=True):
+        self.name = name
+        self.mode = mode
+        self.directory = directory or os.getenv(PROFILE_DIR_ENV, 'profiles')
+        self.started = datetime.now()
+        self.profiles = []
+        self._lock = threading.Lock()
+        interval = float(os.getenv(PROFILE_INTERVAL_ENV, '0.01'))
+        self.sampler = StackSampler(interval, None if all_threads else {threading.get_ident()})
+        self.profiler = None
+        self.all_threads = all_threads
+
+    def _profile_new_thread(self, *args):
+        # Runs once as the profile hook of each thread started while profiling
+        import cProfile
+        profiler = cProfile.Profile()
+        with self._lock:
+            self.profiles.append(profiler)
+        profiler.enable()
+
+    def start(self):
+        if self.mode == 'full' and not _full_mode.acquire(blocking=False):
+            print(f"🔬 Another full profile is running; sampling {self.name} instead")
+            self.mode = 'sample'
+        if self.mode == 'full':
+            # Imported here: every exporter imports this module, few profile
+            import cProfile
+            import tracemalloc
+            tracemalloc.start()
+            if self.all_threads:
+                threading.setprofile(self._profile_new_thread)
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.sampler.start()
+        return self
+
+    def stop(self):
+        self.sampler.stop()
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = self.started.strftime('%Y%m%dT%H%M%S')
+        paths = []
+
+        if self.mode == 'sample':
+            # Appended so a long-running process builds one profile per day
+            path = os.path.join(self.directory, f"{self.name}-{self.started.strftime('%Y%m%d')}.collapsed")
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(self.sampler.collapsed())
+            return [path]
+
+        import pstats
+        import tracemalloc
+        try:
+            self.profiler.disable()
+            threading.setprofile(None)
+            # Before building the stats, which would show up as allocations
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        finally:
+            _full_mode.release()
+
+        stats = pstats.Stats(self.profiler)
+        for profiler in self.profiles:
+            profiler.create_stats()
+            if profiler.stats:
+                stats.add(profiler)
+        path = os.path.join(self.directory, f"{self.name}-{stamp}.pstats")
+        stats.dump_stats(path)
+        paths.append(path)
+
+        path = os.path.join(self.directory, f"{self.name}-{stamp}-allocations.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"Traced memory: {current / 2 ** 20:.1f} MB now, {peak / 2 ** 20:.1f} MB peak\n")
+            f.write(f"Top {TOP_ALLOCATIONS} allocation sites still held at the end of the run:\n\n")
+            for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]:
+                f.write(f"{stat.size / 1024:>10.1f} KB {stat.count:>8} blocks  {stat.traceback[0]}\n")
+        paths.append(path)
+
+        path = os.path.join(self.directory, f"{self.name}-{stamp}.collapsed")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.sampler.collapsed())
+        paths.append(path)
+        return paths
+
+
+def begin(name, all_threads=False):
+    """Profile this thread's work until ``finish()`` if profiling is switched on.
+
+    Call at the top of every dashboard rerun; a session left running by an
+    earlier rerun that never reached ``finish()`` is stopped first.
+    """
+    previous = getattr(_local, 'session', None)
+    if previous is not None:
+        _local.session = None
+        previous.stop()
+    mode = profile_mode()
+    _local.session = ProfileSession(name, mode, all_threads=all_threads).start() if mode else None
+    return _local.session
+
+
+def finish(session):
+    """Stop ``session`` (None is ignored) and report where the output went"""
+    if session is None:
+        return
+    if getattr(_local, 'session', None) is session:
+        _local.session = None
+    for path in session.stop():
+        print(f"🔬 Profile written: {path}")
+
+
+def profile_main(name):
+    """Decorator profiling a script's ``main`` across all threads when switched on"""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            mode = profile_mode()
+            if mode is None:
+                return func(*args, **kwargs)
+            session = ProfileSession(name, mode).start()
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                paths = session.stop()
+                print(f"\n🔬 Profiled {name} ({mode}) in {time.perf_counter() - started:.2f}s:")
+                for path in paths:
+                    print(f"   {path}")
+        return wrapper
+    return decorate
@@ -0,0 +1,134 @@
+"""
+Export Run Log
+One structured record per export run: per-stage start/end, durations, API
+calls, rows fetched and written and errors, plus each output's size on disk.
+Records are appended to a JSONL file (SPOTIFY_RUN_LOG, default
+export_runs.jsonl) and, when the run wrote the SQLite database, to its
+export_runs table, so export time and data growth can be trended over weeks.
+"""
+
+import json
+import os
+import sqlite3
+
+# JSONL file every export appends its run record to
+RUN_LOG_ENV = 'SPOTIFY_RUN_LOG'
+DEFAULT_RUN_LOG = 'export_runs.jsonl'
+
+
+def disk_usage(path):
+    """Bytes used by a file (with its SQLite WAL) or a folder tree"""
+    if not path or not os.path.exists(path):
+        return 0
+    if os.path.isfile(path):
+        wal = f"{path}-wal"
+        return os.path.getsize(path) + (os.path.getsize(wal) if os.path.exists(wal) else 0)
+    total = 0
+    for folder, _, files in os.walk(path):
+        for filename in files:
+            total += os.path.getsize(os.path.join(folder, filename))
+    return total
+
+
+def _iso(moment):
+    return moment.isoformat(timespec='milliseconds') if moment else None
+
+
+def _error_text(error):
+    return f"{type(error).__name__}: {error}"
+
+
+def build_run_record(pipeline, metrics=None, error=None):
+    """The run record for a finished (or failed) ExportPipeline and its ApiMetrics"""
+    stages = []
+    for name, t in pipeline.timings.items():
+        stages.append({
+            'stage': name,
+            'started_at': _iso(t['started']),
+            'finished_at': _iso(t['finished']),
+            'duration_s': round((t['finished'] - t['started']).total_seconds(), 3)
+            if t['started'] and t['finished'] else None,
+            'fetch_s': round(t['fetch'], 3),
+            'wait_s': round(t['wait'], 3),
+            'write_s': round(t['write'], 3),
+            'api_calls': t['api_calls'],
+            'cache_hits': t['cache_hits'],
+            'rows_fetched': t['rows'],
+            'rows_written': dict(t['written']),
+            'error': _error_text(t['error']) if t['error'] else None,
+        })
+
+    outputs = {}
+    for sink in pipeline.sinks:
+        output_path = getattr(sink, 'output_path', None)
+        path = output_path() if output_path else None
+        if path:
+            outputs[sink.name] = {'path': path, 'bytes': disk_usage(path)}
+
+    errors = [{'where': where, 'error': _error_text(e)} for where, e in pipeline.errors]
+    if error is not None and not any(e is error for _, e in pipeline.errors):
+        errors.append({'where': 'run', 'error': _error_text(error)})
+
+    started_at = getattr(pipeline, 'started_at', None)
+    finished_at = getattr(pipeline, 'finished_at', None)
+    record = {
+        'run_id': pipeline.run_id,
+        'started_at': _iso(started_at),
+        'finished_at': _iso(finished_at),
+        'duration_s': round(pipeline.elapsed, 3) if hasattr(pipeline, 'elapsed') else None,
+        'status': 'failed' if errors else 'success',
+        'formats': [sink.name for sink in pipeline.sinks],
+        'api_calls': sum(s['api_calls'] for s in stages),
+        'rows_fetched': sum(s['rows_fetched'] for s in stages),
+        'rows_written': sum(sum(s['rows_written'].values()) for s in stages),
+        'bytes_on_disk': sum(o['bytes'] for o in outputs.values()),
+        'outputs': outputs,
+        'errors': errors,
+        'stages': stages,
+    }
+    if metrics is not None:
+        record['api'] = metrics.summary()
+    return record
+
+
+def append_run_log(record, path=None):
+    """Append ``record`` as one JSON line; returns the file it went to"""
+    path = path or os.getenv(RUN_LOG_ENV, DEFAULT_RUN_LOG)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    return path
+
+
+def save_run_record(db_name, record):
+    """Insert ``record`` into the export_runs table of ``db_name``"""
+    conn = sqlite3.connect(db_name, timeout=30)
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO export_runs (run_id, started_at, finished_at, duration_s, status, formats,"
+                " api_calls, rows_fetched, rows_written, bytes_on_disk, errors, record)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (record['run_id'], record['started_at'], record['finished_at'], record['duration_s'],
+                 record['status'], ','.join(record['formats']), record['api_calls'], record['rows_fetched'],
+                 record['rows_written'], record['bytes_on_disk'], json.dumps(record['errors']),
+                 json.dumps(record, ensure_ascii=False)),
+            )
+    finally:
+        conn.close()
+
+
+def log_export_run(pipeline, metrics=None, error=None):
+    """Build the run record, append it to the JSONL log and the export_runs table"""
+    record = build_run_record(pipeline, metrics, error)
+    try:
+        path = append_run_log(record)
+        print(f"📝 Run {record['run_id']} logged to {path}")
+    except OSError as e:
+        print(f"⚠️  Could not write run log: {e}")
+    for sink in pipeline.sinks:
+        if sink.name == 'sqlite':
+            try:
+                save_run_record(sink.db_name, record)
+            except sqlite3.Error as e:
+                print(f"⚠️  Could not store run in {sink.db_name}: {e}")
+    return record
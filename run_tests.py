@@ -1,5 +1,6 @@
 """
 Test runner script with coverage reporting
+and a performance regression gate (--perf)
 """
 import sys
 import unittest
@@ -53,8 +54,161 @@ def run_specific_test(test_module, test_class=None, test_method=None):
     return 0 if result.wasSuccessful() else 1
 
 
+PERF_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'perf_baseline.json')
+PERF_SIZES = '50,10000,100000'
+
+# A benchmark regresses when it exceeds the baseline by more than these
+LATENCY_TOLERANCE = 0.25     # relative to the baseline median
+NOISE_IQR_FACTOR = 1.5       # times the larger interquartile range of the two runs
+LATENCY_FLOOR_MS = 2.0       # never flag differences smaller than this
+MEMORY_TOLERANCE = 0.20
+MEMORY_FLOOR_BYTES = 256 * 1024
+
+# machine_info fields that must match for latencies to be compared strictly
+MACHINE_FIELDS = ('node', 'machine', 'processor', 'cpu_count', 'python_version')
+
+
+def same_machine(current, baseline):
+    """Whether both result documents were recorded on the same machine and Python"""
+    current_info, base_info = current.get('machine_info', {}), baseline.get('machine_info', {})
+    return all(current_info.get(field) == base_info.get(field) for field in MACHINE_FIELDS)
+
+
+def compare_benchmarks(current, baseline, latency_tolerance=LATENCY_TOLERANCE, strict_latency=True):
+    """Compare two benchmark result documents; returns one row per benchmark.
+
+    Latency uses the median plus a noise margin taken from both runs' IQR,
+    memory the tracemalloc peak, and API calls must not grow at all. Startup
+    benchmarks also fail when an entry point starts importing a heavy package
+    (pandas, spotipy, ...) it did not import before. Without
+    ``strict_latency`` (a baseline from another machine) slower medians are
+    only reported as warnings, since they may just be a slower machine.
+    """
+    base_by_name = {b['fullname']: b for b in baseline['benchmarks']}
+    rows = []
+    for bench in current['benchmarks']:
+        base = base_by_name.get(bench['fullname'])
+        row = {'name': bench['fullname'], 'median_ms': bench['stats']['median'] * 1000,
+               'peak_mb': bench['extra_info']['peak_memory_bytes'] / 2 ** 20,
+               'api_calls': bench['extra_info']['api_calls'], 'regressions': [], 'warnings': []}
+        rows.append(row)
+        if base is None:
+            row['status'] = '🆕 new'
+            continue
+
+        base_median = base['stats']['median']
+        noise = NOISE_IQR_FACTOR * max(base['stats']['iqr'], bench['stats']['iqr'])
+        allowed = base_median * (1 + latency_tolerance) + max(noise, LATENCY_FLOOR_MS / 1000)
+        base_peak = base['extra_info']['peak_memory_bytes']
+        row.update({
+            'base_median_ms': base_median * 1000,
+            'base_peak_mb': base_peak / 2 ** 20,
+            'base_api_calls': base['extra_info']['api_calls'],
+        })
+        if bench['stats']['median'] > allowed:
+            row['regressions' if strict_latency else 'warnings'].append('latency')
+        if bench['extra_info']['peak_memory_bytes'] > base_peak * (1 + MEMORY_TOLERANCE) + MEMORY_FLOOR_BYTES:
+            row['regressions'].append('memory')
+        if row['api_calls'] > row['base_api_calls']:
+            row['regressions'].append('api calls')
+        heavy = set(bench['extra_info'].get('heavy_imports', [])) - set(base['extra_info'].get('heavy_imports', []))
+        if heavy:
+            row['regressions'].append(f"imports {', '.join(sorted(heavy))}")
+
+        if row['regressions']:
+            row['status'] = '❌ ' + ', '.join(row['regressions'])
+        elif row['warnings']:
+            row['status'] = '⚠️  ' + ', '.join(row['warnings']) + ' (other machine)'
+        elif bench['stats']['median'] < base_median * (1 - latency_tolerance) - noise:
+            row['status'] = '⚡ faster'
+        else:
+            row['status'] = '✅ ok'
+    return rows
+
+
+def _change(current, base):
+    if not base:
+        return ''
+    return f"{(current - base) / base:+.0%}"
+
+
+def print_perf_report(rows):
+    """Per-benchmark diff table of median latency, peak memory and API calls"""
+    print("\n" + "=" * 118)
+    print("PERFORMANCE REPORT")
+    print("=" * 118)
+    print(f"{'benchmark':<52}{'base ms':>9}{'ms':>9}{'diff':>7}{'base MB':>9}{'MB':>8}{'diff':>7}"
+          f"{'calls':>8}  status")
+    for row in rows:
+        base_ms = row.get('base_median_ms')
+        base_mb = row.get('base_peak_mb')
+        base_calls = row.get('base_api_calls')
+        calls = f"{base_calls}->{row['api_calls']}" if base_calls is not None else str(row['api_calls'])
+        print(f"{row['name']:<52}"
+              f"{'' if base_ms is None else f'{base_ms:.2f}':>9}{row['median_ms']:>9.2f}"
+              f"{_change(row['median_ms'], base_ms):>7}"
+              f"{'' if base_mb is None else f'{base_mb:.1f}':>9}{row['peak_mb']:>8.1f}"
+              f"{_change(row['peak_mb'], base_mb):>7}"
+              f"{calls:>8}  {row['status']}")
+    print("=" * 118)
+
+
+def run_perf_tests(argv=None):
+    """Run the benchmark suite and fail on regressions against the stored baseline"""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Performance regression gate")
+    parser.add_argument('--perf', action='store_true')
+    parser.add_argument('--baseline', default=PERF_BASELINE, help="Baseline results file")
+    parser.add_argument('--sizes', default=PERF_SIZES, help="Comma-separated library sizes in plays")
+    parser.add_argument('--filter', help="Only run benchmarks whose group/name[plays] contains this")
+    parser.add_argument('--tolerance', type=float, default=LATENCY_TOLERANCE,
+                        help="Allowed relative latency increase over the baseline median")
+    parser.add_argument('--output', help="Also write this run's results to a file")
+    parser.add_argument('--update-baseline', action='store_true', help="Store this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    from benchmarks.benchmark_suite import run_suite
+
+    sizes = [int(float(s)) for s in args.sizes.split(',') if s.strip()]
+    current = run_suite(sizes, args.filter, min_rounds=5, max_time=1.0)
+    for bench in current['benchmarks']:
+        bench['stats'].pop('data', None)  # raw timings would bloat the baseline
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+        print(f"\n💾 Baseline written to {args.baseline} ({len(current['benchmarks'])} benchmarks)")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    strict = same_machine(current, baseline)
+    if not strict:
+        print("\n⚠️  Baseline was recorded on another machine; slower latencies are reported as warnings. "
+              "Run with --update-baseline to record one here.")
+    if baseline.get('commit_info', {}).get('dirty'):
+        print("⚠️  Baseline was recorded from a tree with uncommitted changes")
+
+    rows = compare_benchmarks(current, baseline, args.tolerance, strict_latency=strict)
+    print_perf_report(rows)
+    failed = [row for row in rows if row['regressions']]
+    if failed:
+        print(f"❌ {len(failed)} of {len(rows)} benchmarks regressed")
+        return 1
+    print(f"✅ No regressions in {len(rows)} benchmarks")
+    return 0
+
+
 if __name__ == '__main__':
-    if len(sys.argv) > 1:
+    if '--perf' in sys.argv[1:]:
+        # Performance regression gate
+        exit_code = run_perf_tests(sys.argv[1:])
+    elif len(sys.argv) > 1:
         # Run specific test
         test_path = sys.argv[1]
         parts = test_path.split('.')
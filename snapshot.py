@@ -0,0 +1,125 @@
+"""
+Dashboard Snapshot
+Stores every dashboard dataset in one uncompressed Arrow IPC file so the
+dashboard can memory-map it instead of querying SQLite on each rerun
+"""
+
+import os
+from datetime import datetime
+
+import pyarrow as pa
+
+from db_data import RECORD_DATASETS
+from timing import record
+
+SNAPSHOT_PATH = "spotify_snapshot.arrow"
+
+# Export dataset name -> key used by the dashboards
+SNAPSHOT_DATASETS = {
+    'top_artists': 'top_artists',
+    'top_tracks': 'top_tracks',
+    'genres': 'genres',
+    'recently_played': 'recently_played',
+    'audio_features': 'audio_features',
+    'listening_patterns': 'listening_hours',
+    'listening_heatmap': 'listening_heatmap',
+    'music_personality': 'personality',
+    'diversity_score': 'diversity',
+    'hidden_gems': 'hidden_gems',
+    'binge_listening': 'binge_listening',
+}
+
+
+def write_snapshot(datasets, path=SNAPSHOT_PATH, run_id=''):
+    """Write ``{key: DataFrame}`` as a one-row Arrow table.
+
+    Each dataset becomes a ``list<struct>`` column, which keeps datasets with
+    different schemas in a single file. The file is written uncompressed so
+    readers can memory-map it, and it is replaced atomically.
+    """
+    columns = {key: _dataset_column(df) for key, df in datasets.items()}
+    _write_table(pa.table(columns), path, run_id)
+
+
+def update_snapshot(datasets, path=SNAPSHOT_PATH, run_id=None):
+    """Replace some datasets of an existing snapshot and keep the others.
+
+    The run id is kept unless one is given, so charts pre-rendered for that
+    run still match. Returns False when there is no snapshot yet to update.
+    """
+    if not os.path.exists(path):
+        return False
+    # Read into memory, not mapped, so the file can be replaced underneath
+    with pa.OSFile(path, 'rb') as source:
+        snapshot = pa.ipc.open_file(source).read_all()
+    if run_id is None:
+        run_id = (snapshot.schema.metadata or {}).get(b'run_id', b'').decode()
+    for key, df in datasets.items():
+        column = _dataset_column(df)
+        if key in snapshot.column_names:
+            snapshot = snapshot.set_column(snapshot.column_names.index(key), key, column)
+        else:
+            snapshot = snapshot.append_column(key, column)
+    _write_table(snapshot, path, run_id)
+    return True
+
+
+def _dataset_column(df):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    rows = table.to_struct_array().combine_chunks() if table.num_columns else pa.array([], pa.struct([]))
+    return pa.ListArray.from_arrays(pa.array([0, len(table)], pa.int32()), rows)
+
+
+def _write_table(snapshot, path, run_id):
+    metadata = {'run_id': run_id, 'created_at': datetime.now().isoformat(timespec='seconds')}
+    snapshot = snapshot.replace_schema_metadata(metadata)
+    tmp_path = f"{path}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, snapshot.schema) as writer:
+            writer.write_table(snapshot)
+    os.replace(tmp_path, path)
+
+
+def snapshot_version(path=SNAPSHOT_PATH):
+    """Return ``(mtime_ns, run_id)`` reading only the file footer, or None"""
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    with pa.memory_map(path) as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+    return mtime_ns, metadata.get(b'run_id', b'').decode()
+
+
+class Snapshot:
+    """Memory-mapped snapshot whose datasets convert to pandas on first use.
+
+    The Arrow buffers are mapped, not read. Only the pandas conversion
+    copies data, and it happens once per dataset.
+    """
+
+    def __init__(self, path=SNAPSHOT_PATH):
+        self.table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        self.metadata = {k.decode(): v.decode() for k, v in (self.table.schema.metadata or {}).items()}
+        self._data = {}
+
+    def keys(self):
+        return self.table.column_names
+
+    def get(self, key):
+        """Return one dataset as a DataFrame, or a dict for record datasets"""
+        if key not in self._data:
+            with record('normalize', f"snapshot {key}"):
+                rows = self.table.column(key).chunk(0).values
+                df = pa.Table.from_struct_array(rows).to_pandas() if rows.type.num_fields else pa.table({}).to_pandas()
+                if key in RECORD_DATASETS:
+                    self._data[key] = df.to_dict('records')[0] if len(df) else {}
+                else:
+                    self._data[key] = df
+        return self._data[key]
+
+
+def read_snapshot(path=SNAPSHOT_PATH):
+    """Return ``({key: DataFrame or record}, metadata)`` for every dataset"""
+    snapshot = Snapshot(path)
+    return {key: snapshot.get(key) for key in snapshot.keys()}, snapshot.metadata
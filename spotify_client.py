@@ -1,32 +1,82 @@
 import spotipy
+from spotipy.cache_handler import MemoryCacheHandler
 from spotipy.oauth2 import SpotifyOAuth
 from dotenv import load_dotenv
 import os
+import threading
+import time
+
+from api_metrics import ApiMetrics, instrumented
+from timing import count, record
 
 load_dotenv()
 
+# Set to a local API stand-in (python -m tests.spotify_api_server), e.g.
+# http://127.0.0.1:8765, to run against it instead of Spotify
+API_URL_ENV = 'SPOTIFY_API_URL'
+# Set as well when the stand-in runs with --upstream: sign in to Spotify as
+# usual and only send API requests through the stand-in
+API_UPSTREAM_ENV = 'SPOTIFY_API_UPSTREAM'
+
+
+def stand_in_spotify(api_url, scope):
+    """spotipy client whose API and token requests go to ``api_url``.
+
+    Starts from an expired token, so the first request exercises the refresh.
+    """
+    api_url = api_url.rstrip('/')
+    expired = {'access_token': 'expired', 'token_type': 'Bearer', 'expires_in': 0, 'expires_at': 0,
+               'refresh_token': 'stand-in-refresh-token', 'scope': scope}
+    auth_manager = SpotifyOAuth(
+        client_id=os.getenv('SPOTIPY_CLIENT_ID') or 'stand-in',
+        client_secret=os.getenv('SPOTIPY_CLIENT_SECRET') or 'stand-in',
+        redirect_uri=os.getenv('SPOTIPY_REDIRECT_URI') or 'http://127.0.0.1:8888/callback',
+        scope=scope,
+        open_browser=False,
+        cache_handler=MemoryCacheHandler(expired),
+    )
+    auth_manager.OAUTH_AUTHORIZE_URL = api_url + '/authorize'
+    auth_manager.OAUTH_TOKEN_URL = api_url + '/api/token'
+    sp = spotipy.Spotify(auth_manager=auth_manager)
+    sp.prefix = api_url + '/v1/'
+    return sp
+
+
 class SpotifyClient:
-    def __init__(self):
+    def __init__(self, metrics=None):
         self.scope = "user-read-recently-played user-top-read user-library-read"
-        self.sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
-            client_id=os.getenv('SPOTIPY_CLIENT_ID'),
-            client_secret=os.getenv('SPOTIPY_CLIENT_SECRET'),
-            redirect_uri=os.getenv('SPOTIPY_REDIRECT_URI'),
-            scope=self.scope
-        ))
+        api_url = os.getenv(API_URL_ENV)
+        if api_url and not os.getenv(API_UPSTREAM_ENV):
+            self.sp = stand_in_spotify(api_url, self.scope)
+        else:
+            self.sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
+                client_id=os.getenv('SPOTIPY_CLIENT_ID'),
+                client_secret=os.getenv('SPOTIPY_CLIENT_SECRET'),
+                redirect_uri=os.getenv('SPOTIPY_REDIRECT_URI'),
+                scope=self.scope
+            ))
+            if api_url:
+                self.sp.prefix = api_url.rstrip('/') + '/v1/'
+        # Every HTTP response spotipy receives is counted, retried 429s included
+        self.metrics = metrics or ApiMetrics()
+        self.sp._session.hooks['response'].append(self.metrics.response_hook)
     
+    @instrumented('top_artists')
     def get_top_artists(self, time_range='medium_term', limit=50):
         """Get user's top artists. time_range: short_term, medium_term, long_term"""
         return self.sp.current_user_top_artists(time_range=time_range, limit=limit)
     
+    @instrumented('top_tracks')
     def get_top_tracks(self, time_range='medium_term', limit=50):
         """Get user's top tracks"""
         return self.sp.current_user_top_tracks(time_range=time_range, limit=limit)
     
-    def get_recently_played(self, limit=50):
-        """Get recently played tracks"""
-        return self.sp.current_user_recently_played(limit=limit)
+    @instrumented('recently_played')
+    def get_recently_played(self, limit=50, after=None):
+        """Get recently played tracks, only those played after ``after`` (Unix ms) if given"""
+        return self.sp.current_user_recently_played(limit=limit, after=after)
     
+    @instrumented('audio_features')
     def get_audio_features(self, track_ids):
         """Get audio features for tracks (energy, valence, danceability, etc.)"""
         # Split into smaller batches to avoid rate limits
@@ -38,11 +88,110 @@ class SpotifyClient:
                 features = self.sp.audio_features(batch)
                 all_features.extend(features)
             except Exception as e:
+                # Still rate limited after spotipy's retries: let the caller retry later
+                if getattr(e, 'http_status', None) == 429:
+                    raise
                 print(f"Warning: Could not fetch audio features: {e}")
                 all_features.extend([None] * len(batch))
         return all_features
     
+    @instrumented('artist')
     def get_artist_genres(self, artist_id):
         """Get genres for an artist"""
         artist = self.sp.artist(artist_id)
         return artist.get('genres', [])
+
+
+class CachingSpotifyClient:
+    """Memoizes SpotifyClient calls so each endpoint is requested once per run.
+
+    Safe to share between threads: concurrent callers asking for the same
+    data wait for the first request instead of issuing their own. With a
+    ``ttl`` (seconds) responses expire, which suits long-lived dashboards;
+    audio features never change and are kept regardless. Missing features
+    (None, e.g. from a failed batch) are not cached and are asked for again.
+    """
+
+    def __init__(self, client, ttl=None):
+        self.client = client
+        self.ttl = ttl
+        self._results = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._features = {}
+        self._features_lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def _call(self, key, fetch):
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        with key_lock:
+            cached = self._results.get(key)
+            if cached is None or (self.ttl is not None and time.monotonic() - cached[0] > self.ttl):
+                count('api_calls')
+                with record('api', key[0]):
+                    result = fetch()
+                cached = (time.monotonic(), result)
+                self._results[key] = cached
+            else:
+                count('client_cache_hits')
+            return cached[1]
+
+    def clear(self):
+        """Forget every cached response"""
+        with self._lock:
+            self._results.clear()
+            self._locks.clear()
+        with self._features_lock:
+            self._features.clear()
+
+    def cached_responses(self):
+        """Every cached response and audio feature, JSON-friendly, for export checkpoints"""
+        # Entries are added under per-key locks; list() copies the dict in one step
+        responses = [[list(key), cached[1]] for key, cached in list(self._results.items())]
+        with self._features_lock:
+            features = dict(self._features)
+        return {'responses': responses, 'audio_features': features}
+
+    def restore(self, cached):
+        """Seed the cache with the output of ``cached_responses()``"""
+        now = time.monotonic()
+        with self._lock:
+            for key, result in cached.get('responses', []):
+                self._results[tuple(key)] = (now, result)
+        with self._features_lock:
+            self._features.update((tid, feature) for tid, feature in cached.get('audio_features', {}).items()
+                                  if feature is not None)
+
+    def get_top_artists(self, time_range='medium_term', limit=50):
+        return self._call(('top_artists', time_range, limit),
+                          lambda: self.client.get_top_artists(time_range=time_range, limit=limit))
+
+    def get_top_tracks(self, time_range='medium_term', limit=50):
+        return self._call(('top_tracks', time_range, limit),
+                          lambda: self.client.get_top_tracks(time_range=time_range, limit=limit))
+
+    def get_recently_played(self, limit=50, after=None):
+        return self._call(('recently_played', limit, after),
+                          lambda: self.client.get_recently_played(limit=limit, after=after))
+
+    def get_audio_features(self, track_ids):
+        """Cached per track, so overlapping id lists only fetch what is missing"""
+        with self._features_lock:
+            missing = [tid for tid in dict.fromkeys(track_ids) if tid not in self._features]
+            if missing:
+                count('api_calls')
+                with record('api', 'audio_features'):
+                    fetched = self.client.get_audio_features(missing)
+                fetched = dict(zip(missing, fetched))
+                self._features.update((tid, feature) for tid, feature in fetched.items() if feature is not None)
+            else:
+                fetched = {}
+                count('client_cache_hits')
+            return [self._features.get(tid, fetched.get(tid)) for tid in track_ids]
+
+    def get_artist_genres(self, artist_id):
+        return self._call(('artist_genres', artist_id),
+                          lambda: self.client.get_artist_genres(artist_id))
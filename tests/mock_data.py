@@ -0,0 +1,407 @@
+"""
+Mock Spotify Data
+Seeded synthetic listening library and a MockSpotifyClient with the same
+surface as SpotifyClient, so the dashboards, exporters and benchmarks run
+offline at any size from 50 plays to 10M plays.
+
+The same seed always produces the same library. Artists and tracks follow
+a Zipf distribution, so a few favourites dominate. Plays follow a daily
+listening curve with busier weekends, and every artist has one to three
+genres drawn from a skewed genre list.
+"""
+
+import math
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+# Fixed "now" so generated histories are reproducible
+REFERENCE_END = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+# Share of plays per hour of day: quiet nights, morning commute, evening peak
+DIURNAL_CURVE = np.array([
+    1.2, 0.7, 0.4, 0.3, 0.3, 0.5, 1.5, 3.5, 5.0, 4.5, 4.0, 4.2,
+    5.0, 4.8, 4.2, 4.3, 5.0, 6.0, 7.0, 7.5, 7.2, 6.0, 4.0, 2.2,
+])
+# Monday..Sunday
+WEEKDAY_WEIGHTS = np.array([1.0, 1.0, 1.0, 1.05, 1.15, 1.3, 1.2])
+
+GENRES = [
+    'pop', 'rock', 'indie', 'hip hop', 'rap', 'r&b', 'electronic', 'house', 'techno',
+    'edm', 'dance pop', 'indie pop', 'alternative rock', 'modern rock', 'metal', 'punk',
+    'folk', 'indie folk', 'singer-songwriter', 'country', 'jazz', 'soul', 'funk', 'blues',
+    'classical', 'lo-fi', 'ambient', 'k-pop', 'latin', 'reggaeton', 'afrobeats', 'reggae',
+    'synthpop', 'shoegaze', 'dream pop', 'trap', 'drill', 'grime', 'bossa nova', 'bollywood',
+]
+ADJECTIVES = [
+    'Velvet', 'Neon', 'Silent', 'Golden', 'Electric', 'Midnight', 'Crystal', 'Wild', 'Paper',
+    'Lunar', 'Broken', 'Scarlet', 'Hollow', 'Cosmic', 'Sunset', 'Frozen', 'Bright', 'Lost',
+    'Northern', 'Echo',
+]
+NOUNS = [
+    'Echoes', 'Tigers', 'Harbor', 'Rivers', 'Lights', 'Foxes', 'Parade', 'Signals', 'Gardens',
+    'Ghosts', 'Wolves', 'Satellites', 'Mirrors', 'Horizon', 'Avenue', 'Arcade', 'Shadows',
+    'Machines', 'Tides', 'Circus',
+]
+WORDS = [
+    'Love', 'Night', 'Fire', 'Dream', 'Heart', 'Summer', 'Rain', 'Home', 'Gold', 'Dance',
+    'Stars', 'Ocean', 'City', 'Youth', 'Storm', 'Blue', 'Runaway', 'Forever', 'Motion', 'Glow',
+    'Paradise', 'Velocity', 'Lullaby', 'Static', 'Wonder',
+]
+
+# Time range -> days of history Spotify's top items consider
+TIME_RANGE_DAYS = {'short_term': 28, 'medium_term': 182, 'long_term': None}
+
+
+def zipf_weights(n, s=1.1):
+    """Normalized Zipf weights for ranks 1..n"""
+    weights = 1.0 / np.arange(1, n + 1) ** s
+    return weights / weights.sum()
+
+
+def _combined_name(i, first, second):
+    # Skewed pairing so neighbouring (most played) ranks do not share a word
+    name = f"{first[i % len(first)]} {second[(i // len(first) + 7 * i) % len(second)]}"
+    cycle = i // (len(first) * len(second))
+    return f"{name} {cycle + 1}" if cycle else name
+
+
+def artist_name(i):
+    return "The " + _combined_name(i, ADJECTIVES, NOUNS) if i % 3 == 0 else _combined_name(i, ADJECTIVES, NOUNS)
+
+
+def track_name(i):
+    return _combined_name(i, WORDS, WORDS[::-1])
+
+
+class SyntheticLibrary:
+    """Seeded artists, tracks, audio features and a play history.
+
+    Everything is held in numpy arrays, so 10M plays keep about 120 MB and
+    take a few seconds to build. Payloads are only built for the items that
+    are actually requested.
+    """
+
+    def __init__(self, plays=50, seed=42, artists=None, tracks=None, days=None,
+                 plays_per_day=40, zipf_s=1.1, end=REFERENCE_END):
+        rng = np.random.default_rng(seed)
+        self.seed = seed
+        self.end = end
+        self.n_plays = int(plays)
+        self.n_artists = artists or int(min(20000, max(60, 2 * math.sqrt(self.n_plays))))
+        self.n_tracks = tracks or int(min(200000, self.n_artists * 6))
+        self.days = days or int(min(3650, max(1, math.ceil(self.n_plays / plays_per_day))))
+
+        # Artists: popular ones own more tracks and get more plays
+        artist_rank_weights = zipf_weights(self.n_artists, zipf_s)
+        self.track_artist = rng.choice(self.n_artists, size=self.n_tracks, p=artist_rank_weights).astype(np.int32)
+        rank = np.arange(self.n_artists)
+        self.artist_popularity = np.clip(
+            95 - 60 * rank / max(1, self.n_artists - 1) + rng.normal(0, 8, self.n_artists), 1, 100).astype(np.int16)
+        self.artist_followers = (np.exp(self.artist_popularity / 9.0) * rng.lognormal(3, 1, self.n_artists)).astype(np.int64)
+        genre_weights = zipf_weights(len(GENRES), 0.9)
+        self.artist_genres = [
+            list(rng.choice(GENRES, size=rng.integers(1, 4), replace=False, p=genre_weights))
+            for _ in range(self.n_artists)
+        ]
+
+        # Tracks
+        self.track_popularity = np.clip(
+            self.artist_popularity[self.track_artist] + rng.normal(-10, 15, self.n_tracks), 0, 100).astype(np.int16)
+        self.track_duration_ms = np.clip(rng.normal(210000, 45000, self.n_tracks), 90000, 600000).astype(np.int32)
+        self.track_album = (self.track_artist * 4 + rng.integers(0, 4, self.n_tracks)).astype(np.int32)
+        self.track_release_year = rng.integers(1970, end.year + 1, self.n_tracks)
+        self.features = {
+            'danceability': rng.beta(5, 3, self.n_tracks),
+            'energy': rng.beta(4, 3, self.n_tracks),
+            'key': rng.integers(0, 12, self.n_tracks),
+            'loudness': np.clip(rng.normal(-7, 3, self.n_tracks), -30, 0),
+            'mode': rng.integers(0, 2, self.n_tracks),
+            'speechiness': rng.beta(1, 12, self.n_tracks),
+            'acousticness': rng.beta(1.2, 3, self.n_tracks),
+            'instrumentalness': rng.beta(0.5, 8, self.n_tracks),
+            'liveness': rng.beta(1.5, 8, self.n_tracks),
+            'valence': rng.beta(3, 3, self.n_tracks),
+            'tempo': np.clip(rng.normal(120, 25, self.n_tracks), 60, 200),
+            'time_signature': rng.choice([3, 4, 5], size=self.n_tracks, p=[0.08, 0.9, 0.02]),
+        }
+
+        # Plays: Zipf over tracks, shuffled so track id is not popularity rank
+        track_rank = rng.permutation(self.n_tracks)
+        self.play_track = track_rank[rng.choice(self.n_tracks, size=self.n_plays, p=zipf_weights(self.n_tracks, zipf_s))].astype(np.int32)
+
+        # Timestamps: weekday-weighted day, diurnal hour, uniform second
+        end_s = int(end.timestamp())
+        first_day = ((end_s - 1) // 86400) - self.days + 1
+        day_numbers = first_day + np.arange(self.days)
+        weekdays = (day_numbers + 3) % 7  # 1970-01-01 was a Thursday
+        day_p = WEEKDAY_WEIGHTS[weekdays] / WEEKDAY_WEIGHTS[weekdays].sum()
+        days_chosen = rng.choice(day_numbers, size=self.n_plays, p=day_p)
+        hours = rng.choice(24, size=self.n_plays, p=DIURNAL_CURVE / DIURNAL_CURVE.sum())
+        played_ms = (days_chosen * 86400 + hours * 3600) * 1000 + rng.integers(0, 3600 * 1000, self.n_plays)
+        played_ms = np.minimum(played_ms, end_s * 1000)
+        order = np.argsort(played_ms, kind='stable')[::-1]  # newest first, like the API
+        self.played_ms = played_ms[order]
+        self.play_track = self.play_track[order]
+        self._top_cache = {}
+
+    # --- payload builders -------------------------------------------------
+
+    def artist_id(self, i):
+        return f"mockartist{i:07d}"
+
+    def track_id(self, i):
+        return f"mocktrack{i:08d}"
+
+    def artist(self, i):
+        """Spotify artist object"""
+        return {
+            'id': self.artist_id(i),
+            'name': artist_name(i),
+            'type': 'artist',
+            'uri': f"spotify:artist:{self.artist_id(i)}",
+            'href': f"https://api.spotify.com/v1/artists/{self.artist_id(i)}",
+            'external_urls': {'spotify': f"https://open.spotify.com/artist/{self.artist_id(i)}"},
+            'genres': list(self.artist_genres[i]),
+            'popularity': int(self.artist_popularity[i]),
+            'followers': {'href': None, 'total': int(self.artist_followers[i])},
+            'images': [{'url': f"https://i.scdn.co/image/mock-artist-{i}", 'height': 640, 'width': 640}],
+        }
+
+    def track(self, i):
+        """Spotify track object"""
+        a = int(self.track_artist[i])
+        album = int(self.track_album[i])
+        return {
+            'id': self.track_id(i),
+            'name': track_name(i),
+            'type': 'track',
+            'uri': f"spotify:track:{self.track_id(i)}",
+            'href': f"https://api.spotify.com/v1/tracks/{self.track_id(i)}",
+            'external_urls': {'spotify': f"https://open.spotify.com/track/{self.track_id(i)}"},
+            'popularity': int(self.track_popularity[i]),
+            'duration_ms': int(self.track_duration_ms[i]),
+            'explicit': bool(i % 7 == 0),
+            'artists': [{
+                'id': self.artist_id(a),
+                'name': artist_name(a),
+                'type': 'artist',
+                'uri': f"spotify:artist:{self.artist_id(a)}",
+                'external_urls': {'spotify': f"https://open.spotify.com/artist/{self.artist_id(a)}"},
+            }],
+            'album': {
+                'id': f"mockalbum{album:07d}",
+                'name': f"{track_name(album)} (Album)",
+                'album_type': 'album',
+                'release_date': f"{int(self.track_release_year[i])}-01-01",
+                'release_date_precision': 'day',
+                'images': [{'url': f"https://i.scdn.co/image/mock-album-{album}", 'height': 640, 'width': 640}],
+            },
+        }
+
+    def audio_features(self, i):
+        """Spotify audio features object"""
+        features = {name: values[i].item() for name, values in self.features.items()}
+        features.update({
+            'id': self.track_id(i),
+            'type': 'audio_features',
+            'uri': f"spotify:track:{self.track_id(i)}",
+            'track_href': f"https://api.spotify.com/v1/tracks/{self.track_id(i)}",
+            'analysis_url': f"https://api.spotify.com/v1/audio-analysis/{self.track_id(i)}",
+            'duration_ms': int(self.track_duration_ms[i]),
+        })
+        return features
+
+    # --- queries ----------------------------------------------------------
+
+    def _window(self, time_range):
+        days = TIME_RANGE_DAYS[time_range]
+        if days is None:
+            return self.play_track
+        cutoff = (int(self.end.timestamp()) - days * 86400) * 1000
+        # played_ms is sorted newest first
+        return self.play_track[:int(np.searchsorted(-self.played_ms, -cutoff, side='right'))]
+
+    def top_track_ids(self, time_range='medium_term'):
+        """Track indices ordered by plays within the time range"""
+        key = ('tracks', time_range)
+        if key not in self._top_cache:
+            counts = np.bincount(self._window(time_range), minlength=self.n_tracks)
+            played = np.flatnonzero(counts)
+            self._top_cache[key] = played[np.argsort(-counts[played], kind='stable')]
+        return self._top_cache[key]
+
+    def top_artist_ids(self, time_range='medium_term'):
+        """Artist indices ordered by plays within the time range"""
+        key = ('artists', time_range)
+        if key not in self._top_cache:
+            counts = np.bincount(self.track_artist[self._window(time_range)], minlength=self.n_artists)
+            played = np.flatnonzero(counts)
+            self._top_cache[key] = played[np.argsort(-counts[played], kind='stable')]
+        return self._top_cache[key]
+
+    def track_index(self, track_id):
+        if not track_id or not track_id.startswith('mocktrack'):
+            return None
+        i = int(track_id[len('mocktrack'):])
+        return i if 0 <= i < self.n_tracks else None
+
+    def artist_index(self, artist_id):
+        if not artist_id or not artist_id.startswith('mockartist'):
+            return None
+        i = int(artist_id[len('mockartist'):])
+        return i if 0 <= i < self.n_artists else None
+
+    def recently_played_frame(self):
+        """The whole history shaped like the recently_played table"""
+        played = pd.to_datetime(self.played_ms, unit='ms', utc=True).tz_localize(None)
+        track_names = np.array([track_name(i) for i in range(self.n_tracks)], dtype=object)
+        artist_names = np.array([artist_name(i) for i in range(self.n_artists)], dtype=object)
+        album_names = np.array([f"{track_name(a)} (Album)" for a in self.track_album], dtype=object)
+        track_urls = np.array([f"https://open.spotify.com/track/{self.track_id(i)}" for i in range(self.n_tracks)],
+                              dtype=object)
+        return pd.DataFrame({
+            'played_at': played.strftime('%Y-%m-%d %H:%M:%S'),
+            'track_name': track_names[self.play_track],
+            'artist': artist_names[self.track_artist[self.play_track]],
+            'album': album_names[self.play_track],
+            'duration_min': (self.track_duration_ms[self.play_track] / 60000).round(2),
+            'day_of_week': played.day_name(),
+            'hour': played.hour,
+            'spotify_url': track_urls[self.play_track],
+        })
+
+
+def _iso_ms(ms):
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.') + f"{ms % 1000:03d}Z"
+
+
+def _paging(href, items, limit, offset, total):
+    next_offset = offset + limit
+    return {
+        'href': f"{href}?limit={limit}&offset={offset}",
+        'items': items,
+        'limit': limit,
+        'offset': offset,
+        'total': total,
+        'next': f"{href}?limit={limit}&offset={next_offset}" if next_offset < total else None,
+        'previous': f"{href}?limit={limit}&offset={max(0, offset - limit)}" if offset else None,
+    }
+
+
+class MockSpotipy:
+    """The spotipy.Spotify methods the app reaches through ``client.sp``"""
+
+    def __init__(self, client):
+        self._client = client
+
+    def current_user(self):
+        return {'id': 'mock-user', 'display_name': 'Mock User', 'type': 'user', 'uri': 'spotify:user:mock-user'}
+
+    def current_user_top_artists(self, limit=20, offset=0, time_range='medium_term'):
+        return self._client.get_top_artists(time_range=time_range, limit=limit, offset=offset)
+
+    def current_user_top_tracks(self, limit=20, offset=0, time_range='medium_term'):
+        return self._client.get_top_tracks(time_range=time_range, limit=limit, offset=offset)
+
+    def current_user_recently_played(self, limit=50, after=None, before=None):
+        return self._client.get_recently_played(limit=limit, after=after, before=before)
+
+    def audio_features(self, tracks=[]):
+        return self._client.get_audio_features(list(tracks))
+
+    def artist(self, artist_id):
+        lib = self._client.library
+        i = lib.artist_index(artist_id)
+        if i is None:
+            raise ValueError(f"Unknown artist id: {artist_id}")
+        return lib.artist(i)
+
+
+class MockSpotifyClient:
+    """Drop-in SpotifyClient backed by a SyntheticLibrary.
+
+    ``latency`` (seconds) is slept on every call to mimic the network, and
+    ``calls`` counts calls per endpoint. Unlike the real API, recently
+    played can page through the whole history with ``before``/``after``
+    cursors (milliseconds), which suits incremental export tests.
+    """
+
+    def __init__(self, plays=50, seed=42, latency=0.0, library=None, **library_kwargs):
+        self.scope = "user-read-recently-played user-top-read user-library-read"
+        self.library = library or SyntheticLibrary(plays=plays, seed=seed, **library_kwargs)
+        self.latency = latency
+        self.calls = Counter()
+        self.sp = MockSpotipy(self)
+
+    def _call(self, endpoint):
+        self.calls[endpoint] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_top_artists(self, time_range='medium_term', limit=50, offset=0):
+        """Get user's top artists. time_range: short_term, medium_term, long_term"""
+        self._call('top_artists')
+        ids = self.library.top_artist_ids(time_range)
+        items = [self.library.artist(int(i)) for i in ids[offset:offset + limit]]
+        return _paging("https://api.spotify.com/v1/me/top/artists", items, limit, offset, len(ids))
+
+    def get_top_tracks(self, time_range='medium_term', limit=50, offset=0):
+        """Get user's top tracks"""
+        self._call('top_tracks')
+        ids = self.library.top_track_ids(time_range)
+        items = [self.library.track(int(i)) for i in ids[offset:offset + limit]]
+        return _paging("https://api.spotify.com/v1/me/top/tracks", items, limit, offset, len(ids))
+
+    def get_recently_played(self, limit=50, after=None, before=None):
+        """Get recently played tracks, newest first"""
+        self._call('recently_played')
+        lib = self.library
+        played = lib.played_ms  # newest first
+        if after is not None:
+            # The ``limit`` plays right after the cursor, so paging forward has no gaps
+            stop = int(np.searchsorted(-played, -int(after), side='left'))
+            start = max(0, stop - limit)
+        else:
+            start = 0 if before is None else int(np.searchsorted(-played, -int(before), side='right'))
+            stop = min(len(played), start + limit)
+        items = [{
+            'track': lib.track(int(lib.play_track[i])),
+            'played_at': _iso_ms(int(played[i])),
+            'context': None,
+        } for i in range(start, stop)]
+        cursors = {'after': str(int(played[start])), 'before': str(int(played[stop - 1]))} if items else None
+        return {
+            'href': "https://api.spotify.com/v1/me/player/recently-played",
+            'items': items,
+            'limit': limit,
+            'cursors': cursors,
+            'next': None if stop >= len(played) or not items else
+            f"https://api.spotify.com/v1/me/player/recently-played?before={cursors['before']}&limit={limit}",
+        }
+
+    def get_audio_features(self, track_ids):
+        """Get audio features for tracks (None for unknown ids, like the API)"""
+        self._call('audio_features')
+        features = []
+        for track_id in track_ids:
+            i = self.library.track_index(track_id)
+            features.append(None if i is None else self.library.audio_features(i))
+        return features
+
+    def get_artist_genres(self, artist_id):
+        """Get genres for an artist"""
+        self._call('artist_genres')
+        i = self.library.artist_index(artist_id)
+        return [] if i is None else list(self.library.artist_genres[i])
+
+
+# Small fixed samples for quick tests
+_SAMPLE_CLIENT = MockSpotifyClient(plays=500)
+SAMPLE_TOP_ARTISTS = _SAMPLE_CLIENT.get_top_artists(limit=10)['items']
+SAMPLE_TOP_TRACKS = _SAMPLE_CLIENT.get_top_tracks(limit=10)['items']
+SAMPLE_RECENTLY_PLAYED = _SAMPLE_CLIENT.get_recently_played(limit=10)['items']
+SAMPLE_AUDIO_FEATURES = _SAMPLE_CLIENT.get_audio_features([t['id'] for t in SAMPLE_TOP_TRACKS])
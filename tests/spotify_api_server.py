@@ -0,0 +1,336 @@
+"""
+Spotify API Stand-in Server
+A local HTTP server that impersonates the Spotify Web API endpoints the app
+uses, so the real SpotifyClient (spotipy, its retries and our caching and
+threading on top) can be run end to end without network access.
+
+Serves a MockSpotifyClient library by default, or fixtures recorded earlier.
+Latency, jitter and 429 responses with Retry-After can be injected.
+
+Usage:
+    python -m tests.spotify_api_server --plays 100000 --latency 0.05 --jitter 0.02
+    python -m tests.spotify_api_server --rate-limit-every 10 --retry-after 1
+    python -m tests.spotify_api_server --record fixtures.json            # save what is served
+    python -m tests.spotify_api_server --record fixtures.json --upstream  # record the real API
+    python -m tests.spotify_api_server --replay fixtures.json
+
+Then point the app at it:
+    SPOTIFY_API_URL=http://127.0.0.1:8765 python export_to_database.py
+
+With --upstream the app must sign in to Spotify as usual, so also set
+SPOTIFY_API_UPSTREAM=1; only its API requests then go through the stand-in:
+    SPOTIFY_API_URL=http://127.0.0.1:8765 SPOTIFY_API_UPSTREAM=1 python export_to_database.py
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.mock_data import MockSpotifyClient
+
+SPOTIFY_API = "https://api.spotify.com"
+SPOTIFY_ACCOUNTS = "https://accounts.spotify.com"
+# Upstream response headers not passed on: send_json and the HTTP server set their own
+DROPPED_HEADERS = {'connection', 'keep-alive', 'transfer-encoding', 'content-length', 'content-type',
+                   'content-encoding', 'date', 'server'}
+DEFAULT_SCOPE = "user-read-recently-played user-top-read user-library-read"
+
+
+def _first(query, name, default=None, cast=str):
+    values = query.get(name)
+    return cast(values[0]) if values else default
+
+
+def fixture_key(method, path, query):
+    """Stable key for a request: method, path and sorted query string"""
+    params = '&'.join(f"{name}={','.join(values)}" for name, values in sorted(query.items()))
+    return f"{method} {path}?{params}" if params else f"{method} {path}"
+
+
+class SpotifyAPIServer:
+    """Threaded stand-in for api.spotify.com and the accounts token endpoint.
+
+    Use as a context manager, or ``start()``/``stop()``. ``url`` is what
+    SPOTIFY_API_URL should be set to. Every ``rate_limit_every``-th API
+    request is answered with 429 and ``Retry-After: retry_after``. Tokens
+    expire after ``token_ttl`` seconds and unknown or expired tokens get
+    401, so refreshes happen the way they do against Spotify.
+    """
+
+    def __init__(self, client=None, plays=10000, seed=42, host='127.0.0.1', port=0,
+                 latency=0.0, jitter=0.0, rate_limit_every=0, retry_after=1,
+                 token_ttl=3600, record=None, replay=None, upstream=False):
+        self.client = client or MockSpotifyClient(plays=plays, seed=seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.token_ttl = token_ttl
+        self.upstream = upstream
+        self.record_path = record
+        self.fixtures = {}
+        if replay:
+            with open(replay, encoding='utf-8') as f:
+                self.fixtures = json.load(f)
+        self.replaying = bool(replay)
+        self.stats = Counter()
+        self._tokens = {}
+        self._issued = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.api = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        self.save_fixtures()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def save_fixtures(self):
+        if not self.record_path:
+            return
+        with self._lock:
+            fixtures = dict(self.fixtures)
+        with open(self.record_path, 'w', encoding='utf-8') as f:
+            json.dump(fixtures, f, indent=1, sort_keys=True)
+
+    # --- behaviour shared by all requests ---------------------------------
+
+    def delay(self):
+        if not (self.latency or self.jitter):
+            return
+        with self._lock:
+            seconds = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        time.sleep(max(0.0, seconds))
+
+    def rate_limited(self):
+        """Count an API request; True if this one gets a 429"""
+        with self._lock:
+            self.stats['api_requests'] += 1
+            limited = bool(self.rate_limit_every) and self.stats['api_requests'] % self.rate_limit_every == 0
+            if limited:
+                self.stats['rate_limited'] += 1
+        return limited
+
+    def issue_token(self, grant_type, scope=None):
+        with self._lock:
+            self.stats[f"token_{grant_type}"] += 1
+            self._issued += 1
+            token = f"stand-in-token-{self._issued}"
+            self._tokens[token] = time.monotonic() + self.token_ttl
+        return {
+            'access_token': token,
+            'token_type': 'Bearer',
+            'expires_in': self.token_ttl,
+            'refresh_token': 'stand-in-refresh-token',
+            'scope': scope or DEFAULT_SCOPE,
+        }
+
+    def token_valid(self, authorization):
+        token = (authorization or '').replace('Bearer ', '', 1)
+        with self._lock:
+            expires = self._tokens.get(token)
+        return expires is not None and time.monotonic() < expires
+
+    # --- synthetic endpoints ----------------------------------------------
+
+    def api_response(self, path, query):
+        """``(status, body)`` for an API path, served from the mock client"""
+        client = self.client
+        limit = _first(query, 'limit', 20, int)
+        offset = _first(query, 'offset', 0, int)
+        if path == '/v1/me':
+            return 200, client.sp.current_user()
+        if path in ('/v1/me/top/artists', '/v1/me/top/tracks'):
+            time_range = _first(query, 'time_range', 'medium_term')
+            if not 1 <= limit <= 50 or time_range not in ('short_term', 'medium_term', 'long_term'):
+                return 400, _error(400, "Invalid limit or time_range")
+            fetch = client.get_top_artists if path.endswith('artists') else client.get_top_tracks
+            return 200, fetch(time_range=time_range, limit=limit, offset=offset)
+        if path == '/v1/me/player/recently-played':
+            after = _first(query, 'after', None, int)
+            before = _first(query, 'before', None, int)
+            if after is not None and before is not None:
+                return 400, _error(400, "Only one of after and before may be given")
+            return 200, client.get_recently_played(limit=min(limit, 50), after=after, before=before)
+        if path == '/v1/audio-features':
+            ids = [tid for tid in _first(query, 'ids', '').split(',') if tid]
+            if len(ids) > 100:
+                return 400, _error(400, "Too many ids requested")
+            return 200, {'audio_features': client.get_audio_features(ids)}
+        if path == '/v1/artists':
+            ids = [aid for aid in _first(query, 'ids', '').split(',') if aid]
+            return 200, {'artists': [self._artist(aid) for aid in ids]}
+        if path.startswith('/v1/artists/'):
+            artist = self._artist(path[len('/v1/artists/'):])
+            return (200, artist) if artist else (404, _error(404, "Non existing id"))
+        return 404, _error(404, "Service not found")
+
+    def _artist(self, artist_id):
+        lib = self.client.library
+        i = lib.artist_index(artist_id)
+        return None if i is None else lib.artist(i)
+
+
+def _error(status, message):
+    return {'error': {'status': status, 'message': message}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def api(self):
+        return self.server.api
+
+    def send_json(self, status, body, headers=None):
+        # Paging links point back here, so spotipy's next() stays on the stand-in
+        data = json.dumps(body).replace(SPOTIFY_API, self.api.url).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+        with self.api._lock:
+            self.api.stats['bytes_sent'] += len(data)
+
+    def forward(self, base, body=None):
+        """Send this request to the real Spotify service; returns ``(status, body, headers)``"""
+        headers = {name: self.headers[name] for name in ('Authorization', 'Content-Type') if self.headers[name]}
+        request = urllib.request.Request(base + self.path, data=body, headers=headers, method=self.command)
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                status, data, received = response.status, response.read(), response.headers
+        except urllib.error.HTTPError as e:
+            status, data, received = e.code, e.read(), e.headers
+        # Retry-After and the like reach the client as Spotify sent them
+        passed = {name: value for name, value in received.items() if name.lower() not in DROPPED_HEADERS}
+        return status, json.loads(data or b'null'), passed
+
+    def do_POST(self):
+        api = self.api
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length)
+        if urlsplit(self.path).path.rstrip('/') != '/api/token':
+            return self.send_json(404, _error(404, "Service not found"))
+        api.delay()
+        if api.upstream:
+            return self.send_json(*self.forward(SPOTIFY_ACCOUNTS, body))
+        form = parse_qs(body.decode('utf-8'))
+        grant_type = _first(form, 'grant_type', '')
+        if grant_type not in ('authorization_code', 'refresh_token', 'client_credentials'):
+            return self.send_json(400, {'error': 'unsupported_grant_type'})
+        self.send_json(200, api.issue_token(grant_type, _first(form, 'scope')))
+
+    def do_GET(self):
+        api = self.api
+        parts = urlsplit(self.path)
+        path = parts.path.rstrip('/')
+        query = parse_qs(parts.query)
+        key = fixture_key('GET', path, query)
+        with api._lock:
+            api.stats['/v1/artists/{id}' if path.startswith('/v1/artists/') else path] += 1
+
+        api.delay()
+        if not api.upstream and not api.replaying and not api.token_valid(self.headers.get('Authorization')):
+            return self.send_json(401, _error(401, "The access token expired"))
+        if api.rate_limited():
+            return self.send_json(429, _error(429, "API rate limit exceeded"),
+                                  {'Retry-After': str(api.retry_after)})
+
+        headers = None
+        if api.replaying:
+            fixture = api.fixtures.get(key)
+            if fixture is None:
+                return self.send_json(404, _error(404, f"No recorded fixture for {key}"))
+            status, body = fixture['status'], fixture['body']
+        elif api.upstream:
+            status, body, headers = self.forward(SPOTIFY_API)
+        else:
+            status, body = api.api_response(path, query)
+
+        if api.record_path and status == 200:
+            with api._lock:
+                api.fixtures[key] = {'status': status, 'body': body}
+        self.send_json(status, body, headers)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for the Spotify Web API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--plays', type=int, default=10000, help="Size of the synthetic library")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Latency varies by up to +/- this")
+    parser.add_argument('--rate-limit-every', type=int, default=0, help="Answer every Nth API request with 429")
+    parser.add_argument('--retry-after', type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument('--token-ttl', type=int, default=3600, help="Access token lifetime in seconds")
+    parser.add_argument('--record', help="Save every successful response to this fixture file")
+    parser.add_argument('--replay', help="Serve responses from this fixture file")
+    parser.add_argument('--upstream', action='store_true', help="Forward requests to the real Spotify API")
+    args = parser.parse_args(argv)
+
+    server = SpotifyAPIServer(
+        plays=args.plays, seed=args.seed, host=args.host, port=args.port, latency=args.latency,
+        jitter=args.jitter, rate_limit_every=args.rate_limit_every, retry_after=args.retry_after,
+        token_ttl=args.token_ttl, record=args.record, replay=args.replay, upstream=args.upstream,
+    )
+    print("=" * 60)
+    print(f"🎧 Spotify API stand-in listening on {server.url}")
+    print("=" * 60)
+    print(f"   export SPOTIFY_API_URL={server.url}")
+    if args.upstream:
+        print("   export SPOTIFY_API_UPSTREAM=1  # sign in to Spotify as usual")
+    server.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print()
+    finally:
+        server.stop()
+        print("📊 Requests:", dict(server.stats))
+        if args.record:
+            print(f"💾 Saved {len(server.fixtures)} fixtures to {args.record}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Tests for the Spotify API call accounting
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import urllib.request
+from types import SimpleNamespace
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api_metrics import ApiMetrics, instrumented, retry_after, serve_metrics, _endpoint_from_url
+
+
+class RateLimited(Exception):
+    http_status = 429
+
+
+class InstrumentedClient:
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    @instrumented('top_artists')
+    def get_top_artists(self, fail=None):
+        # What the requests hook reports while the call runs
+        self.metrics.response_hook(SimpleNamespace(
+            url='https://api.spotify.com/v1/me/top/artists', status_code=429 if fail else 200,
+            content=b'x' * 2048, raw=SimpleNamespace(retries=None)))
+        if fail:
+            raise fail
+        return {'items': []}
+
+
+class TestApiMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = ApiMetrics()
+        self.client = InstrumentedClient(self.metrics)
+
+    def row(self, metrics, endpoint='top_artists'):
+        return {row['endpoint']: row for row in metrics.summary()}[endpoint]
+
+    def test_calls_responses_and_bytes(self):
+        self.client.get_top_artists()
+        self.client.get_top_artists()
+        row = self.row(self.metrics)
+        self.assertEqual((row['calls'], row['success'], row['429'], row['kb']), (2, 2, 0, 4.0))
+
+    def test_rate_limited_calls(self):
+        with self.assertRaises(RateLimited):
+            self.client.get_top_artists(fail=RateLimited())
+        self.assertEqual(self.metrics.calls[('top_artists', '429')], 1)
+        self.assertEqual(self.row(self.metrics)['429'], 1)
+
+    def test_retried_responses_are_counted(self):
+        response = SimpleNamespace(url='https://api.spotify.com/v1/artists/abc', status_code=200, content=b'{}',
+                                   raw=SimpleNamespace(retries=SimpleNamespace(
+                                       history=[SimpleNamespace(status=429), SimpleNamespace(status=None)])))
+        self.metrics.response_hook(response)
+        row = self.row(self.metrics, 'artists/{id}')
+        self.assertEqual((row['success'], row['429'], row['error'], row['retries']), (1, 1, 1, 2))
+
+    def test_runs_count_only_their_own_calls(self):
+        """A run's metrics start at zero while the totals keep growing"""
+        self.client.get_top_artists()
+        run = self.metrics.begin_run()
+        self.client.get_top_artists()
+        self.metrics.end_run(run)
+        self.client.get_top_artists()
+        self.assertEqual(self.row(run)['calls'], 1)
+        self.assertEqual(self.row(self.metrics)['calls'], 3)
+
+    def test_prometheus_histogram(self):
+        self.metrics.observe_call('top_tracks', 'success', 0.03)
+        self.metrics.observe_call('top_tracks', 'success', 40.0)
+        text = self.metrics.to_prometheus()
+        self.assertIn('spotify_api_call_duration_seconds_bucket{endpoint="top_tracks",le="0.05"} 1', text)
+        self.assertIn('spotify_api_call_duration_seconds_bucket{endpoint="top_tracks",le="30.0"} 1', text)
+        self.assertIn('spotify_api_call_duration_seconds_bucket{endpoint="top_tracks",le="+Inf"} 2', text)
+        self.assertIn('spotify_api_calls_total{endpoint="top_tracks",status="success"} 2', text)
+
+    def test_prometheus_file_and_endpoint(self):
+        self.client.get_top_artists()
+        folder = tempfile.mkdtemp()
+        try:
+            path = os.path.join(folder, 'spotify.prom')
+            self.metrics.write_prometheus(path)
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(f.read(), self.metrics.to_prometheus())
+            self.assertEqual(os.listdir(folder), ['spotify.prom'])
+        finally:
+            shutil.rmtree(folder)
+
+        server = serve_metrics(self.metrics, 0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url, timeout=10) as response:
+                self.assertIn('spotify_api_requests_total', response.read().decode())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_retry_after(self):
+        error = RateLimited()
+        self.assertIsNone(retry_after(error))
+        error.headers = {'Retry-After': '12'}
+        self.assertEqual(retry_after(error), 12.0)
+        error.headers = {'retry-after': 'soon'}
+        self.assertIsNone(retry_after(error))
+
+    def test_endpoint_from_url(self):
+        self.assertEqual(_endpoint_from_url('https://api.spotify.com/v1/me/player/recently-played?limit=50'),
+                         'me/player/recently-played')
+        self.assertEqual(_endpoint_from_url('http://127.0.0.1:8765/v1/artists/0TnOYISbd1XYRBk9myaseg'),
+                         'artists/{id}')
+
+
+if __name__ == '__main__':
+    unittest.main()
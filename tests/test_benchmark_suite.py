@@ -0,0 +1,51 @@
+"""
+Tests for the benchmark suite the performance gate runs
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.benchmark_suite import BenchmarkData, import_time, run_suite, timing_stats
+from run_tests import compare_benchmarks
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_timing_stats(self):
+        stats = timing_stats([0.1, 0.2, 0.3, 0.4, 1.0])
+        self.assertEqual((stats['median'], stats['min'], stats['max'], stats['rounds']), (0.3, 0.1, 1.0, 5))
+        self.assertGreater(stats['iqr'], 0)
+        self.assertEqual(timing_stats([0.5])['iqr'], 0.0)
+
+    def test_import_time_reports_heavy_packages(self):
+        seconds, heavy = import_time('cli')
+        self.assertGreater(seconds, 0)
+        self.assertEqual(heavy, [])
+        self.assertIn('plotly', import_time('visualizer')[1])
+
+    def test_chart_inputs_match_the_dashboard(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            data = BenchmarkData(500, workdir)
+        hours = data.chart_inputs['listening_hours']
+        self.assertEqual(list(hours['hour']), list(range(24)))
+        self.assertEqual(hours['plays'].sum(), 500)
+
+    def test_run_suite_results(self):
+        """A filtered run records stats, memory and API calls, and passes against itself"""
+        results = run_suite(sizes=[50], name_filter='dashboard/', min_rounds=1, max_rounds=1, max_time=0,
+                            verbose=False)
+        names = [bench['fullname'] for bench in results['benchmarks']]
+        self.assertEqual(names, ['dashboard/load_data_from_db[50]'])
+        bench = results['benchmarks'][0]
+        self.assertEqual(bench['extra_info']['api_calls'], 0)
+        self.assertGreater(bench['extra_info']['peak_memory_bytes'], 0)
+        self.assertEqual(set(results), {'machine_info', 'commit_info', 'datetime', 'version', 'benchmarks'})
+        row, = compare_benchmarks(results, results)
+        self.assertEqual(row['regressions'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
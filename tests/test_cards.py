@@ -0,0 +1,74 @@
+"""
+Tests for the batched dashboard cards
+"""
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cards
+from cards import MAX_HTML_CARDS, artist_cards, binge_cards, emotion_cards, hidden_gem_cards, render_cards
+
+
+class TestCards(unittest.TestCase):
+    def setUp(self):
+        self.songs = pd.DataFrame({
+            'name': ['Song A', 'Song <B>'],
+            'artist': ['Artist & Co', 'Solo'],
+            'popularity': [12, 30],
+            'plays': [4, 2],
+            'valence': [0.25, 0.8],
+            'energy': [0.5, 0.333],
+        })
+
+    def test_one_card_per_row_in_order(self):
+        block = binge_cards(self.songs)
+        self.assertEqual(block.count("<div"), 2)
+        self.assertLess(block.index('Song A'), block.index('Song &lt;B&gt;'))
+        self.assertIn('🔁 Played 4 times', block)
+
+    def test_text_is_escaped(self):
+        block = hidden_gem_cards(self.songs)
+        self.assertIn('Song &lt;B&gt;', block)
+        self.assertIn('Artist &amp; Co', block)
+        self.assertNotIn('<B>', block)
+
+    def test_artist_cards(self):
+        df = pd.DataFrame({'rank': [1], 'name': ['Band'], 'popularity': [77], 'genres': ['indie, pop']})
+        block = artist_cards(df)
+        self.assertIn('#1 Band', block)
+        self.assertIn('Genres: indie, pop', block)
+
+    def test_emotion_cards_format_percentages(self):
+        block = emotion_cards(self.songs)
+        self.assertIn('😊 25%', block)
+        self.assertIn('⚡ 33%', block)
+
+    def test_emotion_cards_name_column(self):
+        block = emotion_cards(self.songs.rename(columns={'name': 'track_name'}), name_column='track_name')
+        self.assertIn('Song A', block)
+
+    def test_empty_list(self):
+        self.assertEqual(binge_cards(self.songs.head(0)), '')
+
+    def test_short_lists_render_one_markdown_block(self):
+        with patch.object(cards.st, 'markdown') as markdown, patch.object(cards.st, 'dataframe') as dataframe:
+            render_cards(self.songs, binge_cards, ['name', 'plays'])
+        markdown.assert_called_once()
+        dataframe.assert_not_called()
+
+    def test_long_lists_render_a_table(self):
+        df = pd.concat([self.songs] * (MAX_HTML_CARDS // 2 + 1), ignore_index=True)
+        with patch.object(cards.st, 'markdown') as markdown, patch.object(cards.st, 'dataframe') as dataframe:
+            render_cards(df, binge_cards, ['name', 'plays'])
+        markdown.assert_not_called()
+        self.assertEqual(list(dataframe.call_args[0][0].columns), ['name', 'plays'])
+
+
+if __name__ == '__main__':
+    unittest.main()
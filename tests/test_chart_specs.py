@@ -0,0 +1,89 @@
+"""
+Tests for the charts pre-rendered at export time
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spotipy.exceptions import SpotifyException
+
+from tests.mock_data import MockSpotifyClient
+from tests.test_export_checkpoint import RateLimitedClient
+from chart_specs import DASHBOARD_CHARTS, latest_chart_run, load_chart_specs, render_chart_specs, spec_figure
+from db_pool import ReadConnectionPool
+from export_all import make_sinks, run_export
+from snapshot import read_snapshot
+from visualizer import Visualizer
+
+
+class TestChartSpecs(unittest.TestCase):
+    def setUp(self):
+        """Run every export in an empty folder"""
+        self.cwd = os.getcwd()
+        self.folder = tempfile.mkdtemp()
+        os.chdir(self.folder)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def stored_specs(self):
+        pool = ReadConnectionPool('spotify_data.db')
+        try:
+            run_id = latest_chart_run(pool)
+            return run_id, load_chart_specs(pool, run_id)
+        finally:
+            pool.close()
+
+    def test_export_stores_every_chart_for_its_run(self):
+        pipeline = run_export(make_sinks(['sqlite', 'snapshot', 'charts']), client=MockSpotifyClient(plays=300))
+        run_id, specs = self.stored_specs()
+        self.assertEqual(run_id, pipeline.run_id)
+        self.assertEqual(set(specs), set(DASHBOARD_CHARTS))
+        self.assertEqual(read_snapshot()[1]['run_id'], run_id)
+
+    def test_stored_specs_match_the_live_charts(self):
+        """A stored spec rebuilds the figure the dashboard would have drawn"""
+        run_export(make_sinks(['sqlite', 'snapshot', 'charts']), client=MockSpotifyClient(plays=300))
+        run_id, specs = self.stored_specs()
+        data, _ = read_snapshot()
+        viz = Visualizer()
+        for chart, (_, build, _) in DASHBOARD_CHARTS.items():
+            stored = spec_figure(viz, run_id, chart, specs[chart])
+            self.assertEqual(stored.to_plotly_json()['data'][0]['type'],
+                             build(Visualizer(cache_size=0), data).to_plotly_json()['data'][0]['type'], chart)
+        # Parsed once per run
+        self.assertIs(spec_figure(viz, run_id, 'genres', specs['genres']),
+                      spec_figure(viz, run_id, 'genres', specs['genres']))
+
+    def test_failed_export_keeps_previous_charts(self):
+        client = RateLimitedClient(plays=300)
+        client.limited = False
+        first = run_export(make_sinks(['sqlite', 'snapshot', 'charts']), client=client)
+        client.limited = True
+        with self.assertRaises(SpotifyException):
+            run_export(make_sinks(['sqlite', 'snapshot', 'charts']), client=client, resume=False)
+        run_id, specs = self.stored_specs()
+        self.assertEqual(run_id, first.run_id)
+        self.assertEqual(read_snapshot()[1]['run_id'], first.run_id)
+
+    def test_charts_need_their_datasets(self):
+        datasets = {'genres': pd.DataFrame({'genre': ['pop'], 'count': [3]}),
+                    'audio_features': pd.DataFrame()}
+        self.assertEqual(set(render_chart_specs(datasets)), {'genres'})
+
+    def test_spec_without_figure_cache(self):
+        spec = render_chart_specs({'genres': pd.DataFrame({'genre': ['pop'], 'count': [3]})})['genres']
+        figure = spec_figure(Visualizer(cache_size=0), 'run1', 'genres', spec)
+        self.assertEqual(len(figure.data), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Tests for the unified command line and its lazy imports
+"""
+import importlib.util
+import os
+import subprocess
+import sys
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cli
+from benchmarks.benchmark_suite import HEAVY_PACKAGES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(*args):
+    return subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True, timeout=60)
+
+
+def heavy_modules_after(code):
+    """Heavy packages in sys.modules after running ``code`` in a fresh interpreter"""
+    check = f"{code}\nimport sys\nprint(sorted({{m.split('.')[0] for m in sys.modules}} & set({HEAVY_PACKAGES!r})))"
+    result = run('-c', check)
+    if result.returncode:
+        raise AssertionError(result.stderr)
+    return result.stdout.strip().splitlines()[-1]
+
+
+class TestCli(unittest.TestCase):
+    def test_every_command_has_a_module(self):
+        for name, (module, _) in cli.COMMANDS.items():
+            self.assertIsNotNone(importlib.util.find_spec(module), name)
+        for script in cli.DASHBOARDS.values():
+            self.assertTrue(os.path.exists(os.path.join(ROOT, script)), script)
+
+    def test_help_lists_commands(self):
+        result = run('cli.py')
+        self.assertEqual(result.returncode, 0)
+        for name in list(cli.COMMANDS) + ['dashboard']:
+            self.assertIn(name, result.stdout)
+
+    def test_unknown_command(self):
+        result = run('cli.py', 'frobnicate')
+        self.assertEqual(result.returncode, 2)
+        self.assertIn('invalid choice', result.stderr)
+
+    def test_subcommand_gets_its_own_options(self):
+        result = run('cli.py', 'view', '--help')
+        self.assertEqual(result.returncode, 0)
+        self.assertIn('--after', result.stdout)
+
+    def test_cli_imports_no_heavy_package(self):
+        self.assertEqual(heavy_modules_after('import cli'), '[]')
+
+    def test_viewer_and_exporter_modules_import_lazily(self):
+        """Quick commands and --help never pay for pandas or spotipy"""
+        self.assertEqual(heavy_modules_after('import view_database'), '[]')
+        self.assertEqual(heavy_modules_after('import export_all'), '[]')
+
+    def test_view_help_without_heavy_imports(self):
+        code = "import sys, cli\nsys.argv = ['cli.py']\ntry:\n    cli.main(['view', '--help'])\nexcept SystemExit:\n    pass"
+        self.assertEqual(heavy_modules_after(code), '[]')
+
+
+if __name__ == '__main__':
+    unittest.main()
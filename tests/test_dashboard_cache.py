@@ -0,0 +1,172 @@
+"""
+Tests for the live dashboard's cached datasets and background refreshes
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import uuid
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.mock_data import MockSpotifyClient
+from data_processor import DataProcessor
+from spotify_client import CachingSpotifyClient
+from dashboard_cache import (REFRESH_BACKOFF_SECONDS, RANGED_DATASETS, RECENT_DATASETS, TIME_RANGES, LiveData,
+                             get_live_data, load_dataset, load_persisted, prefetch_time_ranges, refresh)
+from export_all import make_sinks, run_export
+
+
+class RateLimitedProcessor(DataProcessor):
+    """Processor whose top artists fail like a rate-limited API call"""
+
+    def __init__(self, client, retry_after=None):
+        super().__init__(client)
+        self.retry_after = retry_after
+        self.attempts = 0
+
+    def get_top_artists_data(self, time_range='medium_term'):
+        self.attempts += 1
+        error = RuntimeError("rate limited")
+        error.headers = {'Retry-After': str(self.retry_after)} if self.retry_after else {}
+        raise error
+
+
+class TestDatasetCache(unittest.TestCase):
+    """Test datasets are cached per user and time range"""
+
+    def setUp(self):
+        self.user_id = uuid.uuid4().hex
+        self.client = MockSpotifyClient(plays=200)
+        self.spotify = CachingSpotifyClient(self.client)
+        self.processor = DataProcessor(self.spotify)
+
+    def test_cached_dataset_makes_no_api_calls(self):
+        first = load_dataset('top_artists', self.user_id, 'medium_term', self.processor)
+        calls = sum(self.client.calls.values())
+        self.assertTrue(load_dataset('top_artists', self.user_id, 'medium_term', self.processor).equals(first))
+        self.assertEqual(sum(self.client.calls.values()), calls)
+
+    def test_keyed_by_time_range_and_user(self):
+        load_dataset('genres', self.user_id, 'medium_term', self.processor)
+        load_dataset('genres', self.user_id, 'short_term', self.processor)
+        load_dataset('genres', uuid.uuid4().hex, 'short_term', DataProcessor(self.client))
+        self.assertEqual(self.client.calls['top_artists'], 3)
+
+    def test_recent_datasets_ignore_time_range(self):
+        load_dataset('listening_hours', self.user_id, 'medium_term', self.processor)
+        load_dataset('listening_hours', self.user_id, 'long_term', self.processor)
+        self.assertEqual(self.client.calls['recently_played'], 1)
+
+    def test_refresh_refetches(self):
+        load_dataset('top_artists', self.user_id, 'medium_term', self.processor)
+        refresh(self.spotify)
+        load_dataset('top_artists', self.user_id, 'medium_term', self.processor)
+        self.assertEqual(self.client.calls['top_artists'], 2)
+
+
+class TestLoadPersisted(unittest.TestCase):
+    """Test the cold-start data read from the last export"""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.folder = tempfile.mkdtemp()
+        os.chdir(self.folder)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def export(self, formats, time_range='medium_term'):
+        run_export(make_sinks(formats, time_range), client=MockSpotifyClient(plays=300), time_range=time_range)
+
+    def test_nothing_exported(self):
+        self.assertIsNone(load_persisted(['top_artists']))
+
+    def test_reads_the_page_datasets_from_the_snapshot(self):
+        self.export(['sqlite', 'snapshot'])
+        os.remove('spotify_data.db')  # the snapshot alone is enough
+        data, as_of = load_persisted(['top_artists', 'binge', 'emotional', 'diversity'])
+        self.assertEqual(set(data), {'top_artists', 'binge', 'emotional', 'diversity'})
+        self.assertIn('valence', data['emotional'].columns)
+        self.assertLessEqual(len(data['emotional']), 20)
+        self.assertIsInstance(data['diversity'], dict)
+        self.assertTrue(as_of)
+
+    def test_falls_back_to_the_database(self):
+        self.export(['sqlite'])
+        data, as_of = load_persisted(['genres', 'listening_hours'])
+        self.assertEqual(len(data['listening_hours']), 24)
+        self.assertTrue(as_of)
+
+    def test_other_time_range_is_ignored(self):
+        self.export(['sqlite', 'snapshot'], time_range='short_term')
+        self.assertIsNone(load_persisted(['top_artists'], time_range='long_term'))
+        self.assertIsNotNone(load_persisted(['top_artists'], time_range='short_term'))
+
+
+class TestLiveData(unittest.TestCase):
+    def setUp(self):
+        # Cached datasets are keyed by user; a fresh one per test keeps them apart
+        self.user_id = uuid.uuid4().hex
+
+    def refresh(self, live, processor):
+        live.refresh_in_background(processor)
+        live.wait()
+
+    def test_refresh_swaps_in_every_dataset(self):
+        live = LiveData(self.user_id, 'medium_term')
+        self.refresh(live, DataProcessor(MockSpotifyClient(plays=200)))
+        self.assertIsNone(live.error)
+        self.assertEqual(set(live.data), set(RANGED_DATASETS) | set(RECENT_DATASETS))
+        self.assertEqual(live.version, 1)
+        self.assertTrue(live.is_fresh())
+
+    def test_failed_refresh_backs_off(self):
+        """Reruns after a failure start no refresh until the backoff passes"""
+        live = LiveData(self.user_id, 'medium_term')
+        processor = RateLimitedProcessor(MockSpotifyClient(plays=200))
+        self.refresh(live, processor)
+        self.assertIsNotNone(live.error)
+        self.assertAlmostEqual(live.retry_in(), REFRESH_BACKOFF_SECONDS, delta=1)
+        for _ in range(5):
+            self.refresh(live, processor)
+        self.assertEqual(processor.attempts, 1)
+        self.assertEqual(live.version, 0)
+
+    def test_backoff_doubles_and_resets(self):
+        live = LiveData(self.user_id, 'medium_term')
+        processor = RateLimitedProcessor(MockSpotifyClient(plays=200))
+        self.refresh(live, processor)
+        live.retry_at = None  # backoff over
+        self.refresh(live, processor)
+        self.assertAlmostEqual(live.retry_in(), REFRESH_BACKOFF_SECONDS * 2, delta=1)
+        live.retry_at = None
+        self.refresh(live, DataProcessor(MockSpotifyClient(plays=200)))
+        self.assertEqual((live.failures, live.retry_in(), live.error), (0, 0.0, None))
+
+    def test_retry_after_honoured(self):
+        live = LiveData(self.user_id, 'medium_term')
+        self.refresh(live, RateLimitedProcessor(MockSpotifyClient(plays=200), retry_after=900))
+        self.assertAlmostEqual(live.retry_in(), 900, delta=1)
+
+    def test_prefetch_refreshes_every_time_range(self):
+        client = MockSpotifyClient(plays=200)
+        processor = DataProcessor(CachingSpotifyClient(client))
+        prefetch_time_ranges(self.user_id, processor)
+        for time_range in TIME_RANGES.values():
+            get_live_data(self.user_id, time_range).wait()
+        for time_range in TIME_RANGES.values():
+            self.assertEqual(get_live_data(self.user_id, time_range).version, 1, time_range)
+
+        # Fresh ranges are not fetched again
+        calls = sum(client.calls.values())
+        prefetch_time_ranges(self.user_id, processor)
+        self.assertFalse(any(get_live_data(self.user_id, tr).refreshing for tr in TIME_RANGES.values()))
+        self.assertEqual(sum(client.calls.values()), calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
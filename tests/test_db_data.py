@@ -0,0 +1,56 @@
+"""
+Tests for the database dashboard's queries
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.mock_data import MockSpotifyClient
+from db_data import DASHBOARD_QUERIES, load_data_from_db
+from db_pool import ReadConnectionPool
+from export_all import make_sinks, run_export
+
+
+class TestLoadDataFromDb(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Export once into an empty folder"""
+        cls.cwd = os.getcwd()
+        cls.folder = tempfile.mkdtemp()
+        os.chdir(cls.folder)
+        run_export(make_sinks(['sqlite']), client=MockSpotifyClient(plays=300))
+
+    @classmethod
+    def tearDownClass(cls):
+        os.chdir(cls.cwd)
+        shutil.rmtree(cls.folder, ignore_errors=True)
+
+    def setUp(self):
+        self.pool = ReadConnectionPool('spotify_data.db')
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_only_requested_datasets_are_queried(self):
+        data = load_data_from_db(self.pool, ['genres', 'diversity'])
+        self.assertEqual(set(data), {'genres', 'diversity'})
+        self.assertEqual(self.pool.metrics()['queries'], 2)
+
+    def test_every_dataset_by_default(self):
+        data = load_data_from_db(self.pool)
+        self.assertEqual(set(data), set(DASHBOARD_QUERIES))
+        self.assertEqual(len(data['listening_hours']), 24)
+
+    def test_record_datasets_are_dicts(self):
+        data = load_data_from_db(self.pool, ['personality', 'diversity'])
+        self.assertIsInstance(data['personality'], dict)
+        self.assertIn('score', data['diversity'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Tests for the read-only SQLite connection pool
+"""
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_pool import ReadConnectionPool
+
+
+class TestReadConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.db_name = os.path.join(self.folder, 'spotify_data.db')
+        conn = sqlite3.connect(self.db_name)
+        conn.execute("CREATE TABLE genres (genre TEXT, count INTEGER)")
+        conn.executemany("INSERT INTO genres VALUES (?, ?)", [('pop', 5), ('rock', 3)])
+        conn.commit()
+        conn.close()
+        self.pool = ReadConnectionPool(self.db_name, max_connections=2, timeout=5)
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_read_sql(self):
+        df = self.pool.read_sql("SELECT * FROM genres WHERE count > ?", params=(4,))
+        self.assertEqual(df['genre'].tolist(), ['pop'])
+        self.assertEqual(self.pool.metrics()['queries'], 1)
+
+    def test_connections_are_reused(self):
+        with self.pool.connection() as first:
+            pass
+        with self.pool.connection() as second:
+            self.assertIs(second, first)
+        self.assertEqual(self.pool.metrics()['connections_open'], 1)
+
+    def test_connections_are_read_only(self):
+        with self.pool.connection() as conn:
+            with self.assertRaises(sqlite3.OperationalError):
+                conn.execute("DELETE FROM genres")
+
+    def test_missing_database(self):
+        pool = ReadConnectionPool(os.path.join(self.folder, 'missing.db'))
+        with self.assertRaises(FileNotFoundError):
+            pool.read_sql("SELECT 1")
+        self.assertEqual(pool.metrics()['connections_open'], 0)
+        self.assertFalse(os.path.exists(os.path.join(self.folder, 'missing.db')))
+
+    def test_waiters_get_returned_connections(self):
+        """Threads beyond max_connections wait and are handed a returned connection"""
+        held = [self.pool._checkout(), self.pool._checkout()]
+        got = []
+        thread = threading.Thread(target=lambda: got.append(self.pool.read_sql("SELECT COUNT(*) AS n FROM genres")))
+        thread.start()
+        while not self.pool.metrics()['waiting']:
+            thread.join(0.01)
+        self.pool._checkin(held.pop())
+        thread.join(5)
+        self.assertEqual(got[0]['n'][0], 2)
+        metrics = self.pool.metrics()
+        self.assertEqual((metrics['connections_open'], metrics['waits']), (2, 1))
+        self.pool._checkin(held.pop())
+
+    def test_timeout_when_every_connection_is_busy(self):
+        pool = ReadConnectionPool(self.db_name, max_connections=1, timeout=0.05)
+        conn = pool._checkout()
+        with self.assertRaises(TimeoutError):
+            pool._checkout()
+        self.assertEqual(pool.metrics()['waiting'], 0)
+        pool._checkin(conn)
+        pool.close()
+
+    def test_concurrent_readers(self):
+        errors = []
+
+        def read():
+            try:
+                for _ in range(20):
+                    self.assertEqual(len(self.pool.read_sql("SELECT * FROM genres")), 2)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=read) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertLessEqual(self.pool.metrics()['connections_open'], 2)
+        self.assertEqual(self.pool.metrics()['queries'], 120)
+
+
+if __name__ == '__main__':
+    unittest.main()
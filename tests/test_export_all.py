@@ -0,0 +1,58 @@
+"""
+Tests for the one-pass export to several sinks
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.mock_data import MockSpotifyClient
+from export_all import make_sinks, run_export
+from export_to_csv import create_export_folder
+
+
+class TestExportAll(unittest.TestCase):
+    def setUp(self):
+        """Run every export in an empty folder"""
+        self.cwd = os.getcwd()
+        self.folder = tempfile.mkdtemp()
+        os.chdir(self.folder)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_each_endpoint_called_once(self):
+        """Datasets sharing an endpoint reuse one response"""
+        client = MockSpotifyClient(plays=500)
+        run_export(make_sinks(['csv', 'json']), client=client)
+        for endpoint, calls in client.calls.items():
+            self.assertEqual(calls, 1, endpoint)
+
+    def test_every_sink_writes_every_dataset(self):
+        """Each fetched dataset reaches every sink"""
+        pipeline = run_export(make_sinks(['csv', 'json']), client=MockSpotifyClient(plays=500))
+        for name, timings in pipeline.timings.items():
+            self.assertEqual(set(timings['written']), {'csv', 'json'}, name)
+        self.assertTrue(os.path.exists('spotify_exports/summary_report.csv'))
+        self.assertEqual(len(os.listdir('spotify_exports/json')), len(pipeline.timings))
+
+    def test_export_folder_created_meanwhile(self):
+        """Another sink creating the folder between the check and makedirs is fine"""
+        os.makedirs('spotify_exports/json')
+        with patch('os.path.exists', return_value=False):
+            self.assertEqual(create_export_folder(), 'spotify_exports')
+
+    def test_unknown_format(self):
+        """Unknown formats are rejected before anything runs"""
+        with self.assertRaises(ValueError):
+            make_sinks(['csv', 'xml'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+"""
+Tests for resumable exports: checkpoints and sinks that discard failed runs
+"""
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spotipy.exceptions import SpotifyException
+
+from tests.mock_data import MockSpotifyClient
+from export_all import make_sinks, run_export
+from export_checkpoint import CHECKPOINT_MAX_AGE, CHECKPOINT_PATH, ExportCheckpoint
+from spotify_client import CachingSpotifyClient
+
+
+def read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+class RateLimitedClient(MockSpotifyClient):
+    """Mock client whose audio features are rate limited until ``limited`` is cleared"""
+
+    limited = True
+
+    def get_audio_features(self, track_ids):
+        if self.limited:
+            raise SpotifyException(429, -1, "Max Retries")
+        return super().get_audio_features(track_ids)
+
+
+class TestExportCheckpoint(unittest.TestCase):
+    def setUp(self):
+        """Run every export in an empty folder"""
+        self.cwd = os.getcwd()
+        self.folder = tempfile.mkdtemp()
+        os.chdir(self.folder)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def fail_then_resume(self, formats):
+        client = RateLimitedClient(plays=500)
+        with self.assertRaises(SpotifyException):
+            run_export(make_sinks(formats), client=client)
+        failed_calls = dict(client.calls)
+        client.calls.clear()
+        client.limited = False
+        pipeline = run_export(make_sinks(formats), client=client)
+        return failed_calls, dict(client.calls), pipeline
+
+    def test_failed_run_leaves_no_output(self):
+        """A failed export writes nothing and leaves a checkpoint"""
+        client = RateLimitedClient(plays=500)
+        with self.assertRaises(SpotifyException):
+            run_export(make_sinks(['csv', 'sqlite', 'json', 'parquet']), client=client)
+        self.assertTrue(os.path.exists(CHECKPOINT_PATH))
+        self.assertEqual([f for f in os.listdir('spotify_exports') if f.endswith('.csv')], [])
+        self.assertEqual(os.listdir('spotify_exports/json'), [])
+        self.assertEqual([f for _, _, files in os.walk('spotify_exports/parquet') for f in files], [])
+        conn = sqlite3.connect('spotify_data.db')
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM top_artists").fetchone()[0], 0)
+        conn.close()
+
+    def test_failed_run_keeps_previous_files(self):
+        """CSV and JSON files of the last good export survive a failed one"""
+        files = ['spotify_exports/summary_report.csv', 'spotify_exports/top_artists_medium_term.csv',
+                 'spotify_exports/json/top_artists.json']
+        run_export(make_sinks(['csv', 'json']), client=MockSpotifyClient(plays=500))
+        before = [read(path) for path in files]
+        with self.assertRaises(SpotifyException):
+            run_export(make_sinks(['csv', 'json']), client=RateLimitedClient(plays=500, seed=7), resume=False)
+        self.assertEqual([read(path) for path in files], before)
+        self.assertFalse([f for f in os.listdir('spotify_exports') if f.startswith('.run-')])
+        self.assertFalse([f for f in os.listdir('spotify_exports/json') if f.startswith('.run-')])
+
+    def test_resume_fetches_only_unfinished_stages(self):
+        """The resumed run replays saved responses and clears the checkpoint"""
+        failed_calls, resumed_calls, _ = self.fail_then_resume(['sqlite'])
+        self.assertIn('top_artists', failed_calls)
+        self.assertEqual(resumed_calls, {'audio_features': 1})
+        self.assertFalse(os.path.exists(CHECKPOINT_PATH))
+
+    def test_resume_writes_no_duplicates(self):
+        """Every sink holds one copy of each dataset after a resumed export"""
+        import pyarrow.parquet as pq
+        _, _, pipeline = self.fail_then_resume(['sqlite', 'parquet'])
+        conn = sqlite3.connect('spotify_data.db')
+        for name in ('top_artists', 'music_personality'):
+            rows = pipeline.timings[name]['rows']
+            self.assertGreater(rows, 0)
+            self.assertEqual(conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0], rows)
+            self.assertEqual(pq.read_table(f'spotify_exports/parquet/{name}').num_rows, rows)
+        conn.close()
+
+    def test_second_export_adds_no_duplicate_plays(self):
+        """Plays already stored are skipped by a later export"""
+        for _ in range(2):
+            run_export(make_sinks(['sqlite']), client=MockSpotifyClient(plays=500))
+        conn = sqlite3.connect('spotify_data.db')
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM recently_played").fetchone()[0], 50)  # the API's last 50
+        conn.close()
+
+    def test_rate_limited_features_not_checkpointed(self):
+        """Stages needing audio features fail instead of saving placeholders"""
+        client = RateLimitedClient(plays=500)
+        with self.assertRaises(SpotifyException):
+            run_export(make_sinks(['sqlite']), client=client)
+        stages = ExportCheckpoint(CachingSpotifyClient(MockSpotifyClient())).resume()
+        for name in ('audio_features', 'music_personality', 'diversity_score'):
+            self.assertNotIn(name, stages)
+        self.assertIn('top_artists', stages)
+
+    def test_old_checkpoint_ignored(self):
+        """A checkpoint older than CHECKPOINT_MAX_AGE is not resumed"""
+        created = datetime.now() - timedelta(seconds=CHECKPOINT_MAX_AGE + 60)
+        checkpoint = ExportCheckpoint(CachingSpotifyClient(MockSpotifyClient()))
+        checkpoint.created_at = created
+        checkpoint.stage_done('top_artists', [1, 2])
+        fresh = ExportCheckpoint(CachingSpotifyClient(MockSpotifyClient()))
+        self.assertEqual(fresh.resume(), [])
+
+    def test_other_time_range_ignored(self):
+        """A checkpoint made for another time range is not resumed"""
+        ExportCheckpoint(CachingSpotifyClient(MockSpotifyClient()), 'short_term').stage_done('genres', [])
+        checkpoint = ExportCheckpoint(CachingSpotifyClient(MockSpotifyClient()), 'long_term')
+        self.assertEqual(checkpoint.resume(), [])
+
+    def test_truncated_line_skipped(self):
+        """A line cut off by a crash is dropped and the stages before it resume"""
+        client = CachingSpotifyClient(MockSpotifyClient())
+        client.get_top_artists()
+        checkpoint = ExportCheckpoint(client)
+        checkpoint.stage_done('top_artists', [1])
+        with open(CHECKPOINT_PATH, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'stage': 'genres', 'rows': 1})[:10])
+        restored = CachingSpotifyClient(MockSpotifyClient())
+        self.assertEqual(ExportCheckpoint(restored).resume(), ['top_artists'])
+        restored.get_top_artists()
+        self.assertEqual(restored.client.calls['top_artists'], 0)
+
+
+class TestCachedAudioFeatures(unittest.TestCase):
+    def test_missing_features_asked_again(self):
+        """None features are neither cached nor saved for checkpoints"""
+        class Inner:
+            calls = 0
+
+            def get_audio_features(self, track_ids):
+                self.calls += 1
+                return [None if tid == 'b' else {'id': tid} for tid in track_ids]
+
+        client = CachingSpotifyClient(Inner())
+        self.assertEqual(client.get_audio_features(['a', 'b']), [{'id': 'a'}, None])
+        self.assertEqual(client.get_audio_features(['a', 'b']), [{'id': 'a'}, None])
+        self.assertEqual(client.client.calls, 2)
+        self.assertEqual(client.cached_responses()['audio_features'], {'a': {'id': 'a'}})
+
+    def test_restore_skips_missing_features(self):
+        client = CachingSpotifyClient(MockSpotifyClient())
+        client.restore({'audio_features': {'a': None, 'b': {'id': 'b'}}})
+        self.assertEqual(client.cached_responses()['audio_features'], {'b': {'id': 'b'}})
+
+
+if __name__ == '__main__':
+    unittest.main()
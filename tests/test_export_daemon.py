@@ -0,0 +1,151 @@
+"""
+Tests for the export daemon: job backoff, the pidfile lock and incremental syncs
+"""
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.mock_data import MockSpotifyClient
+from api_metrics import ApiMetrics
+from export_daemon import (BACKOFF_BASE, AlreadyRunning, Job, PidLock, fetch_new_plays, full_export,
+                           retry_after, sync_recent_plays)
+from export_to_database import create_database, create_tables
+
+
+class RateLimit(Exception):
+    def __init__(self, seconds):
+        super().__init__("rate limited")
+        self.http_status = 429
+        self.headers = {'Retry-After': str(seconds)}
+
+
+class MeteredClient(MockSpotifyClient):
+    """Mock client that reports its calls to ApiMetrics like SpotifyClient does"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = ApiMetrics()
+
+    def _call(self, endpoint):
+        super()._call(endpoint)
+        self.metrics.observe_call(endpoint, 'success', 0.0)
+
+
+class TestJob(unittest.TestCase):
+    def make_job(self, interval=3600):
+        return Job("test", interval, lambda: None, jitter=0.0, rng=random.Random(1))
+
+    def test_backoff_doubles(self):
+        """Each failure in a row doubles the retry delay"""
+        job = self.make_job()
+        delays = [job.failed(RuntimeError("down")) for _ in range(3)]
+        self.assertEqual(delays, [BACKOFF_BASE, BACKOFF_BASE * 2, BACKOFF_BASE * 4])
+
+    def test_backoff_capped_by_interval(self):
+        """A job never waits longer than its interval after a failure"""
+        job = self.make_job(interval=100)
+        for _ in range(5):
+            delay = job.failed(RuntimeError("down"))
+        self.assertEqual(delay, 100)
+
+    def test_retry_after_honoured(self):
+        """Retry-After wins when it is longer than the backoff"""
+        job = self.make_job()
+        self.assertEqual(job.failed(RateLimit(600)), 600)
+        self.assertEqual(retry_after(RateLimit(5)), 5.0)
+        self.assertIsNone(retry_after(RuntimeError("no headers")))
+
+    def test_success_resets_backoff(self):
+        job = self.make_job()
+        job.failed(RuntimeError("down"))
+        job.succeeded()
+        self.assertEqual(job.failures, 0)
+        self.assertAlmostEqual(job.next_run - time.monotonic(), 3600, delta=1)
+        self.assertEqual(job.failed(RuntimeError("down")), BACKOFF_BASE)
+
+
+class TestDaemonExports(unittest.TestCase):
+    def setUp(self):
+        """Run every sync in an empty folder"""
+        self.cwd = os.getcwd()
+        self.folder = tempfile.mkdtemp()
+        os.chdir(self.folder)
+        conn = create_database('spotify_data.db')
+        create_tables(conn)
+        conn.close()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def count_plays(self):
+        conn = sqlite3.connect('spotify_data.db')
+        try:
+            return conn.execute("SELECT COUNT(*) FROM recently_played").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_pidfile_lock(self):
+        """A second daemon is refused while the first holds the lock"""
+        with PidLock('daemon.pid'):
+            with self.assertRaises(AlreadyRunning):
+                PidLock('daemon.pid').acquire()
+        self.assertFalse(os.path.exists('daemon.pid'))
+
+    def test_stale_pidfile_replaced(self):
+        """A pidfile left by a process that is gone does not block the daemon"""
+        if os.name == 'nt':
+            self.skipTest("liveness of a pid is not checked on Windows")
+        with open('daemon.pid', 'w') as f:
+            f.write("999999999\n")
+        with PidLock('daemon.pid') as lock:
+            self.assertTrue(lock.acquired)
+
+    def test_fetch_new_plays_pages_forward(self):
+        """Plays after the cursor are fetched across pages"""
+        client = MockSpotifyClient(plays=500)
+        after = int(client.library.played_ms[60])  # newest first, so 60 plays are newer
+        items = fetch_new_plays(client, after, limit=20)
+        self.assertEqual(len(items), 60)
+        self.assertEqual(len({item['played_at'] for item in items}), 60)
+        self.assertEqual(len(fetch_new_plays(client, None)), 50)
+
+    def test_sync_stores_only_new_plays(self):
+        """A second sync of the same window inserts nothing"""
+        client = MockSpotifyClient(plays=500)
+        self.assertEqual(sync_recent_plays(client), 50)
+        self.assertEqual(sync_recent_plays(client), 0)
+        self.assertEqual(self.count_plays(), 50)
+
+    def test_full_exports_add_no_duplicate_plays(self):
+        client = MockSpotifyClient(plays=500)
+        full_export(client)
+        full_export(client)
+        self.assertEqual(self.count_plays(), 50)
+
+    def test_api_calls_logged_per_run(self):
+        """Each export run logs its own API calls, not the client's totals"""
+        client = MeteredClient(plays=500)
+        full_export(client)
+        full_export(client)
+        with open('export_runs.jsonl', encoding='utf-8') as f:
+            runs = [json.loads(line) for line in f]
+        self.assertEqual(len(runs), 2)
+        for run in runs:
+            calls = {row['endpoint']: row['calls'] for row in run['api']}
+            self.assertEqual(calls['top_artists'], 1)
+        totals = {row['endpoint']: row['calls'] for row in client.metrics.summary()}
+        self.assertEqual(totals['top_artists'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
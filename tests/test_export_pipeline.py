@@ -0,0 +1,136 @@
+"""
+Tests for the staged export pipeline
+"""
+import os
+import sys
+import threading
+import time
+import unittest
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export_pipeline import ExportPipeline
+
+
+class RecordingSink:
+    """Sink recording every call, optionally failing at one of them"""
+
+    def __init__(self, name, events, fail_on=None, delay=0.0):
+        self.name = name
+        self.events = events
+        self.fail_on = fail_on
+        self.delay = delay
+        self.written = {}
+
+    def _step(self, step):
+        self.events.append((self.name, step))
+        if step == self.fail_on:
+            raise RuntimeError(f"{self.name} {step} failed")
+
+    def open(self, run_id):
+        self._step('open')
+
+    def write(self, name, df):
+        time.sleep(self.delay)
+        self.written[name] = len(df)
+        self._step('write')
+
+    def prepare(self):
+        self._step('prepare')
+
+    def close(self):
+        self._step('close')
+
+    def abort(self):
+        self._step('abort')
+
+
+def frame(rows):
+    return lambda: pd.DataFrame({'value': range(rows)})
+
+
+def failing_fetch():
+    raise RuntimeError("rate limited")
+
+
+STAGES = [('top_artists', frame(3)), ('top_tracks', frame(5)), ('recently_played', frame(7))]
+
+
+class TestExportPipeline(unittest.TestCase):
+    """Test fan-out, ordering and all-or-nothing closing"""
+
+    def setUp(self):
+        self.events = []
+
+    def sinks(self, **fail_on):
+        return [RecordingSink(name, self.events, fail_on.get(name), delay=0.01 * (2 - i))
+                for i, name in enumerate(['csv', 'json', 'sqlite'])]
+
+    def steps(self, sink_name):
+        return [step for name, step in self.events if name == sink_name]
+
+    def test_every_sink_gets_every_stage(self):
+        sinks = self.sinks()
+        timings = ExportPipeline(STAGES, sinks).run()
+        for sink in sinks:
+            self.assertEqual(sink.written, {'top_artists': 3, 'top_tracks': 5, 'recently_played': 7})
+            self.assertEqual(self.steps(sink.name)[-2:], ['prepare', 'close'])
+        self.assertEqual(timings['top_tracks']['rows'], 5)
+        self.assertEqual(set(timings['top_tracks']['written']), {'csv', 'json', 'sqlite'})
+
+    def test_sinks_close_in_order_after_all_writes(self):
+        """Slow early sinks still close first, and only after every write"""
+        ExportPipeline(STAGES, self.sinks()).run()
+        closes = [i for i, (_, step) in enumerate(self.events) if step == 'close']
+        writes = [i for i, (_, step) in enumerate(self.events) if step == 'write']
+        self.assertEqual([self.events[i][0] for i in closes], ['csv', 'json', 'sqlite'])
+        self.assertLess(max(writes), min(closes))
+
+    def test_failed_stage_aborts_every_sink(self):
+        sinks = self.sinks()
+        with self.assertRaises(RuntimeError):
+            ExportPipeline(STAGES + [('audio_features', failing_fetch)], sinks).run()
+        for sink in sinks:
+            self.assertEqual(self.steps(sink.name)[-1], 'abort')
+            self.assertNotIn('close', self.steps(sink.name))
+
+    def test_failed_write_aborts_the_other_sinks(self):
+        pipeline = ExportPipeline(STAGES, self.sinks(json='write'))
+        with self.assertRaises(RuntimeError):
+            pipeline.run()
+        for name in ['csv', 'json', 'sqlite']:
+            self.assertEqual(self.steps(name)[-1], 'abort')
+        self.assertNotIn('prepare', self.steps('json'))
+        self.assertEqual(pipeline.errors[0][0].split(':')[0], 'json')
+
+    def test_failed_close_aborts_later_sinks(self):
+        """A close that already succeeded stays, later sinks are aborted"""
+        with self.assertRaises(RuntimeError):
+            ExportPipeline(STAGES, self.sinks(json='close')).run()
+        self.assertEqual(self.steps('csv')[-1], 'close')
+        self.assertEqual(self.steps('sqlite')[-1], 'abort')
+
+    def test_failed_open_skips_the_sink(self):
+        with self.assertRaises(RuntimeError):
+            ExportPipeline(STAGES, self.sinks(sqlite='open')).run()
+        self.assertEqual(self.steps('sqlite'), ['open'])
+        self.assertEqual(self.steps('csv')[-1], 'abort')
+
+    def test_slow_writer_does_not_deadlock(self):
+        """Bounded queues apply backpressure without blocking forever"""
+        stages = [(f'stage_{i}', frame(1)) for i in range(12)]
+        sink = RecordingSink('slow', self.events, delay=0.01)
+        result = {}
+        thread = threading.Thread(target=lambda: result.update(ExportPipeline(stages, [sink], queue_size=1).run()))
+        thread.start()
+        thread.join(timeout=10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(sink.written), 12)
+        self.assertEqual(len(result), 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Tests for the synthetic library and MockSpotifyClient
+"""
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.mock_data import REFERENCE_END, MockSpotifyClient, SyntheticLibrary
+
+
+class TestSyntheticLibrary(unittest.TestCase):
+    def test_same_seed_same_library(self):
+        first, second = SyntheticLibrary(plays=2000, seed=3), SyntheticLibrary(plays=2000, seed=3)
+        np.testing.assert_array_equal(first.played_ms, second.played_ms)
+        np.testing.assert_array_equal(first.play_track, second.play_track)
+        self.assertEqual(first.artist_genres, second.artist_genres)
+        self.assertFalse(np.array_equal(first.play_track, SyntheticLibrary(plays=2000, seed=4).play_track))
+
+    def test_history_is_newest_first_and_ends_at_reference(self):
+        lib = SyntheticLibrary(plays=5000)
+        self.assertEqual(len(lib.played_ms), 5000)
+        self.assertTrue((np.diff(lib.played_ms) <= 0).all())
+        self.assertLessEqual(lib.played_ms[0], REFERENCE_END.timestamp() * 1000)
+
+    def test_favourites_dominate(self):
+        """Zipf plays: the top 10% of played tracks get far more than 10% of plays"""
+        lib = SyntheticLibrary(plays=20000)
+        counts = np.sort(np.bincount(lib.play_track))[::-1]
+        played = counts[counts > 0]
+        self.assertGreater(played[:len(played) // 10].sum(), 0.3 * len(lib.play_track))
+
+    def test_evening_is_busier_than_night(self):
+        hours = SyntheticLibrary(plays=20000).recently_played_frame()['hour'].value_counts()
+        self.assertGreater(hours[19], 5 * hours[3])
+
+    def test_recently_played_frame(self):
+        lib = SyntheticLibrary(plays=300)
+        frame = lib.recently_played_frame()
+        self.assertEqual(len(frame), 300)
+        self.assertEqual(list(frame.columns), ['played_at', 'track_name', 'artist', 'album', 'duration_min',
+                                               'day_of_week', 'hour', 'spotify_url'])
+
+
+class TestMockSpotifyClient(unittest.TestCase):
+    def setUp(self):
+        self.client = MockSpotifyClient(plays=2000)
+
+    def test_top_items_page_like_the_api(self):
+        first = self.client.get_top_artists(limit=10)
+        second = self.client.get_top_artists(limit=10, offset=10)
+        self.assertEqual(len(first['items']), 10)
+        self.assertIsNotNone(first['next'])
+        self.assertFalse({a['id'] for a in first['items']} & {a['id'] for a in second['items']})
+        self.assertEqual(self.client.calls['top_artists'], 2)
+
+    def test_short_term_uses_less_history(self):
+        short = self.client.get_top_tracks(time_range='short_term', limit=50)['total']
+        long = self.client.get_top_tracks(time_range='long_term', limit=50)['total']
+        self.assertLess(short, long)
+
+    def test_recently_played_pages_backwards_without_gaps(self):
+        seen = []
+        before = None
+        while len(seen) < 200:
+            page = self.client.get_recently_played(limit=50, before=before)
+            seen.extend(item['played_at'] for item in page['items'])
+            before = page['cursors']['before']
+        self.assertEqual(len(set(seen)), len(seen))
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+    def test_recently_played_after_cursor(self):
+        after = int(self.client.library.played_ms[20])
+        items = self.client.get_recently_played(limit=50, after=after)['items']
+        self.assertEqual(len(items), 20)
+
+    def test_audio_features_unknown_ids(self):
+        track_id = self.client.get_top_tracks(limit=1)['items'][0]['id']
+        features = self.client.get_audio_features([track_id, 'spotify:unknown'])
+        self.assertEqual(features[0]['id'], track_id)
+        self.assertIsNone(features[1])
+
+    def test_spotipy_surface(self):
+        artist = self.client.get_top_artists(limit=1)['items'][0]
+        self.assertEqual(self.client.sp.artist(artist['id'])['name'], artist['name'])
+        self.assertEqual(self.client.sp.current_user()['id'], 'mock-user')
+        with self.assertRaises(ValueError):
+            self.client.sp.artist('nope')
+
+
+if __name__ == '__main__':
+    unittest.main()
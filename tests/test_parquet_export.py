@@ -0,0 +1,98 @@
+"""
+Tests for the partitioned Parquet export sink
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.mock_data import MockSpotifyClient
+from export_all import make_sinks, run_export
+from export_sinks import ParquetSink
+
+FOLDER = 'spotify_exports/parquet'
+
+
+def plays(*timestamps):
+    """Play history rows as the exporter formats them"""
+    return pd.DataFrame({'played_at': list(timestamps), 'track_name': 'Song', 'artist': 'Artist'})
+
+
+class TestParquetSink(unittest.TestCase):
+    def setUp(self):
+        """Run every export in an empty folder"""
+        self.cwd = os.getcwd()
+        self.folder = tempfile.mkdtemp()
+        os.chdir(self.folder)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_partitioned_layout_and_types(self):
+        """Ranged datasets are partitioned by time range and export date"""
+        pipeline = run_export(make_sinks(['parquet']), client=MockSpotifyClient(plays=500))
+        partition = os.path.join(FOLDER, 'top_artists', 'time_range=medium_term')
+        self.assertEqual(len(os.listdir(partition)), 1)
+        self.assertTrue(os.listdir(partition)[0].startswith('export_date='))
+
+        table = pq.read_table(os.path.join(FOLDER, 'top_artists'))
+        self.assertEqual(table.num_rows, pipeline.timings['top_artists']['rows'])
+        self.assertEqual(str(table.schema.field('rank').type), 'int16')
+        self.assertEqual(str(table.schema.field('popularity').type), 'int8')
+        self.assertEqual(set(table.column('time_range').to_pylist()), {'medium_term'})
+
+    def test_play_history_partitioned_by_month(self):
+        sink = ParquetSink()
+        sink.open('run1')
+        sink.write('recently_played', plays('2024-11-30 23:59:00', '2024-12-01 00:01:00'))
+        sink.close()
+        self.assertEqual(sorted(os.listdir(os.path.join(FOLDER, 'recently_played'))),
+                         ['month=2024-11', 'month=2024-12'])
+
+    def test_stored_plays_are_skipped(self):
+        first = ParquetSink()
+        first.open('run1')
+        first.write('recently_played', plays('2024-12-01 10:00:00', '2024-12-01 11:00:00'))
+        first.close()
+
+        second = ParquetSink()
+        second.open('run2')
+        second.write('recently_played', plays('2024-12-01 11:00:00', '2024-12-01 12:00:00'))
+        second.close()
+        table = pq.read_table(os.path.join(FOLDER, 'recently_played'))
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(len(second.written), 1)
+
+    def test_abort_removes_only_this_runs_parts(self):
+        kept = ParquetSink()
+        kept.open('run1')
+        kept.write('genres', pd.DataFrame({'genre': ['pop'], 'count': [3]}))
+        kept.close()
+
+        failed = ParquetSink()
+        failed.open('run2')
+        failed.write('genres', pd.DataFrame({'genre': ['rock'], 'count': [1]}))
+        failed.write('recently_played', plays('2024-12-01 10:00:00'))
+        failed.abort()
+        for filename in failed.written:
+            self.assertFalse(os.path.exists(filename))
+        self.assertFalse(os.path.exists(os.path.join(FOLDER, 'recently_played', 'month=2024-12')))
+        self.assertEqual(pq.read_table(os.path.join(FOLDER, 'genres')).column('genre').to_pylist(), ['pop'])
+
+    def test_empty_dataset_writes_nothing(self):
+        sink = ParquetSink()
+        sink.open('run1')
+        sink.write('genres', pd.DataFrame({'genre': [], 'count': []}))
+        self.assertEqual(sink.written, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
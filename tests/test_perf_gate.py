@@ -0,0 +1,89 @@
+"""
+Tests for the performance gate's comparison against the baseline
+"""
+import os
+import sys
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from run_tests import compare_benchmarks, same_machine
+
+MACHINE = {'node': 'ci', 'machine': 'x86_64', 'processor': 'x86_64',
+           'cpu_count': 4, 'python_version': '3.11.4'}
+
+
+def results(median, peak=1024, api_calls=0, heavy_imports=(), machine=MACHINE):
+    """Result document holding a single benchmark"""
+    return {
+        'machine_info': dict(machine),
+        'benchmarks': [{
+            'fullname': 'export/csv',
+            'stats': {'median': median, 'iqr': 0.0},
+            'extra_info': {'peak_memory_bytes': peak, 'api_calls': api_calls,
+                           'heavy_imports': list(heavy_imports)},
+        }],
+    }
+
+
+class TestCompareBenchmarks(unittest.TestCase):
+    """Test the regression rules of compare_benchmarks"""
+
+    def test_unchanged_run_passes(self):
+        """Test a run matching the baseline is ok"""
+        row, = compare_benchmarks(results(0.1), results(0.1))
+        self.assertEqual(row['regressions'], [])
+        self.assertIn('ok', row['status'])
+
+    def test_slower_median_regresses(self):
+        """Test a median beyond the tolerance is a latency regression"""
+        row, = compare_benchmarks(results(0.2), results(0.1))
+        self.assertEqual(row['regressions'], ['latency'])
+
+    def test_small_absolute_change_is_noise(self):
+        """Test sub-floor changes on tiny benchmarks are not regressions"""
+        row, = compare_benchmarks(results(0.0015), results(0.001))
+        self.assertEqual(row['regressions'], [])
+
+    def test_other_machine_only_warns_on_latency(self):
+        """Test a slower run against another machine's baseline only warns"""
+        row, = compare_benchmarks(results(0.2), results(0.1), strict_latency=False)
+        self.assertEqual(row['regressions'], [])
+        self.assertEqual(row['warnings'], ['latency'])
+        self.assertIn('other machine', row['status'])
+
+    def test_other_machine_still_fails_on_api_calls_and_imports(self):
+        """Test API-call and import regressions fail on any machine"""
+        row, = compare_benchmarks(results(0.1, api_calls=5, heavy_imports=['pandas']),
+                                  results(0.1, api_calls=3), strict_latency=False)
+        self.assertEqual(row['regressions'], ['api calls', 'imports pandas'])
+
+    def test_memory_growth_regresses(self):
+        """Test a much higher memory peak is a regression"""
+        row, = compare_benchmarks(results(0.1, peak=4 * 2 ** 20), results(0.1, peak=2 ** 20),
+                                  strict_latency=False)
+        self.assertEqual(row['regressions'], ['memory'])
+
+    def test_new_benchmark(self):
+        """Test benchmarks missing from the baseline are reported as new"""
+        baseline = results(0.1)
+        baseline['benchmarks'] = []
+        row, = compare_benchmarks(results(0.1), baseline)
+        self.assertIn('new', row['status'])
+
+
+class TestSameMachine(unittest.TestCase):
+    """Test the machine check used to decide how strict latency is"""
+
+    def test_same_machine(self):
+        self.assertTrue(same_machine(results(0.1), results(0.2)))
+
+    def test_other_node_or_cpu_count(self):
+        for field, value in (('node', 'vm'), ('cpu_count', 1), ('python_version', '3.12.0')):
+            other = dict(MACHINE, **{field: value})
+            self.assertFalse(same_machine(results(0.1), results(0.1, machine=other)), field)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Tests for date-window datasets built from the exported play history
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import date
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.mock_data import MockSpotifyClient
+from data_processor import DataProcessor
+from db_pool import ReadConnectionPool
+from export_all import make_sinks, run_export
+from play_history import WINDOW_DATASETS, binge_listening, listening_heatmap, listening_hours, load_plays
+
+
+class TestPlayHistory(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Export the same 50 plays twice, so every play is stored once per run"""
+        cls.cwd = os.getcwd()
+        cls.folder = tempfile.mkdtemp()
+        os.chdir(cls.folder)
+        cls.client = MockSpotifyClient(plays=50)
+        run_export(make_sinks(['sqlite']), client=cls.client)
+        run_export(make_sinks(['sqlite']), client=cls.client)
+        cls.pool = ReadConnectionPool('spotify_data.db')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+        os.chdir(cls.cwd)
+        shutil.rmtree(cls.folder, ignore_errors=True)
+
+    def all_plays(self):
+        return load_plays(self.pool, date(2000, 1, 1), date(2100, 1, 1))
+
+    def test_every_play_once(self):
+        self.assertEqual(len(self.all_plays()), 50)
+
+    def test_window_is_inclusive(self):
+        plays = self.all_plays()
+        day = plays['played_at'].iloc[-1].date()
+        window = load_plays(self.pool, day, day)
+        self.assertEqual(len(window), (plays['played_at'].dt.date == day).sum())
+        self.assertTrue((window['played_at'].dt.date == day).all())
+
+    def test_matches_the_api_datasets(self):
+        """The last 50 plays give the same datasets as the live API path"""
+        plays = self.all_plays()
+        processor = DataProcessor(MockSpotifyClient(plays=50))
+        pd.testing.assert_frame_equal(listening_hours(plays), processor.get_listening_hours_data(),
+                                      check_dtype=False)
+        pd.testing.assert_frame_equal(listening_heatmap(plays), processor.get_listening_heatmap_data(),
+                                      check_dtype=False)
+        expected = processor.get_binge_listening()
+        binge = binge_listening(plays)
+        self.assertEqual(sorted(map(tuple, binge[['name', 'artist', 'plays']].values.tolist())),
+                         sorted(map(tuple, expected[['name', 'artist', 'plays']].values.tolist())))
+
+    def test_empty_window(self):
+        plays = load_plays(self.pool, date(2001, 1, 1), date(2001, 1, 31))
+        data = {name: build(plays) for name, build in WINDOW_DATASETS.items()}
+        self.assertEqual(data['listening_hours']['plays'].sum(), 0)
+        self.assertEqual(len(data['listening_heatmap']), 0)
+        self.assertEqual(len(data['binge']), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Tests for the opt-in profiling hooks
+"""
+import os
+import pstats
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import profiling
+from profiling import PROFILE_ENV, ProfileSession, profile_main, profile_mode
+
+
+def busy_worker():
+    total = 0
+    for i in range(200000):
+        total += i * i
+    return total
+
+
+class TestProfileMode(unittest.TestCase):
+    def test_command_line(self):
+        with patch.dict(os.environ, {PROFILE_ENV: ''}):
+            self.assertEqual(profile_mode(['--profile']), 'full')
+            self.assertEqual(profile_mode(['--profile=sample']), 'sample')
+            self.assertEqual(profile_mode(['--profile=bogus']), 'full')
+            self.assertIsNone(profile_mode(['--limit', '5']))
+
+    def test_environment(self):
+        for value, mode in (('sample', 'sample'), ('1', 'full'), ('FULL', 'full'), ('no', None)):
+            with patch.dict(os.environ, {PROFILE_ENV: value}):
+                self.assertEqual(profile_mode([]), mode, value)
+
+
+class TestProfileSession(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_full_profile_covers_worker_threads(self):
+        session = ProfileSession('export', 'full', self.folder).start()
+        worker = threading.Thread(target=busy_worker)
+        worker.start()
+        worker.join()
+        paths = session.stop()
+        self.assertEqual([os.path.splitext(p)[1] for p in paths], ['.pstats', '.txt', '.collapsed'])
+        functions = {name for _, _, name in pstats.Stats(paths[0]).stats}
+        self.assertIn('busy_worker', functions)
+        with open(paths[1], encoding='utf-8') as f:
+            self.assertTrue(f.readline().startswith('Traced memory:'))
+
+    def test_one_full_session_at_a_time(self):
+        """A full session started while another runs is sampled instead"""
+        first = ProfileSession('dashboard', 'full', self.folder).start()
+        second = ProfileSession('dashboard', 'full', self.folder).start()
+        self.assertEqual(second.mode, 'sample')
+        second.stop()
+        first.stop()
+        third = ProfileSession('dashboard', 'full', self.folder).start()
+        self.assertEqual(third.mode, 'full')
+        third.stop()
+
+    def test_samples_append_to_one_file_per_day(self):
+        for _ in range(2):
+            session = ProfileSession('daemon', 'sample', self.folder, all_threads=False)
+            session.sampler.interval = 0.001
+            session.start()
+            time.sleep(0.05)
+            paths = session.stop()
+        self.assertEqual(len(os.listdir(self.folder)), 1)
+        with open(paths[0], encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines)
+        self.assertTrue(all(line.rsplit(' ', 1)[1].isdigit() for line in lines))
+
+    def test_profile_main_only_when_switched_on(self):
+        @profile_main('export')
+        def main():
+            return busy_worker()
+
+        with patch.dict(os.environ, {PROFILE_ENV: '', profiling.PROFILE_DIR_ENV: self.folder}), \
+                patch.object(sys, 'argv', ['export']):
+            main()
+            self.assertEqual(os.listdir(self.folder), [])
+            with patch.object(sys, 'argv', ['export', '--profile=sample']):
+                self.assertEqual(main(), busy_worker())
+        self.assertEqual(len(os.listdir(self.folder)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
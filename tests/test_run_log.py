@@ -0,0 +1,93 @@
+"""
+Tests for the structured export run log
+"""
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spotipy.exceptions import SpotifyException
+
+from tests.mock_data import MockSpotifyClient
+from tests.test_export_checkpoint import RateLimitedClient
+from export_all import make_sinks, run_export
+from run_log import DEFAULT_RUN_LOG, RUN_LOG_ENV, disk_usage
+
+
+def run_records(path=DEFAULT_RUN_LOG):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+class TestRunLog(unittest.TestCase):
+    def setUp(self):
+        """Run every export in an empty folder"""
+        self.cwd = os.getcwd()
+        self.folder = tempfile.mkdtemp()
+        os.chdir(self.folder)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_successful_run_record(self):
+        pipeline = run_export(make_sinks(['sqlite', 'json']), client=MockSpotifyClient(plays=300))
+        record, = run_records()
+        self.assertEqual((record['run_id'], record['status'], record['errors']), (pipeline.run_id, 'success', []))
+        self.assertEqual(record['formats'], ['sqlite', 'json'])
+        stages = {stage['stage']: stage for stage in record['stages']}
+        self.assertEqual(set(stages), set(pipeline.timings))
+        top = stages['top_artists']
+        self.assertEqual(top['rows_written'], {'sqlite': top['rows_fetched'], 'json': top['rows_fetched']})
+        self.assertEqual(record['rows_fetched'], sum(s['rows_fetched'] for s in record['stages']))
+        self.assertEqual(record['outputs']['sqlite']['bytes'], disk_usage('spotify_data.db'))
+        self.assertGreater(record['outputs']['json']['bytes'], 0)
+        self.assertNotIn('api', record)  # the mock client has no ApiMetrics
+
+    def test_runs_stored_in_the_database(self):
+        client = RateLimitedClient(plays=300)
+        client.limited = False
+        run_export(make_sinks(['sqlite']), client=client)
+        client.limited = True
+        with self.assertRaises(SpotifyException):
+            run_export(make_sinks(['sqlite']), client=client)
+
+        first, failed = run_records()
+        self.assertEqual(failed['status'], 'failed')
+        self.assertEqual(failed['errors'][0]['where'], 'audio_features')
+        stages = {stage['stage']: stage for stage in failed['stages']}
+        self.assertIn('SpotifyException', stages['audio_features']['error'])
+
+        conn = sqlite3.connect('spotify_data.db')
+        rows = conn.execute("SELECT run_id, status FROM export_runs ORDER BY started_at").fetchall()
+        stored = json.loads(conn.execute("SELECT record FROM export_runs WHERE status = 'failed'").fetchone()[0])
+        conn.close()
+        self.assertEqual(rows, [(first['run_id'], 'success'), (failed['run_id'], 'failed')])
+        self.assertEqual(stored, failed)
+
+    def test_log_path_from_environment(self):
+        with patch.dict(os.environ, {RUN_LOG_ENV: 'runs/custom.jsonl'}):
+            os.makedirs('runs')
+            run_export(make_sinks(['json']), client=MockSpotifyClient(plays=100))
+        self.assertEqual(len(run_records('runs/custom.jsonl')), 1)
+        self.assertFalse(os.path.exists(DEFAULT_RUN_LOG))
+
+    def test_disk_usage(self):
+        os.makedirs('out/nested')
+        for path, size in (('out/a.bin', 100), ('out/nested/b.bin', 50), ('db', 10), ('db-wal', 5)):
+            with open(path, 'wb') as f:
+                f.write(b'x' * size)
+        self.assertEqual(disk_usage('out'), 150)
+        self.assertEqual(disk_usage('db'), 15)
+        self.assertEqual(disk_usage('missing'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Tests for the memory-mapped dashboard snapshot
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from snapshot import Snapshot, read_snapshot, snapshot_version, update_snapshot, write_snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'snapshot.arrow')
+        self.datasets = {
+            'top_artists': pd.DataFrame({'rank': [1, 2], 'name': ['A', 'B'], 'popularity': [90, 80]}),
+            'genres': pd.DataFrame({'genre': ['pop', 'rock', 'jazz'], 'count': [5, 3, 1]}),
+            'diversity': pd.DataFrame([{'unique_artists': 12, 'diversity_score': 0.4}]),
+            'hidden_gems': pd.DataFrame(),
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_round_trip(self):
+        """Datasets with different schemas come back unchanged from one file"""
+        write_snapshot(self.datasets, self.path, run_id='run1')
+        data, metadata = read_snapshot(self.path)
+        pd.testing.assert_frame_equal(data['top_artists'], self.datasets['top_artists'])
+        pd.testing.assert_frame_equal(data['genres'], self.datasets['genres'])
+        self.assertEqual(len(data['hidden_gems']), 0)
+        self.assertEqual(metadata['run_id'], 'run1')
+
+    def test_record_datasets_are_dicts(self):
+        write_snapshot(self.datasets, self.path)
+        self.assertEqual(Snapshot(self.path).get('diversity'), {'unique_artists': 12, 'diversity_score': 0.4})
+
+    def test_datasets_convert_once(self):
+        write_snapshot(self.datasets, self.path)
+        snapshot = Snapshot(self.path)
+        self.assertIs(snapshot.get('genres'), snapshot.get('genres'))
+
+    def test_written_atomically(self):
+        write_snapshot(self.datasets, self.path)
+        self.assertEqual(os.listdir(self.folder), ['snapshot.arrow'])
+
+    def test_update_keeps_other_datasets_and_run_id(self):
+        write_snapshot(self.datasets, self.path, run_id='run1')
+        new_genres = pd.DataFrame({'genre': ['metal'], 'count': [9]})
+        self.assertTrue(update_snapshot({'genres': new_genres, 'binge': pd.DataFrame({'x': [1]})}, self.path))
+        data, metadata = read_snapshot(self.path)
+        pd.testing.assert_frame_equal(data['genres'], new_genres)
+        pd.testing.assert_frame_equal(data['top_artists'], self.datasets['top_artists'])
+        self.assertIn('binge', data)
+        self.assertEqual(metadata['run_id'], 'run1')
+
+    def test_update_without_snapshot(self):
+        self.assertFalse(update_snapshot({'genres': self.datasets['genres']}, self.path))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_version_changes_with_run(self):
+        self.assertIsNone(snapshot_version(self.path))
+        write_snapshot(self.datasets, self.path, run_id='run1')
+        first = snapshot_version(self.path)
+        write_snapshot(self.datasets, self.path, run_id='run2')
+        self.assertEqual(first[1], 'run1')
+        self.assertEqual(snapshot_version(self.path)[1], 'run2')
+
+
+if __name__ == '__main__':
+    unittest.main()
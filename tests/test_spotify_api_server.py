@@ -0,0 +1,94 @@
+"""
+Tests for the local Spotify API stand-in, driven through the real SpotifyClient
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.mock_data import MockSpotifyClient
+from tests.spotify_api_server import SpotifyAPIServer, fixture_key
+from spotify_client import API_URL_ENV, API_UPSTREAM_ENV, SpotifyClient
+
+
+def client_for(server):
+    """A real SpotifyClient whose requests go to ``server``"""
+    with patch.dict(os.environ, {API_URL_ENV: server.url}):
+        os.environ.pop(API_UPSTREAM_ENV, None)
+        return SpotifyClient()
+
+
+def get(url, token=None):
+    request = urllib.request.Request(url, headers={'Authorization': f'Bearer {token}'} if token else {})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+class TestSpotifyAPIServer(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.mock = MockSpotifyClient(plays=500)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_serves_the_mock_library(self):
+        """The real client gets the same data as the mock, after one token refresh"""
+        with SpotifyAPIServer(client=self.mock) as server:
+            client = client_for(server)
+            artists = client.get_top_artists(limit=10)['items']
+            recent = client.get_recently_played(limit=20)['items']
+        self.assertEqual([a['id'] for a in artists],
+                         [a['id'] for a in MockSpotifyClient(plays=500).get_top_artists(limit=10)['items']])
+        self.assertEqual(len(recent), 20)
+        self.assertEqual(server.stats['token_refresh_token'], 1)
+        self.assertEqual(server.stats['api_requests'], 2)
+
+    def test_rate_limited_requests_are_retried(self):
+        with SpotifyAPIServer(client=self.mock, rate_limit_every=2, retry_after=0) as server:
+            client = client_for(server)
+            client.get_top_artists(limit=5)
+            tracks = client.get_top_tracks(limit=5)['items']
+        self.assertEqual(len(tracks), 5)
+        self.assertEqual(server.stats['rate_limited'], 1)
+        rows = {row['endpoint']: row for row in client.metrics.summary()}
+        self.assertEqual((rows['top_tracks']['429'], rows['top_tracks']['retries']), (1, 1))
+
+    def test_requests_need_a_valid_token(self):
+        with SpotifyAPIServer(client=self.mock) as server:
+            status, body = get(server.url + '/v1/me/top/artists')
+            token = server.issue_token('client_credentials')['access_token']
+            ok, _ = get(server.url + '/v1/me/top/artists?limit=5', token)
+            bad, _ = get(server.url + '/v1/me/top/artists?limit=500', token)
+        self.assertEqual((status, body['error']['status']), (401, 401))
+        self.assertEqual((ok, bad), (200, 400))
+
+    def test_record_then_replay(self):
+        fixtures = os.path.join(self.folder, 'fixtures.json')
+        with SpotifyAPIServer(client=self.mock, record=fixtures) as server:
+            recorded = client_for(server).get_top_tracks(limit=10)
+        with SpotifyAPIServer(client=MockSpotifyClient(plays=50, seed=1), replay=fixtures) as server:
+            replayed = client_for(server).get_top_tracks(limit=10)
+            status, body = get(server.url + '/v1/me/top/tracks?limit=3')
+        self.assertEqual([t['id'] for t in replayed['items']], [t['id'] for t in recorded['items']])
+        self.assertEqual(status, 404)
+        self.assertIn('No recorded fixture', body['error']['message'])
+
+    def test_fixture_key_ignores_parameter_order(self):
+        self.assertEqual(fixture_key('GET', '/v1/me/top/tracks', {'limit': ['10'], 'time_range': ['short_term']}),
+                         fixture_key('GET', '/v1/me/top/tracks', {'time_range': ['short_term'], 'limit': ['10']}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+Tests for the opt-in stage timings
+"""
+import os
+import sys
+import threading
+import unittest
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import timing
+from timing import StageTimer, count, record, timed
+from tests.mock_data import MockSpotifyClient
+from spotify_client import CachingSpotifyClient
+from data_processor import DataProcessor
+
+
+@timed('processor')
+def add(a, b):
+    return a + b
+
+
+class TestStageTimer(unittest.TestCase):
+    def tearDown(self):
+        timing.begin(False)
+
+    def test_nothing_recorded_without_a_timer(self):
+        timer = StageTimer()
+        with record('db', 'query'):
+            count('db_queries')
+        self.assertEqual(add(1, 2), 3)
+        self.assertEqual((timer.records, timer.counters), ([], {}))
+        self.assertIsNone(timing.active())
+
+    def test_records_and_counters(self):
+        timer = timing.begin(True)
+        with record('db', 'query'):
+            count('db_queries')
+        with record('db', 'query'):
+            count('db_queries')
+        add(1, 2)
+        rows = {(row['category'], row['stage']): row for row in timer.summary()}
+        self.assertEqual(rows[('db', 'query')]['calls'], 2)
+        self.assertEqual(rows[('processor', 'add')]['calls'], 1)
+        self.assertEqual(timer.counters['db_queries'], 2)
+
+    def test_begin_replaces_the_previous_timer(self):
+        first = timing.begin(True)
+        second = timing.begin(True)
+        self.assertIsNot(first, second)
+        self.assertIs(timing.active(), second)
+        self.assertIsNone(timing.begin(False))
+
+    def test_timers_are_per_thread(self):
+        timer = timing.begin(True)
+        thread = threading.Thread(target=lambda: count('other_thread'))
+        thread.start()
+        thread.join()
+        self.assertNotIn('other_thread', timer.counters)
+
+    def test_activate_restores_the_previous_timer(self):
+        outer = timing.begin(True)
+        inner = StageTimer()
+        with inner.activate():
+            count('inner')
+        count('outer')
+        self.assertEqual((inner.counters['inner'], outer.counters['outer']), (1, 1))
+        self.assertNotIn('outer', inner.counters)
+
+    def test_api_calls_and_cache_hits(self):
+        """Processor stages include the API calls they make, and repeats hit the cache"""
+        timer = timing.begin(True)
+        processor = DataProcessor(CachingSpotifyClient(MockSpotifyClient(plays=100)))
+        processor.get_top_artists_data()
+        processor.get_genre_distribution()
+        self.assertEqual(timer.counters['api_calls'], 1)
+        self.assertEqual(timer.counters['client_cache_hits'], 1)
+        categories = {row['category'] for row in timer.summary()}
+        self.assertEqual(categories, {'api', 'processor'})
+
+    def test_summary_slowest_first(self):
+        timer = StageTimer()
+        timer.add('chart', 'fast', 0.001)
+        timer.add('chart', 'slow', 0.5)
+        self.assertEqual([row['stage'] for row in timer.summary()], ['slow', 'fast'])
+        self.assertEqual(timer.summary()[0]['total_ms'], 500.0)
+
+    def test_enabled_by_environment(self):
+        with patch.dict(os.environ, {timing.TIMINGS_ENV: 'yes'}):
+            self.assertTrue(timing.timings_enabled_by_default())
+        with patch.dict(os.environ, {timing.TIMINGS_ENV: '0'}):
+            self.assertFalse(timing.timings_enabled_by_default())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Tests for the streaming database viewer
+"""
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from view_database import count_rows, iter_rows, print_table
+
+
+class TestViewDatabase(unittest.TestCase):
+    """Test keyset paging and counting in view_database"""
+
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute("CREATE TABLE plays (track TEXT, hour INTEGER)")
+        self.conn.executemany("INSERT INTO plays VALUES (?, ?)",
+                              [(f'Track {i}', i % 24) for i in range(1, 101)])
+
+    def tearDown(self):
+        self.conn.close()
+
+    def tracks(self, **kwargs):
+        return [row[0] for row in iter_rows(self.conn, 'plays', ['track'], **kwargs)]
+
+    def test_streams_every_row_across_pages(self):
+        """Test a limit of 0 pages through the whole table in order"""
+        self.assertEqual(self.tracks(limit=0, page_size=7), [f'Track {i}' for i in range(1, 101)])
+
+    def test_limit_and_offset(self):
+        self.assertEqual(self.tracks(limit=3, offset=10, page_size=2), ['Track 11', 'Track 12', 'Track 13'])
+
+    def test_after_starts_past_rowid(self):
+        self.assertEqual(self.tracks(limit=0, after=95, page_size=2),
+                         ['Track 96', 'Track 97', 'Track 98', 'Track 99', 'Track 100'])
+
+    def test_where_applies_to_every_page(self):
+        tracks = self.tracks(limit=0, where="hour = 5", page_size=1)
+        self.assertEqual(tracks, ['Track 5', 'Track 29', 'Track 53', 'Track 77'])
+
+    def test_count_honours_where_and_after(self):
+        self.assertEqual(count_rows(self.conn, 'plays'), 100)
+        self.assertEqual(count_rows(self.conn, 'plays', after=90), 10)
+        self.assertEqual(count_rows(self.conn, 'plays', "hour = 5", after=50), 2)
+
+    def test_printed_total_matches_after(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            print_table(self.conn, 'plays', limit=0, after=90)
+        self.assertIn("Total records: 10", out.getvalue())
+        self.assertIn("(10 rows shown)", out.getvalue())
+
+    def test_unknown_column(self):
+        with self.assertRaises(ValueError):
+            print_table(self.conn, 'plays', columns=['missing'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Tests for the size-aware dashboard charts and the figure cache
+"""
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from visualizer import (DENSITY_BINS, SCATTER_DENSITY_THRESHOLD, SCATTER_WEBGL_THRESHOLD,
+                        FigureCache, Visualizer, content_hash)
+
+
+def scatter_frame(songs):
+    """Emotional scatter input with ``songs`` rows"""
+    rng = np.random.default_rng(7)
+    return pd.DataFrame({
+        'valence': rng.random(songs),
+        'energy': rng.random(songs),
+        'danceability': rng.random(songs),
+        'name': [f'Track {i}' for i in range(songs)],
+        'artist': 'Artist',
+    })
+
+
+class TestEmotionalScatter(unittest.TestCase):
+    """Test the emotional scatter switches traces by size"""
+
+    def setUp(self):
+        self.viz = Visualizer(cache_size=0)
+
+    def test_small_input_uses_svg_markers(self):
+        fig = self.viz.create_emotional_scatter(scatter_frame(50))
+        self.assertEqual(fig.data[0].type, 'scatter')
+        self.assertEqual(len(fig.data[0].x), 50)
+
+    def test_large_input_uses_webgl(self):
+        fig = self.viz.create_emotional_scatter(scatter_frame(SCATTER_WEBGL_THRESHOLD + 1))
+        self.assertEqual(fig.data[0].type, 'scattergl')
+
+    def test_huge_input_is_binned(self):
+        """Test very large inputs ship a density grid holding every song"""
+        songs = SCATTER_DENSITY_THRESHOLD + 1
+        fig = self.viz.create_emotional_scatter(scatter_frame(songs))
+        self.assertEqual(fig.data[0].type, 'heatmap')
+        z = np.asarray(fig.data[0].z)
+        self.assertEqual(z.shape, (DENSITY_BINS, DENSITY_BINS))
+        self.assertEqual(z.sum(), songs)
+
+
+class TestListeningHoursChart(unittest.TestCase):
+    """Test the listening hours chart keeps every hour"""
+
+    def test_all_hours_plotted(self):
+        df = pd.DataFrame({'hour': range(24), 'plays': range(24)})
+        fig = Visualizer(cache_size=0).create_listening_hours_chart(df)
+        self.assertEqual(list(fig.data[0].x), list(range(24)))
+        self.assertEqual(fig.data[0].mode, 'lines+markers')
+
+
+class TestFigureCache(unittest.TestCase):
+    """Test the LRU figure cache"""
+
+    def test_evicts_least_recently_used(self):
+        cache = FigureCache(max_entries=2)
+        cache.put('a', '{}')
+        cache.put('b', '{}')
+        cache.get_json('a')
+        cache.get('a')
+        cache.put('c', '{}')
+        self.assertIsNone(cache.get_json('b'))
+        self.assertIsNotNone(cache.get_json('a'))
+        self.assertIsNotNone(cache.get_json('c'))
+        self.assertEqual(cache.stats()['entries'], 2)
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = FigureCache(max_entries=0)
+        cache.put('a', '{}')
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats(), {'entries': 0, 'hits': 0, 'misses': 1})
+
+    def test_figure_rebuilt_from_json(self):
+        """Test entries stored without a Figure are rebuilt once and then shared"""
+        viz = Visualizer(cache_size=0)
+        fig = viz.create_listening_hours_chart(pd.DataFrame({'hour': range(24), 'plays': range(24)}))
+        cache = FigureCache()
+        cache.put('hours', fig.to_json())
+        rebuilt = cache.get('hours')
+        self.assertEqual(list(rebuilt.data[0].y), list(range(24)))
+        self.assertIs(cache.get('hours'), rebuilt)
+
+    def test_unchanged_input_hits_cache(self):
+        viz = Visualizer()
+        df = pd.DataFrame({'hour': range(24), 'plays': range(24)})
+        first = viz.create_listening_hours_chart(df)
+        self.assertIs(viz.create_listening_hours_chart(df.copy()), first)
+        self.assertEqual(viz.figure_cache.stats()['hits'], 1)
+
+    def test_changed_input_misses_cache(self):
+        viz = Visualizer()
+        df = pd.DataFrame({'hour': range(24), 'plays': range(24)})
+        first = viz.create_listening_hours_chart(df)
+        df.loc[3, 'plays'] = 99
+        self.assertIsNot(viz.create_listening_hours_chart(df), first)
+        self.assertEqual(viz.figure_cache.stats(), {'entries': 2, 'hits': 0, 'misses': 2})
+
+    def test_content_hash_tracks_values(self):
+        df = pd.DataFrame({'genre': ['pop', 'rock'], 'count': [3, 1]})
+        self.assertEqual(content_hash(df), content_hash(df.copy()))
+        self.assertNotEqual(content_hash(df), content_hash(df.assign(count=[3, 2])))
+        self.assertEqual(content_hash({'a': 1, 'b': 2}), content_hash({'b': 2, 'a': 1}))
+
+
+if __name__ == '__main__':
+    unittest.main()
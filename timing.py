@@ -0,0 +1,145 @@
+"""
+Stage Timing
+Opt-in per-stage wall times and counters for the dashboards. Code paths call
+``record``/``count`` unconditionally; they only cost a thread-local lookup
+unless a StageTimer is active on the current thread.
+"""
+
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+_local = threading.local()
+
+# Set SPOTIFY_TIMINGS=1 to open the dashboards with the timing panel on
+TIMINGS_ENV = 'SPOTIFY_TIMINGS'
+
+
+def timings_enabled_by_default():
+    return os.getenv(TIMINGS_ENV, '').lower() in ('1', 'true', 'yes')
+
+
+class StageTimer:
+    """Collects ``(category, stage, seconds)`` records and named counters.
+
+    Stages nest: a processor method's time includes the API calls it makes.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished = None
+        self.records = []
+        self.counters = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, category, stage, seconds):
+        with self._lock:
+            self.records.append((category, stage, seconds))
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def stop(self):
+        self.finished = time.perf_counter()
+
+    @property
+    def wall_seconds(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    @contextmanager
+    def activate(self):
+        """Record stages run on this thread into this timer"""
+        previous = getattr(_local, 'timer', None)
+        _local.timer = self
+        try:
+            yield self
+        finally:
+            _local.timer = previous
+
+    def summary(self):
+        """Rows of category, stage, calls, total_ms and max_ms, slowest first"""
+        totals = {}
+        with self._lock:
+            records = list(self.records)
+        for category, stage, seconds in records:
+            row = totals.setdefault((category, stage), {'category': category, 'stage': stage,
+                                                        'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            row['calls'] += 1
+            row['total_ms'] += seconds * 1000
+            row['max_ms'] = max(row['max_ms'], seconds * 1000)
+        rows = sorted(totals.values(), key=lambda row: row['total_ms'], reverse=True)
+        for row in rows:
+            row['total_ms'] = round(row['total_ms'], 1)
+            row['max_ms'] = round(row['max_ms'], 1)
+        return rows
+
+
+def active():
+    """The StageTimer active on this thread, or None"""
+    return getattr(_local, 'timer', None)
+
+
+@contextmanager
+def record(category, stage):
+    """Time the ``with`` block as one stage if a timer is active"""
+    timer = active()
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(category, stage, time.perf_counter() - start)
+
+
+def count(name, n=1):
+    """Bump a counter on the active timer, if any"""
+    timer = active()
+    if timer is not None:
+        timer.count(name, n)
+
+
+def timed(category):
+    """Decorator recording each call as a stage named after the function"""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if active() is None:
+                return func(*args, **kwargs)
+            with record(category, func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def begin(enabled):
+    """Start timing this thread's work, or stop when disabled; returns the timer or None.
+
+    Call at the top of every dashboard rerun so a timer left by an earlier
+    rerun on the same thread is never reused.
+    """
+    _local.timer = StageTimer() if enabled else None
+    return _local.timer
+
+
+def show_timing_panel(timers):
+    """Render ``{title: StageTimer}`` in an expander at the end of the page"""
+    import streamlit as st
+
+    with st.expander("⏱️ Timings", expanded=True):
+        for title, timer in timers.items():
+            if timer is None:
+                continue
+            st.markdown(f"**{title}** - {timer.wall_seconds * 1000:.0f} ms wall")
+            if timer.counters:
+                st.caption(" · ".join(f"{name}: {value}" for name, value in sorted(timer.counters.items())))
+            rows = timer.summary()
+            if rows:
+                st.dataframe(rows, hide_index=True, use_container_width=True)
+            else:
+                st.caption("No stages recorded")
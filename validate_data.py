@@ -2,8 +2,6 @@
 Data validation script to check data quality and consistency
 """
 import sys
-from tests.mock_data import MockSpotifyClient
-from data_processor import DataProcessor
 
 
 def validate_top_artists(processor):
@@ -147,6 +145,8 @@ def main():
     print("="*70)
     
     # Initialize with mock client
+    from tests.mock_data import MockSpotifyClient
+    from data_processor import DataProcessor
     client = MockSpotifyClient()
     processor = DataProcessor(client)
     
@@ -1,54 +1,176 @@
 """
 View SQLite Database Contents
 Simple script to view your Spotify database
+
+Rows are streamed from SQLite page by page, so memory use stays flat no
+matter how large a table is.
+
+Usage:
+    python view_database.py                                  # every table, first 10 rows
+    python view_database.py top_artists                      # one table
+    python view_database.py recently_played --columns played_at,track_name,artist \\
+        --where "hour >= 22" --limit 100
+    python view_database.py recently_played --after 5000 --limit 0   # keyset: rows with rowid > 5000
 """
 
+import argparse
 import sqlite3
-import pandas as pd
 
-def view_database(db_name="spotify_data.db"):
+COLUMN_WIDTH = 22
+
+
+def list_tables(conn):
+    """Return the user tables in the database"""
+    cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name")
+    return [row[0] for row in cursor]
+
+
+def table_columns(conn, table):
+    """Return the column names of a table"""
+    return [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+
+
+def count_rows(conn, table, where=None, after=None):
+    """Count rows with COUNT(*) instead of loading them"""
+    conditions = [f"({where})"] if where else []
+    params = []
+    if after is not None:
+        conditions.append("rowid > ?")
+        params.append(after)
+    sql = f'SELECT COUNT(*) FROM "{table}"'
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    return conn.execute(sql, params).fetchone()[0]
+
+
+def iter_rows(conn, table, columns=None, where=None, limit=10, offset=0, after=None, page_size=500):
+    """Yield rows one at a time, fetching ``page_size`` rows per query.
+
+    Pages are fetched by rowid (keyset paging), so each page costs the same
+    however deep into the table it is. ``after`` starts past a given rowid.
+    ``offset`` skips rows with LIMIT/OFFSET on the first page only. A
+    ``limit`` of 0 streams every matching row.
+    """
+    select = ', '.join(f'"{c}"' for c in columns) if columns else '*'
+    conditions = [f"({where})"] if where else []
+    last_rowid = after
+    remaining = limit if limit else None
+
+    while remaining is None or remaining > 0:
+        page = page_size if remaining is None else min(page_size, remaining)
+        page_conditions = conditions + (["rowid > ?"] if last_rowid is not None else [])
+        sql = f'SELECT rowid, {select} FROM "{table}"'
+        if page_conditions:
+            sql += " WHERE " + " AND ".join(page_conditions)
+        sql += " ORDER BY rowid LIMIT ? OFFSET ?"
+        params = ([last_rowid] if last_rowid is not None else []) + [page, offset]
+        offset = 0
+
+        fetched = 0
+        for row in conn.execute(sql, params):
+            last_rowid = row[0]
+            fetched += 1
+            yield row[1:]
+        if remaining is not None:
+            remaining -= fetched
+        if fetched < page:
+            break
+
+
+def format_row(values, width=COLUMN_WIDTH):
+    """Format one row as fixed-width columns"""
+    cells = []
+    for value in values:
+        text = '' if value is None else str(value)
+        if len(text) > width:
+            text = text[:width - 1] + '…'
+        cells.append(text.ljust(width))
+    return ' '.join(cells).rstrip()
+
+
+def print_table(conn, table, columns=None, where=None, limit=10, offset=0, after=None, page_size=500):
+    """Print the record count and stream the selected rows of one table"""
+    available = table_columns(conn, table)
+    if columns:
+        unknown = [c for c in columns if c not in available]
+        if unknown:
+            raise ValueError(f"Unknown column(s) for {table}: {', '.join(unknown)}")
+    header = columns or available
+
+    print(f"\n📋 TABLE: {table}")
+    print("-" * 60)
+    print(f"Total records: {count_rows(conn, table, where, after)}")
+    print()
+    print(format_row(header))
+    print(format_row(['-' * COLUMN_WIDTH] * len(header)))
+    shown = 0
+    for row in iter_rows(conn, table, columns, where, limit, offset, after, page_size):
+        print(format_row(row))
+        shown += 1
+    print(f"({shown} rows shown)")
+    print()
+
+
+def view_database(db_name="spotify_data.db", tables=None, columns=None, where=None,
+                  limit=10, offset=0, after=None, page_size=500):
     """View database contents"""
     try:
-        conn = sqlite3.connect(db_name)
-        
+        # Read-only: the viewer can never modify or create the database
+        conn = sqlite3.connect(f"file:{db_name}?mode=ro", uri=True)
+
         print("=" * 60)
         print("📊 SPOTIFY DATABASE VIEWER")
         print("=" * 60)
         print()
-        
-        # List all tables
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = cursor.fetchall()
-        
+
+        available = list_tables(conn)
+
         print("Available tables:")
-        for idx, table in enumerate(tables, 1):
-            print(f"   {idx}. {table[0]}")
-        
+        for idx, table in enumerate(available, 1):
+            print(f"   {idx}. {table}")
+
         print()
         print("=" * 60)
-        
-        # Show each table
-        for table in tables:
-            table_name = table[0]
-            print(f"\n📋 TABLE: {table_name}")
-            print("-" * 60)
-            
-            df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
-            print(f"Total records: {len(df)}")
-            print()
-            print(df.head(10).to_string())
-            print()
-        
+
+        for table in tables or available:
+            if table not in available:
+                print(f"❌ Unknown table: {table}")
+                continue
+            print_table(conn, table, columns, where, limit, offset, after, page_size)
+
         conn.close()
-        
+
         print("=" * 60)
         print("✅ Database viewing completed!")
         print("=" * 60)
-        
+
     except Exception as e:
         print(f"❌ Error: {str(e)}")
-        print("Make sure 'spotify_data.db' exists in the current directory.")
+        print(f"Make sure '{db_name}' exists in the current directory.")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="View the Spotify SQLite database")
+    parser.add_argument('tables', nargs='*', help="Tables to show (default: all)")
+    parser.add_argument('--db', default="spotify_data.db", help="Database file")
+    parser.add_argument('--columns', help="Comma-separated columns to show")
+    parser.add_argument('--where', help="SQL filter, e.g. \"popularity > 50\"")
+    parser.add_argument('--limit', type=int, default=10, help="Rows per table, 0 for all (default: 10)")
+    parser.add_argument('--offset', type=int, default=0, help="Skip this many matching rows")
+    parser.add_argument('--after', type=int, help="Only rows with rowid greater than this (keyset paging)")
+    parser.add_argument('--page-size', type=int, default=500, help="Rows fetched per query")
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    view_database()
+    args = parse_args()
+    view_database(
+        db_name=args.db,
+        tables=args.tables,
+        columns=[c.strip() for c in args.columns.split(',')] if args.columns else None,
+        where=args.where,
+        limit=args.limit,
+        offset=args.offset,
+        after=args.after,
+        page_size=args.page_size,
+    )
@@ -1,12 +1,124 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
 from plotly.subplots import make_subplots
 import numpy as np
 
+from timing import count, record
+
+
+def content_hash(value):
+    """Cheap fingerprint of a chart input (DataFrame, dict or scalar)"""
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr((list(value.columns), [str(t) for t in value.dtypes])).encode())
+        try:
+            digest.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+        except TypeError:
+            # Unhashable cells such as lists - fall back to their text
+            digest.update(pd.util.hash_pandas_object(value.astype(str), index=True).values.tobytes())
+    elif isinstance(value, dict):
+        digest.update(repr(sorted(value.items(), key=lambda item: str(item[0]))).encode())
+    else:
+        digest.update(repr(value).encode())
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """LRU cache of figure JSON keyed by chart name and input content hash.
+
+    Entries hold the serialized figure; the Figure object rebuilt from it is
+    kept alongside so repeated hits return without touching Plotly. Figures
+    handed out by the cache are shared and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the cached Figure for ``key`` or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        if entry['figure'] is None:
+            entry['figure'] = pio.from_json(entry['json'], skip_invalid=True)
+        return entry['figure']
+
+    def get_json(self, key):
+        """Return the cached figure JSON for ``key`` or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry['json']
+
+    def put(self, key, figure_json, figure=None):
+        """Store a figure's JSON, evicting the least recently used entry"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = {'json': figure_json, 'figure': figure}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+# Above these sizes charts switch to cheaper traces so payloads stay bounded
+SCATTER_WEBGL_THRESHOLD = 1000      # Scattergl instead of SVG markers
+SCATTER_DENSITY_THRESHOLD = 20000   # server-side binned density instead of points
+DENSITY_BINS = 40
+
+
+def figure_key(chart, *args, **kwargs):
+    """Cache key for one chart call: its name plus hashes of every input"""
+    return (chart,) + tuple(content_hash(arg) for arg in args) + tuple(
+        (name, content_hash(value)) for name, value in sorted(kwargs.items()))
+
+
+def cached_figure(method):
+    """Memoize a ``create_*`` method in the instance's FigureCache"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with record('chart', method.__name__):
+            key = figure_key(method.__name__, *args, **kwargs)
+            figure = self.figure_cache.get(key)
+            if figure is None:
+                count('figure_cache_misses')
+                figure = method(self, *args, **kwargs)
+                self.figure_cache.put(key, figure.to_json(), figure)
+            else:
+                count('figure_cache_hits')
+        return figure
+    return wrapper
+
+
 class Visualizer:
-    def __init__(self):
+    def __init__(self, cache_size=64):
         self.colors = px.colors.qualitative.Vivid
+        # Unchanged inputs skip figure construction on reruns
+        self.figure_cache = FigureCache(cache_size)
     
+    @cached_figure
     def create_top_artists_chart(self, df):
         """Create colorful bar chart for top artists"""
         colors = ['#1DB954', '#1ed760', '#ff6b6b', '#4ecdc4', '#45b7d1', 
@@ -41,6 +153,7 @@ class Visualizer:
         )
         return fig
     
+    @cached_figure
     def create_listening_hours_chart(self, df):
         """Create area chart for listening hours"""
         fig = go.Figure(data=[
@@ -69,6 +182,7 @@ class Visualizer:
         )
         return fig
 
+    @cached_figure
     def create_genre_chart(self, df):
         """Create colorful pie chart for genres"""
         colors = ['#1DB954', '#1ed760', '#ff6b6b', '#4ecdc4', '#45b7d1', 
@@ -112,6 +226,7 @@ class Visualizer:
         )
         return fig
     
+    @cached_figure
     def create_emotional_radar(self, df):
         """Create radar chart for emotional patterns"""
         avg_features = {
@@ -155,6 +270,7 @@ class Visualizer:
         )
         return fig
     
+    @cached_figure
     def create_listening_heatmap(self, df):
         """Create heatmap for listening patterns"""
         days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
@@ -189,18 +305,36 @@ class Visualizer:
         )
         return fig
     
+    @cached_figure
     def create_emotional_scatter(self, df):
         """Create scatter plot for valence vs energy"""
-        fig = px.scatter(
-            df,
-            x='valence',
-            y='energy',
-            size='danceability',
-            color='energy',
-            hover_data=['name', 'artist'],
-            color_continuous_scale=[[0, '#191414'], [0.3, '#1DB954'], [0.6, '#1ed760'], [1, '#feca57']],
-            title='💫 Song Emotional Landscape'
-        )
+        colorscale = [[0, '#191414'], [0.3, '#1DB954'], [0.6, '#1ed760'], [1, '#feca57']]
+        if len(df) > SCATTER_DENSITY_THRESHOLD:
+            # Too many songs for points: bin here and ship only the grid
+            counts, x_edges, y_edges = np.histogram2d(
+                df['valence'], df['energy'], bins=DENSITY_BINS, range=[[0, 1], [0, 1]])
+            fig = go.Figure(data=go.Heatmap(
+                z=counts.T,
+                x=(x_edges[:-1] + x_edges[1:]) / 2,
+                y=(y_edges[:-1] + y_edges[1:]) / 2,
+                colorscale=colorscale,
+                colorbar=dict(title=dict(text="Songs")),
+                hovertemplate='Happiness %{x:.2f}<br>Energy %{y:.2f}<br>%{z} songs<extra></extra>'
+            ))
+        else:
+            fig = px.scatter(
+                df,
+                x='valence',
+                y='energy',
+                size='danceability',
+                color='energy',
+                hover_data=['name', 'artist'],
+                color_continuous_scale=colorscale,
+                title='💫 Song Emotional Landscape',
+                # WebGL keeps thousands of markers responsive
+                render_mode='webgl' if len(df) > SCATTER_WEBGL_THRESHOLD else 'auto'
+            )
+            fig.update_traces(marker=dict(line=dict(width=0)))
         
         fig.update_layout(
             title={
@@ -214,10 +348,9 @@ class Visualizer:
             plot_bgcolor='rgba(0,0,0,0.3)',
             paper_bgcolor='rgba(0,0,0,0)'
         )
-        
-        fig.update_traces(marker=dict(line=dict(width=0)))
         return fig
 
+    @cached_figure
     def create_diversity_gauge(self, diversity_data):
         """Create gauge chart for diversity score"""
         fig = go.Figure(go.Indicator(
@@ -253,6 +386,7 @@ class Visualizer:
         )
         return fig
     
+    @cached_figure
     def create_hidden_gems_chart(self, gems_df):
         """Create chart for hidden gems"""
         if len(gems_df) == 0:
@@ -304,6 +438,7 @@ class Visualizer:
         )
         return fig
     
+    @cached_figure
     def create_binge_chart(self, binge_df):
         """Create chart for binge listening"""
         if len(binge_df) == 0: